@@ -4,15 +4,15 @@ from datetime import date
 from uuid import UUID
 
 from backend.app.db.session import get_db
-from backend.app.schemas.adjustment import ReceiveRequest, AdjustRequest
+from backend.app.schemas.adjustment import ReceiveRequest, AdjustRequest, ReceiveManifestRequest, ReceiveManifestResponse
 from backend.app.schemas.inventory import InventorySummary
-from backend.app.services.inventory_service import receive_stock, adjust_stock
+from backend.app.services.inventory_service import receive_stock, receive_manifest, adjust_stock
 
 from backend.app.models.revenue_adjustment import RevenueAdjustment
 from backend.app.models.user import User
 from backend.app.schemas.revenue_adjustment import RevenueAdjustmentCreate, RevenueAdjustmentOut, Context
-from sqlalchemy import select, insert, func
-from backend.app.schemas.pagination import PaginationParams
+from sqlalchemy import select, insert
+from backend.app.schemas.pagination import PaginationParams, paginate
 from .auth import get_current_active_user
 
 router = APIRouter()
@@ -24,6 +24,13 @@ def receive(body: ReceiveRequest, db: Session = Depends(get_db), current_user: U
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
 
+@router.post("/receive-manifest", response_model=ReceiveManifestResponse, status_code=201)
+def receive_delivery_manifest(body: ReceiveManifestRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+    try:
+        return receive_manifest(db, branch_id=body.branch_id, lines=[line.model_dump() for line in body.lines])
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
 @router.post("/adjust", response_model=InventorySummary, status_code=201)
 def adjust(body: AdjustRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     try:
@@ -64,6 +71,5 @@ def list_revenue_adjustments(
         RevenueAdjustment.adjustment_date <= end_date,
         RevenueAdjustment.context == context,
     )
-    total = db.execute(select(func.count()).select_from(q.subquery())).scalar() or 0
-    rows = db.execute(q.order_by(RevenueAdjustment.created_at.desc()).offset(pg.offset).limit(pg.limit)).scalars().all()
-    return {"items": rows, "total": total, "offset": pg.offset, "limit": pg.limit, "has_more": pg.offset + pg.limit < total}
\ No newline at end of file
+    rows, meta = paginate(db, q, pg, RevenueAdjustment.created_at.desc(), RevenueAdjustment.id.desc(), scalars=True)
+    return {"items": rows, **meta}
\ No newline at end of file
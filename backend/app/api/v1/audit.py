@@ -5,13 +5,14 @@ from datetime import date
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from backend.app.db.session import get_db
+from backend.app.db.session import get_read_db
 from backend.app.models.op_log import OpLog
 from backend.app.models.user import User
-from backend.app.schemas.pagination import PaginationParams
+from backend.app.schemas.pagination import PaginationParams, paginate
+from backend.app.utils.date_range import in_local_dates
 from .auth import get_current_active_user
 
 router = APIRouter()
@@ -29,7 +30,7 @@ def list_audit_logs(
     start_date: date | None = Query(None),
     end_date: date | None = Query(None),
     pg: PaginationParams = Depends(),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     _require_admin(current_user)
@@ -39,15 +40,10 @@ def list_audit_logs(
         q = q.where(OpLog.op_type == op_type)
     if status:
         q = q.where(OpLog.status == status)
-    if start_date:
-        q = q.where(func.date(OpLog.created_at) >= start_date)
-    if end_date:
-        q = q.where(func.date(OpLog.created_at) <= end_date)
+    if start_date or end_date:
+        q = q.where(in_local_dates(OpLog.created_at, start_date, end_date))
 
-    total = db.execute(select(func.count()).select_from(q.subquery())).scalar() or 0
-    rows = db.execute(
-        q.order_by(OpLog.created_at.desc()).offset(pg.offset).limit(pg.limit)
-    ).scalars().all()
+    rows, meta = paginate(db, q, pg, OpLog.created_at.desc(), OpLog.id.desc(), scalars=True)
 
     return {
         "items": [
@@ -62,16 +58,13 @@ def list_audit_logs(
             }
             for r in rows
         ],
-        "total": total,
-        "offset": pg.offset,
-        "limit": pg.limit,
-        "has_more": pg.offset + pg.limit < total,
+        **meta,
     }
 
 
 @router.get("/types")
 def list_op_types(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     _require_admin(current_user)
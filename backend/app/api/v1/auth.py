@@ -5,7 +5,7 @@ from sqlalchemy.orm import Session
 from typing import Annotated
 
 from backend.app.db.session import get_db
-from backend.app.schemas.user import UserOut, Token, TokenData
+from backend.app.schemas.user import UserOut, Token
 from backend.app.models.user import User
 from backend.app.core.security import (
     verify_password,
@@ -14,7 +14,8 @@ from backend.app.core.security import (
     decode_token,
     ALGORITHM,
 )
-from backend.app.services import user_service
+from backend.app.services import auth_cache, user_service
+from backend.app.services.auth_cache import Principal
 from jose import JWTError, jwt
 from backend.app.core.config import settings
 
@@ -30,7 +31,11 @@ class RefreshRequest(BaseModel):
 def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     db: Session = Depends(get_db)
-):
+) -> Principal:
+    """
+    The token's user, from auth_cache: no query while the cached principal
+    is fresh and matches the token's version.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -41,20 +46,17 @@ def get_current_user(
         username: str | None = payload.get("sub")
         if username is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    if token_data.username is None:
-        raise credentials_exception
-    user = user_service.get_user_by_username(db, username=token_data.username)
+    user = auth_cache.principal(db, payload)
 
     if user is None:
         raise credentials_exception
     return user
 
 def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)]
-):
+    current_user: Annotated[Principal, Depends(get_current_user)]
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
@@ -63,8 +65,10 @@ def get_current_active_user(
 def _build_token_data(user: User) -> dict:
     return {
         "sub": user.username,
+        "uid": str(user.id),
         "role": user.role,
         "branch_id": str(user.branch_id) if user.branch_id else None,
+        "ver": int(user.token_version or 0),
     }
 
 
@@ -108,6 +112,8 @@ def refresh_access_token(body: RefreshRequest, db: Session = Depends(get_db)):
     user = user_service.get_user_by_username(db, username=username)
     if user is None or not user.is_active:
         raise credentials_exception
+    if int(payload.get("ver") or 0) != int(user.token_version or 0):
+        raise credentials_exception
 
     token_data = _build_token_data(user)
     return {
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import insert, select, func
+from sqlalchemy import insert, select
 from backend.app.db.session import get_db
 from backend.app.models.branch import Branch
 from backend.app.schemas.branch import BranchCreate, BranchOut
 from backend.app.models.user import User
-from backend.app.schemas.pagination import PaginationParams
+from backend.app.schemas.pagination import PaginationParams, paginate
+from backend.app.services import reference_cache
 from .auth import get_current_active_user
 
 router = APIRouter()
@@ -19,6 +20,7 @@ def create_branch(body: BranchCreate, db: Session = Depends(get_db), current_use
     row = db.execute(
         insert(Branch).values(code=body.code, name=body.name).returning(Branch)
     ).scalar_one()
+    reference_cache.invalidate(db, reference_cache.BRANCHES)
     db.commit()
     return row
 
@@ -29,6 +31,5 @@ def list_branches(
     current_user: User = Depends(get_current_active_user),
 ):
     q = select(Branch)
-    total = db.execute(select(func.count()).select_from(q.subquery())).scalar() or 0
-    rows = db.execute(q.order_by(Branch.code).offset(pg.offset).limit(pg.limit)).scalars().all()
-    return {"items": rows, "total": total, "offset": pg.offset, "limit": pg.limit, "has_more": pg.offset + pg.limit < total}
\ No newline at end of file
+    rows, meta = paginate(db, q, pg, Branch.code, Branch.id, scalars=True)
+    return {"items": rows, **meta}
\ No newline at end of file
@@ -1,79 +1,232 @@
-"""Admin-only CSV export endpoints."""
+"""Admin-only export endpoints (CSV, Parquet, Arrow).
+
+Exports stream: rows are read through a server-side cursor (yield_per) in
+fixed-size batches and each batch is written out as soon as it arrives, so
+memory stays flat regardless of the date range. The generator runs after the
+request's own session is closed, so it opens its own (on the read replica
+when one is configured and fresh enough).
+
+format=csv keeps the spreadsheet-friendly output (money in EGP, timestamps
+as text). format=parquet / format=arrow (Arrow IPC stream) are typed and
+zstd-compressed: money stays in integer cents (`*_cents`, int64) and
+timestamps are tz-aware UTC. Columnar formats need pyarrow.
+"""
 from __future__ import annotations
 
 import csv
 import io
+from dataclasses import dataclass
 from datetime import date, datetime
+from typing import Any, Iterable, Iterator, Literal
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+from sqlalchemy.engine import Row
 
-from backend.app.db.session import get_db
+from backend.app.db.session import read_session
 from backend.app.models.branch import Branch
 from backend.app.models.item import Item
+from backend.app.models.kg_items import KgItem
+from backend.app.models.kg_sale import KgSale
+from backend.app.models.kg_student import KgStudent
+from backend.app.models.ledger import StockLedger
 from backend.app.models.reservation import Reservation
 from backend.app.models.sale import Sale
 from backend.app.models.student import Student
 from backend.app.models.teacher import Teacher
 from backend.app.models.user import User
+from backend.app.utils.date_range import in_local_dates
 from .auth import get_current_active_user
 
 router = APIRouter()
 
+CSV_BATCH_ROWS = 1000
+COLUMNAR_BATCH_ROWS = 10_000
+
+ExportFormat = Literal["csv", "parquet", "arrow"]
+
+_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+_EXTENSIONS = {"csv": "csv", "parquet": "parquet", "arrow": "arrows"}
+
+
+@dataclass(frozen=True)
+class Col:
+    """
+    One export column. `kind` is uuid | str | int | bool | ts | cents.
+    For cents, `name` is the CSV (EGP) header and `attr` the integer cents
+    column, which is also the columnar field name.
+    """
+    name: str
+    kind: str = "str"
+    attr: str | None = None
+
+    @property
+    def field(self) -> str:
+        return self.attr if self.kind == "cents" and self.attr else self.name
+
+    def raw(self, row: Row) -> Any:
+        return getattr(row, self.attr or self.name)
+
+    def csv_value(self, row: Row) -> Any:
+        v = self.raw(row)
+        if v is None:
+            return ""
+        if self.kind == "cents":
+            return v / 100
+        if self.kind in ("uuid", "ts"):
+            return str(v)
+        return v
+
+    def columnar_value(self, row: Row) -> Any:
+        v = self.raw(row)
+        if v is not None and self.kind in ("uuid", "str"):
+            return str(v)
+        return v
+
 
 def _require_admin(user: User):
     if user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
 
-def _csv_response(rows: list[dict], filename: str) -> StreamingResponse:
-    if not rows:
-        return StreamingResponse(
-            iter(["No data"]),
-            media_type="text/csv",
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-        )
+def _stream_rows(stmt, *, chunk_rows: int = CSV_BATCH_ROWS) -> Iterator[list[Row]]:
+    """Yield the result of `stmt` in partitions of `chunk_rows` from a server-side cursor."""
+    with read_session() as db:
+        result = db.execute(stmt.execution_options(yield_per=chunk_rows))
+        for part in result.partitions():
+            yield part
+
+
+def _csv_chunks(batches: Iterable[list[Row]], columns: list[Col]) -> Iterator[str]:
     buf = io.StringIO()
-    writer = csv.DictWriter(buf, fieldnames=rows[0].keys())
-    writer.writeheader()
-    writer.writerows(rows)
-    buf.seek(0)
+    writer = csv.writer(buf)
+    wrote = False
+    for rows in batches:
+        if not wrote:
+            writer.writerow([c.name for c in columns])
+            wrote = True
+        writer.writerows([c.csv_value(r) for c in columns] for r in rows)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate(0)
+    if not wrote:
+        yield "No data"
+
+
+class _ChunkSink:
+    """Write-only file object; the generator hands out what was written since the last take()."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        b = bytes(data)
+        self._parts.append(b)
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+def _arrow_schema(columns: list[Col]):
+    import pyarrow as pa
+
+    types = {
+        "uuid": pa.string(),
+        "str": pa.string(),
+        "int": pa.int64(),
+        "bool": pa.bool_(),
+        "ts": pa.timestamp("us", tz="UTC"),
+        "cents": pa.int64(),
+    }
+    return pa.schema([pa.field(c.field, types[c.kind]) for c in columns])
+
+
+def _columnar_chunks(batches: Iterable[list[Row]], columns: list[Col], fmt: str) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    schema = _arrow_schema(columns)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+    with writer:
+        for rows in batches:
+            arrays = [
+                pa.array([c.columnar_value(r) for r in rows], type=f.type)
+                for c, f in zip(columns, schema)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            chunk = sink.take()
+            if chunk:
+                yield chunk
+    yield sink.take()
+
+
+def _export_response(stmt, columns: list[Col], basename: str, fmt: str) -> StreamingResponse:
+    if fmt == "csv":
+        body = _csv_chunks(_stream_rows(stmt, chunk_rows=CSV_BATCH_ROWS), columns)
+    else:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=400, detail=f"format={fmt} requires pyarrow to be installed")
+        body = _columnar_chunks(_stream_rows(stmt, chunk_rows=COLUMNAR_BATCH_ROWS), columns, fmt)
     return StreamingResponse(
-        iter([buf.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        body,
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{basename}.{_EXTENSIONS[fmt]}"'},
     )
 
 
 @router.get("/students")
 def export_students(
     branch_id: UUID | None = Query(None),
-    db: Session = Depends(get_db),
+    fmt: ExportFormat = Query("csv", alias="format"),
     current_user: User = Depends(get_current_active_user),
 ):
     _require_admin(current_user)
-    q = select(Student).order_by(Student.full_name)
+    q = select(
+        Student.id, Student.public_id, Student.full_name, Student.phone, Student.parent_phone,
+        Student.gender, Student.grade, Student.section, Student.created_at,
+    ).order_by(Student.full_name)
     if branch_id:
         q = q.where(Student.branch_id == branch_id)
-    students = db.execute(q).scalars().all()
-    rows = [
-        {
-            "id": str(s.id),
-            "public_id": s.public_id,
-            "full_name": s.full_name,
-            "phone": s.phone or "",
-            "parent_phone": s.parent_phone or "",
-            "gender": s.gender,
-            "grade": s.grade,
-            "section": s.section or "",
-            "created_at": str(s.created_at),
-        }
-        for s in students
+    columns = [
+        Col("id", "uuid"),
+        Col("public_id", "int"),
+        Col("full_name"),
+        Col("phone"),
+        Col("parent_phone"),
+        Col("gender"),
+        Col("grade", "int"),
+        Col("section"),
+        Col("created_at", "ts"),
     ]
-    return _csv_response(rows, f"students_{date.today()}.csv")
+    return _export_response(q, columns, f"students_{date.today()}", fmt)
 
 
 @router.get("/sales")
@@ -81,59 +234,176 @@ def export_sales(
     branch_id: UUID | None = Query(None),
     start_date: date = Query(...),
     end_date: date = Query(...),
-    db: Session = Depends(get_db),
+    fmt: ExportFormat = Query("csv", alias="format"),
     current_user: User = Depends(get_current_active_user),
 ):
     _require_admin(current_user)
     q = (
-        select(Sale, Item.sku, Item.name.label("item_name"), Branch.code.label("branch_code"))
+        select(
+            Sale.id, Sale.qty, Sale.unit_price_cents, Sale.total_cents, Sale.sold_at,
+            Item.sku, Item.name.label("item_name"), Branch.code.label("branch_code"),
+        )
         .join(Item, Item.id == Sale.item_id)
         .join(Branch, Branch.id == Sale.branch_id)
-        .where(func.date(Sale.sold_at) >= start_date, func.date(Sale.sold_at) <= end_date)
+        .where(in_local_dates(Sale.sold_at, start_date, end_date))
         .order_by(Sale.sold_at.desc())
     )
     if branch_id:
         q = q.where(Sale.branch_id == branch_id)
-    results = db.execute(q).all()
-    rows = [
-        {
-            "id": str(r.Sale.id),
-            "branch": r.branch_code,
-            "sku": r.sku,
-            "item": r.item_name,
-            "qty": r.Sale.qty,
-            "unit_price_egp": r.Sale.unit_price_cents / 100,
-            "total_egp": r.Sale.total_cents / 100,
-            "sold_at": str(r.Sale.sold_at),
-        }
-        for r in results
+    columns = [
+        Col("id", "uuid"),
+        Col("branch", attr="branch_code"),
+        Col("sku"),
+        Col("item", attr="item_name"),
+        Col("qty", "int"),
+        Col("unit_price_egp", "cents", "unit_price_cents"),
+        Col("total_egp", "cents", "total_cents"),
+        Col("sold_at", "ts"),
     ]
-    return _csv_response(rows, f"sales_{start_date}_{end_date}.csv")
+    return _export_response(q, columns, f"sales_{start_date}_{end_date}", fmt)
 
 
 @router.get("/inventory")
 def export_inventory(
     branch_id: UUID | None = Query(None),
-    db: Session = Depends(get_db),
+    fmt: ExportFormat = Query("csv", alias="format"),
     current_user: User = Depends(get_current_active_user),
 ):
     _require_admin(current_user)
     q = (
-        select(Item, Teacher.name.label("teacher_name"))
+        select(
+            Item.sku, Item.name, Item.grade, Item.default_price_cents, Item.default_cost_cents, Item.active,
+            Teacher.name.label("teacher_name"),
+        )
         .join(Teacher, Teacher.id == Item.teacher_id, isouter=True)
         .order_by(Item.sku)
     )
-    results = db.execute(q).all()
-    rows = [
-        {
-            "sku": r.Item.sku,
-            "name": r.Item.name,
-            "grade": r.Item.grade,
-            "teacher": r.teacher_name or "",
-            "price_egp": r.Item.default_price_cents / 100,
-            "cost_egp": r.Item.default_cost_cents / 100,
-            "active": r.Item.active,
-        }
-        for r in results
+    columns = [
+        Col("sku"),
+        Col("name"),
+        Col("grade", "int"),
+        Col("teacher", attr="teacher_name"),
+        Col("price_egp", "cents", "default_price_cents"),
+        Col("cost_egp", "cents", "default_cost_cents"),
+        Col("active", "bool"),
+    ]
+    return _export_response(q, columns, f"inventory_{date.today()}", fmt)
+
+
+@router.get("/reservations")
+def export_reservations(
+    branch_id: UUID | None = Query(None),
+    status: str | None = Query(None),
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    fmt: ExportFormat = Query("csv", alias="format"),
+    current_user: User = Depends(get_current_active_user),
+):
+    _require_admin(current_user)
+    q = (
+        select(
+            Reservation.id, Reservation.status, Reservation.qty, Reservation.unit_price_cents,
+            Reservation.prepaid_cents, Reservation.created_at, Reservation.fulfilled_at,
+            func.upper(Reservation.hold_window).label("hold_until"),
+            Item.sku, Item.name.label("item_name"), Branch.code.label("branch_code"),
+            Student.public_id.label("student_public_id"), Student.full_name.label("student_name"),
+        )
+        .join(Item, Item.id == Reservation.item_id)
+        .join(Branch, Branch.id == Reservation.branch_id)
+        .outerjoin(Student, Student.id == Reservation.student_id)
+        .where(in_local_dates(Reservation.created_at, start_date, end_date))
+        .order_by(Reservation.created_at.desc())
+    )
+    if branch_id:
+        q = q.where(Reservation.branch_id == branch_id)
+    if status:
+        q = q.where(Reservation.status == status)
+    columns = [
+        Col("id", "uuid"),
+        Col("branch", attr="branch_code"),
+        Col("sku"),
+        Col("item", attr="item_name"),
+        Col("student_public_id", "int"),
+        Col("student", attr="student_name"),
+        Col("status"),
+        Col("qty", "int"),
+        Col("unit_price_egp", "cents", "unit_price_cents"),
+        Col("prepaid_egp", "cents", "prepaid_cents"),
+        Col("created_at", "ts"),
+        Col("hold_until", "ts"),
+        Col("fulfilled_at", "ts"),
+    ]
+    return _export_response(q, columns, f"reservations_{start_date}_{end_date}", fmt)
+
+
+@router.get("/ledger")
+def export_ledger(
+    branch_id: UUID | None = Query(None),
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    fmt: ExportFormat = Query("csv", alias="format"),
+    current_user: User = Depends(get_current_active_user),
+):
+    _require_admin(current_user)
+    q = (
+        select(
+            StockLedger.id, StockLedger.at, StockLedger.event, StockLedger.qty,
+            StockLedger.ref_type, StockLedger.ref_id,
+            Item.sku, Branch.code.label("branch_code"),
+        )
+        .join(Item, Item.id == StockLedger.item_id)
+        .join(Branch, Branch.id == StockLedger.branch_id)
+        .where(in_local_dates(StockLedger.at, start_date, end_date))
+        .order_by(StockLedger.id)
+    )
+    if branch_id:
+        q = q.where(StockLedger.branch_id == branch_id)
+    columns = [
+        Col("id", "int"),
+        Col("at", "ts"),
+        Col("branch", attr="branch_code"),
+        Col("sku"),
+        Col("event"),
+        Col("qty", "int"),
+        Col("ref_type"),
+        Col("ref_id", "uuid"),
+    ]
+    return _export_response(q, columns, f"ledger_{start_date}_{end_date}", fmt)
+
+
+@router.get("/kg-sales")
+def export_kg_sales(
+    branch_id: UUID | None = Query(None),
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    fmt: ExportFormat = Query("csv", alias="format"),
+    current_user: User = Depends(get_current_active_user),
+):
+    _require_admin(current_user)
+    q = (
+        select(
+            KgSale.id, KgSale.qty, KgSale.unit_price_cents, KgSale.total_cents, KgSale.sold_at,
+            KgItem.sku, KgItem.name.label("item_name"), KgItem.item_type,
+            KgStudent.full_name.label("student_name"), Branch.code.label("branch_code"),
+        )
+        .join(KgItem, KgItem.id == KgSale.kg_item_id)
+        .join(KgStudent, KgStudent.id == KgSale.kg_student_id)
+        .join(Branch, Branch.id == KgSale.branch_id)
+        .where(in_local_dates(KgSale.sold_at, start_date, end_date))
+        .order_by(KgSale.sold_at.desc())
+    )
+    if branch_id:
+        q = q.where(KgSale.branch_id == branch_id)
+    columns = [
+        Col("id", "uuid"),
+        Col("branch", attr="branch_code"),
+        Col("sku"),
+        Col("item", attr="item_name"),
+        Col("item_type"),
+        Col("student", attr="student_name"),
+        Col("qty", "int"),
+        Col("unit_price_egp", "cents", "unit_price_cents"),
+        Col("total_egp", "cents", "total_cents"),
+        Col("sold_at", "ts"),
     ]
-    return _csv_response(rows, f"inventory_{date.today()}.csv")
+    return _export_response(q, columns, f"kg_sales_{start_date}_{end_date}", fmt)
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 from backend.app.db.session import get_db
 from backend.app.schemas.inventory import InventorySummary
 from backend.app.services.inventory_service import get_inventory_summary
-from backend.app.models.branch import Branch
+from backend.app.services import reference_cache
 from backend.app.models.item import Item
 from backend.app.models.user import User
 from .auth import get_current_active_user
@@ -32,11 +32,10 @@ def inventory_summary_by_code(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    branch_id = db.execute(
-        select(Branch.id).where(Branch.code == branch_code)
-    ).scalar_one_or_none()
-    if not branch_id:
+    branch = reference_cache.branch_by_code(db, branch_code)
+    if not branch:
         raise HTTPException(status_code=404, detail="Branch not found")
+    branch_id = branch.id
 
     item_id = db.execute(
         select(Item.id).where(
@@ -10,7 +10,8 @@ from backend.app.db.session import get_db
 from backend.app.models.item import Item
 from backend.app.models.user import User
 from backend.app.schemas.item import ItemCreate, ItemOut
-from backend.app.schemas.pagination import PaginationParams
+from backend.app.schemas.pagination import PaginatedResponse, PaginationParams, paginate
+from backend.app.services import reference_cache
 from .auth import get_current_active_user
 
 router = APIRouter()
@@ -59,11 +60,12 @@ def create_item(body: ItemCreate, db: Session = Depends(get_db), current_user: U
         values["default_price_cents"] = body.default_price_cents
 
     row = db.execute(insert(Item).values(**values).returning(Item)).scalar_one()
+    reference_cache.invalidate(db, reference_cache.ITEMS)
     db.commit()
     return row
 
 
-@router.get("", response_model=list[ItemOut])
+@router.get("", response_model=PaginatedResponse[ItemOut])
 def list_items(
     teacher_id: Optional[UUID] = Query(default=None),
     pg: PaginationParams = Depends(),
@@ -73,9 +75,8 @@ def list_items(
     q = select(Item)
     if teacher_id is not None:
         q = q.where(Item.teacher_id == teacher_id)
-    total = db.execute(select(func.count()).select_from(q.subquery())).scalar() or 0
-    rows = db.execute(q.order_by(func.lower(Item.sku)).offset(pg.offset).limit(pg.limit)).scalars().all()
-    return {"items": rows, "total": total, "offset": pg.offset, "limit": pg.limit, "has_more": pg.offset + pg.limit < total}
+    rows, meta = paginate(db, q, pg, func.lower(Item.sku), Item.id, scalars=True)
+    return {"items": rows, **meta}
 
 
 @router.get("/{sku}", response_model=ItemOut)
@@ -155,6 +156,7 @@ def update_item_price(
         if not row:
             raise HTTPException(status_code=404, detail="Item not found")
 
+    reference_cache.invalidate(db, reference_cache.ITEMS)
     db.commit()
     return row
 
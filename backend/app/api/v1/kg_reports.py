@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import cast
 
-from backend.app.db.session import get_db
+from backend.app.db.session import get_read_db
 from backend.app.models.branch import Branch
 from backend.app.models.user import User
 from backend.app.schemas.kg_report import KgDailySalesOut, KgDetailedSalesReportOut, KgDetailedSalesRow, SubscriptionReportOut, SubscriptionStatusRow
@@ -20,7 +20,7 @@ router = APIRouter()
 def get_subscriptions(
     branch_id: PyUUID,
     search: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     rows = service.get_subscription_statuses(db=db, branch_id=branch_id, search_term=search)
@@ -32,7 +32,7 @@ def daily_sales(
     branch_id: PyUUID,
     start_date: date,
     end_date: date,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     return service.daily_sales_totals(db=db, branch_id=branch_id, start_date=start_date, end_date=end_date)
@@ -43,7 +43,7 @@ def get_detailed_sales(
     branch_id: PyUUID,
     start_date: date,
     end_date: date,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     raw_rows = service.get_detailed_sales_report(db=db, branch_id=branch_id, start_date=start_date, end_date=end_date)
@@ -1,13 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import select
 from uuid import UUID
 from typing import cast
 
 from backend.app.db.session import get_db
-from backend.app.models.branch import Branch
 from backend.app.schemas.kg_student import KgStudentCreate, KgApplicationCreate, KgStudentOut
 from backend.app.services import kg_student_service as service
+from backend.app.services import reference_cache
 
 router = APIRouter()
 
@@ -16,7 +15,7 @@ def submit_kg_application(
     application_in: KgApplicationCreate,
     db: Session = Depends(get_db)
 ):
-    qal_branch = db.execute(select(Branch).where(Branch.code == 'QAL')).scalar_one_or_none()
+    qal_branch = reference_cache.branch_by_code(db, 'QAL')
     if not qal_branch:
         raise HTTPException(status_code=500, detail="Qaliub branch not configured in the system.")
     
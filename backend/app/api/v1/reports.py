@@ -1,33 +1,31 @@
-from datetime import datetime, date, timedelta, timezone
-from zoneinfo import ZoneInfo
+from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import cast
 from uuid import UUID as PyUUID
 
-from backend.app.db.session import get_db
-from backend.app.models.branch import Branch
+from backend.app.db.session import get_async_read_db
 from backend.app.models.user import User
 from backend.app.schemas.report import BranchInventory, DailyActivity, DailySalesOut, DetailedSalesReportOut, DetailedSalesRow
 from backend.app.services import report_service
+from backend.app.utils.date_range import local_day_bounds, local_today
 from .auth import get_current_active_user
 
 router = APIRouter()
 
 @router.get("/branch-inventory", response_model=BranchInventory)
-def branch_inventory(
+async def branch_inventory(
     branch_code: str = Query(..., description="Branch code, e.g. CAI"),
     sku: str | None = Query(None, description="Optional SKU to filter"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    b = report_service.branch_by_code(db, branch_code)
+    b = await db.run_sync(report_service.branch_by_code, branch_code)
     if not b:
         raise HTTPException(status_code=404, detail="Branch not found")
     
     branch_id = cast(PyUUID, b.id)
-    payload = report_service.branch_inventory_snapshot(db, branch_id=branch_id, sku=sku)
+    payload = await db.run_sync(report_service.branch_inventory_snapshot, branch_id=branch_id, sku=sku)
     return {
         "branch_id": b.id,
         "branch_code": b.code,
@@ -35,23 +33,22 @@ def branch_inventory(
     }
 
 @router.get("/daily-activity", response_model=DailyActivity)
-def daily_activity(
+async def daily_activity(
     branch_code: str = Query(..., description="Branch code, e.g. CAI"),
     day: date | None = Query(None, description="YYYY-MM-DD; defaults to today"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    b = report_service.branch_by_code(db, branch_code)
+    b = await db.run_sync(report_service.branch_by_code, branch_code)
     if not b:
         raise HTTPException(status_code=404, detail="Branch not found")
 
     if day is None:
-        day = date.today()
-    start = datetime.combine(day, datetime.min.time())
-    end = start + timedelta(days=1)
+        day = local_today()
+    start, end = local_day_bounds(day)
 
     branch_id = cast(PyUUID, b.id)
-    sums = report_service.daily_branch_activity(db, branch_id=branch_id, start=start, end=end)
+    sums = await db.run_sync(report_service.daily_branch_activity, branch_id=branch_id, start=start, end=end)
     return {
         "branch_id": b.id,
         "branch_code": b.code,
@@ -61,17 +58,16 @@ def daily_activity(
     }
 
 @router.get("/daily-sales", response_model=DailySalesOut)
-def daily_sales(
+async def daily_sales(
     branch_code: str | None = Query(default=None),
     branch_id: PyUUID | None = Query(default=None),
     start_date: date | None = Query(default=None),
     end_date: date | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     if start_date is None:
-        cairo = ZoneInfo("Africa/Cairo")
-        today = datetime.now(timezone.utc).astimezone(cairo).date()
+        today = local_today()
         start_date = today
         end_date = today
 
@@ -79,32 +75,32 @@ def daily_sales(
         raise HTTPException(status_code=400, detail="Provide branch_code or branch_id")
     
     if not branch_id and branch_code:
-        b = db.execute(select(Branch.id).where(Branch.code == branch_code)).first()
+        b = await db.run_sync(report_service.branch_by_code, branch_code)
         if not b:
             raise HTTPException(status_code=404, detail="Branch not found")
-        branch_id = cast(PyUUID, b[0])
+        branch_id = cast(PyUUID, b.id)
 
     assert branch_id is not None
     assert start_date is not None
     assert end_date is not None
 
-    return report_service.daily_sales_totals(
-        db, 
-        branch_id=branch_id, 
+    return await db.run_sync(
+        report_service.daily_sales_totals,
+        branch_id=branch_id,
         start_date=start_date, 
         end_date=end_date
     )
 
 @router.get("/detailed-sales", response_model=DetailedSalesReportOut)
-def get_detailed_sales(
+async def get_detailed_sales(
     branch_id: PyUUID,
     start_date: date,
     end_date: date,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    raw_rows = report_service.get_detailed_sales_report(
-        db, branch_id=branch_id, start_date=start_date, end_date=end_date
+    raw_rows = await db.run_sync(
+        report_service.get_detailed_sales_report, branch_id=branch_id, start_date=start_date, end_date=end_date
     )
     validated_rows = [DetailedSalesRow.model_validate(row) for row in raw_rows]
 
@@ -5,9 +5,10 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 from sqlalchemy import and_, func, select, cast, String
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from backend.app.db.session import get_db
+from backend.app.db.session import get_async_db, get_db
 from backend.app.models.branch import Branch
 from backend.app.models.item import Item
 from backend.app.models.reservation import Reservation
@@ -15,7 +16,8 @@ from backend.app.models.student import Student
 from backend.app.models.sale import Sale
 from backend.app.schemas.reservation import ReservationCreate, ReservationOut, ReservationDetailOut
 from backend.app.services import reservation_service as rsvc
-from backend.app.utils.validators import normalize_phone
+from backend.app.utils.search import name_match
+from backend.app.utils.phone import phone_match
 from backend.app.services.reservation_service import (
     cancel_reservation,
     fulfill_reservation,
@@ -25,7 +27,7 @@ from backend.app.services.reservation_service import (
 )
 from backend.app.models.teacher import Teacher
 from backend.app.models.user import User
-from backend.app.schemas.pagination import PaginationParams
+from backend.app.schemas.pagination import PaginationParams, paginate
 from .auth import get_current_active_user
 
 router = APIRouter()
@@ -64,7 +66,7 @@ def create_reservation_route(payload: ReservationCreate, db: Session = Depends(g
     return rsvc.get_reservation_summary(db, reservation_id=res_id)
 
 @router.get("/search")
-def search_reservations(
+async def search_reservations(
     q: str | None = None,
     phone: str | None = None,
     branch_code: str | None = None,
@@ -74,7 +76,7 @@ def search_reservations(
     start_to: datetime | None = None,
     student_id: UUID | None = None,
     pg: PaginationParams = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ) -> dict[str, Any]:
     lower = func.lower(Reservation.hold_window)
@@ -110,7 +112,6 @@ def search_reservations(
         .join(Item, Item.id == Reservation.item_id)
         .join(Teacher, Teacher.id == Item.teacher_id, isouter=True)
         .join(Student, Student.id == Reservation.student_id, isouter=True)
-        .order_by(lower.desc())
     )
 
     conds = []
@@ -120,14 +121,11 @@ def search_reservations(
         conds.append(Branch.code == branch_code)
     if sku:
         conds.append(Item.sku == sku)
-    if q:
-        conds.append(Student.full_name.ilike(f"%{q}%"))
+    match = name_match(Student.name_search, q) if q else None
+    if match is not None:
+        conds.append(match)
     if phone:
-        try:
-            conds.append(Student.phone_norm == normalize_phone(phone))
-        except Exception:
-            p = f"%{phone}%"
-            conds.append(Student.phone.ilike(p))
+        conds.append(phone_match(Student.phone_norm, phone))
     if start_from:
         conds.append(lower >= start_from)
     if start_to:
@@ -138,9 +136,8 @@ def search_reservations(
     if conds:
         stmt = stmt.where(and_(*conds))
 
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total = db.execute(count_stmt).scalar() or 0
-    rows = db.execute(stmt.offset(pg.offset).limit(pg.limit)).all()
+    # Newest hold window first, reservations without one (queued) before all.
+    rows, meta = await db.run_sync(paginate, stmt, pg, lower.is_(None).desc(), lower.desc(), Reservation.id.desc())
 
     items = [
         dict(
@@ -168,7 +165,7 @@ def search_reservations(
         )
         for r in rows
     ]
-    return {"items": items, "total": total, "offset": pg.offset, "limit": pg.limit, "has_more": pg.offset + pg.limit < total}
+    return {"items": items, **meta}
 
 @router.get("/{reservation_id}", response_model=ReservationDetailOut)
 def get_res(reservation_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
@@ -228,8 +225,8 @@ def fulfill_res(reservation_id: UUID, db: Session = Depends(get_db), current_use
 @router.post("/_maintenance/run-expire")
 def run_expire_now(db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     from backend.app.workers.jobs.expire_reservations import run as expire_run
-    n = expire_run(db)
-    return {"expired": n}
+    result = expire_run(db)
+    return {"expired": result["expired"], "batches": result["batches"]}
 
 @router.post("/{reservation_id}/unfulfill")
 def unfulfill_reservation_route(reservation_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import insert, select, func
+from sqlalchemy import insert, select
 
 from backend.app.db.session import get_db
 from backend.app.models.school import School
 from backend.app.schemas.school import SchoolCreate, SchoolOut
 
 from backend.app.models.user import User
-from backend.app.schemas.pagination import PaginationParams
+from backend.app.schemas.pagination import PaginationParams, paginate
+from backend.app.services import reference_cache
 from .auth import get_current_active_user
 
 router = APIRouter()
@@ -20,6 +21,7 @@ def create_school(body: SchoolCreate, db: Session = Depends(get_db), current_use
     row = db.execute(
         insert(School).values(name=body.name, city=body.city).returning(School)
     ).scalar_one()
+    reference_cache.invalidate(db, reference_cache.SCHOOLS)
     db.commit()
     return row
 
@@ -30,6 +32,5 @@ def list_schools(
     current_user: User = Depends(get_current_active_user),
 ):
     q = select(School)
-    total = db.execute(select(func.count()).select_from(q.subquery())).scalar() or 0
-    rows = db.execute(q.order_by(School.name).offset(pg.offset).limit(pg.limit)).scalars().all()
-    return {"items": rows, "total": total, "offset": pg.offset, "limit": pg.limit, "has_more": pg.offset + pg.limit < total}
\ No newline at end of file
+    rows, meta = paginate(db, q, pg, School.name, School.id, scalars=True)
+    return {"items": rows, **meta}
\ No newline at end of file
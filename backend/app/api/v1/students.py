@@ -1,25 +1,21 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy import select, or_, func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from backend.app.db.session import get_db
+from backend.app.db.session import get_async_db, get_db
 from backend.app.models.student import Student
 from backend.app.models.user import User
 from backend.app.schemas.student import StudentCreate, StudentUpdate, StudentOut
-from backend.app.schemas.pagination import PaginationParams
+from backend.app.schemas.pagination import PaginationParams, paginate
 from typing import Optional, cast
 from uuid import UUID
 from backend.app.services import student_service as service
+from backend.app.utils.phone import phone_key, phone_match
+from backend.app.utils.search import name_match, name_rank
 from .auth import get_current_active_user
 
 router = APIRouter()
 
-def _to_phone_norm(e164: str | None) -> str | None:
-    if not e164:
-        return None
-    if e164.startswith("+20"):
-        return "0" + e164[3:]
-    return e164
-
 @router.post("", response_model=StudentOut, status_code=201)
 def create_student(payload: StudentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     try:
@@ -29,33 +25,32 @@ def create_student(payload: StudentCreate, db: Session = Depends(get_db), curren
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/search")
-def search_students(
+async def search_students(
     q: str | None = None,
     phone: str | None = None,
     parent_phone: str | None = None,
     public_id: int | None = None,
     pg: PaginationParams = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
     stmt = select(Student)
 
     if public_id is not None:
         stmt = stmt.where(Student.public_id == public_id)
+    # Full numbers match exactly, shorter input as the last digits; see utils.phone.
     if phone:
-        phone_e164 = phone if phone.startswith("+20") else (f"+20{phone[1:]}" if phone.startswith("0") else phone)
-        phone_norm = _to_phone_norm(phone_e164 if phone_e164.startswith("+20") else phone)
-        stmt = stmt.where(or_(Student.phone == phone_e164, Student.phone_norm == phone_norm))
+        stmt = stmt.where(phone_match(Student.phone_norm, phone))
     if parent_phone:
-        p_e164 = parent_phone if parent_phone.startswith("+20") else (f"+20{parent_phone[1:]}" if parent_phone.startswith("0") else parent_phone)
-        p_norm = _to_phone_norm(p_e164 if p_e164.startswith("+20") else parent_phone)
-        stmt = stmt.where(or_(Student.parent_phone == p_e164, Student.parent_phone_norm == p_norm))
-    if q:
-        stmt = stmt.where(func.lower(Student.full_name).like(f"%{q.lower()}%"))
+        stmt = stmt.where(phone_match(Student.parent_phone_norm, parent_phone))
+    order_by = [Student.full_name, Student.id]
+    match = name_match(Student.name_search, q) if q else None
+    if match is not None:
+        stmt = stmt.where(match)
+        order_by.insert(0, name_rank(Student.name_search, q).desc())
 
-    total = db.execute(select(func.count()).select_from(stmt.subquery())).scalar() or 0
-    rows = db.execute(stmt.order_by(Student.full_name).offset(pg.offset).limit(pg.limit)).scalars().all()
-    return {"items": rows, "total": total, "offset": pg.offset, "limit": pg.limit, "has_more": pg.offset + pg.limit < total}
+    rows, meta = await db.run_sync(paginate, stmt, pg, *order_by, scalars=True)
+    return {"items": rows, **meta}
 
 @router.put("/{student_id}", response_model=StudentOut)
 def update_student(student_id: UUID, payload: StudentUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
@@ -65,12 +60,10 @@ def update_student(student_id: UUID, payload: StudentUpdate, db: Session = Depen
 
     data = payload.model_dump()
 
-    phone_e164 = data.get("phone")
-    parent_e164 = data.get("parent_phone")
     st.phone = data["phone"]
-    setattr(st, "phone_norm", _to_phone_norm(cast(Optional[str], st.phone)))
+    setattr(st, "phone_norm", phone_key(cast(Optional[str], st.phone)))
     setattr(st, "parent_phone", data.get("parent_phone"))
-    setattr(st, "parent_phone_norm", _to_phone_norm(cast(Optional[str], st.parent_phone)))
+    setattr(st, "parent_phone_norm", phone_key(cast(Optional[str], st.parent_phone)))
     st.full_name = data["full_name"]
     st.school_id = data["school_id"]
     st.gender = data["gender"]
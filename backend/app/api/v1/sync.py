@@ -1,3 +1,5 @@
+import time
+from itertools import groupby
 from uuid import UUID
 from typing import Any
 
@@ -6,8 +8,12 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from backend.app.models.reservation import Reservation
-from backend.app.models.item import Item
-from backend.app.services.inventory_service import get_inventory_summary
+from backend.app.core import metrics
+from backend.app.core.cache import OUTER_SESSION
+from backend.app.services.allocation_service import lock_pairs
+from backend.app.services.inventory_service import get_inventory_summary, get_pair_summaries
+from backend.app.services.op_log_service import claim_op, get_replays, record_op, remember_op
+from backend.app.services import reference_cache
 from backend.app.db.session import get_db
 from backend.app.models.user import User
 from .auth import get_current_active_user
@@ -18,6 +24,8 @@ from backend.app.services.reservation_service import (
     cancel_reservation,
     fulfill_reservation,
     get_reservation_summary,
+    cancel_reservations_bulk,
+    fulfill_reservations_bulk,
 )
 
 router = APIRouter()
@@ -42,12 +50,10 @@ def _resolve_pricing(db: Session, *, item_id: UUID, payload: dict[str, Any]) ->
     if "unit_price_cents" in payload and payload["unit_price_cents"] is not None:
         unit_price_cents = int(payload["unit_price_cents"])
     else:
-        unit_price_cents = db.execute(
-            select(Item.default_price_cents).where(Item.id == item_id)
-        ).scalar_one_or_none()
-        if unit_price_cents is None:
+        item = reference_cache.item(db, item_id)
+        if item is None:
             raise HTTPException(status_code=400, detail="Unknown item_id (no price found)")
-        unit_price_cents = int(unit_price_cents)
+        unit_price_cents = item.default_price_cents
 
     prepaid_cents = int(payload.get("prepaid_cents") or 0)
     if prepaid_cents < 0:
@@ -136,25 +142,226 @@ _OPS = {
     "reservation.fulfill": _op_reservation_fulfill,
 }
 
-@router.post("/batch")
-def sync_batch(body: dict[str, Any], db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)) -> dict[str, Any]:
-    ops = body.get("operations") or []
-    results: list[dict[str, Any]] = []
+def _bulk_reservation_cancel(db: Session, payloads: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    cancel_reservations_bulk(db, reservation_ids=[_uuid(p, "reservation_id") for p in payloads])
+    return [{"cancelled": True} for _ in payloads]
+
+def _bulk_reservation_fulfill(db: Session, payloads: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return fulfill_reservations_bulk(db, reservation_ids=[_uuid(p, "reservation_id") for p in payloads])
 
+# Set-based variants used by atomic mode for runs of consecutive same-kind ops.
+_BULK_OPS = {
+    "reservation.cancel": _bulk_reservation_cancel,
+    "reservation.fulfill": _bulk_reservation_fulfill,
+}
+
+_OP_SECONDS = {name: metrics.SYNC_OP_SECONDS.labels(name) for name in _OPS}
+_BATCH_OPS = {mode: metrics.SYNC_BATCH_OPS.labels(mode) for mode in ("sequential", "atomic")}
+
+def _touched_pairs(db: Session, ops: list[dict[str, Any]]) -> list[tuple[UUID, UUID]]:
+    """(branch_id, item_id) pairs the batch will touch, resolved with one query."""
+    pairs: set[tuple[UUID, UUID]] = set()
+    res_ids: set[UUID] = set()
     for entry in ops:
-        op_id = entry.get("id")
-        opname = entry.get("op")
         payload = entry.get("payload") or {}
         try:
-            handler = _OPS[opname]
-        except KeyError:
-            results.append({"id": op_id, "ok": False, "result": None, "error": f"unknown op: {opname}"})
+            if payload.get("reservation_id"):
+                res_ids.add(UUID(payload["reservation_id"]))
+            elif payload.get("branch_id") and payload.get("item_id"):
+                pairs.add((UUID(payload["branch_id"]), UUID(payload["item_id"])))
+        except (TypeError, ValueError):
             continue
+    if res_ids:
+        rows = db.execute(
+            select(Reservation.branch_id, Reservation.item_id).where(Reservation.id.in_(res_ids))
+        ).all()
+        pairs.update((r.branch_id, r.item_id) for r in rows)
+    return sorted(pairs, key=lambda p: (str(p[0]), str(p[1])))
 
-        try:
-            out = handler(db, payload)
-            results.append({"id": op_id, "ok": True, "result": out, "error": None})
-        except Exception as e:
-            results.append({"id": op_id, "ok": False, "result": None, "error": str(e)})
+def _run_op(db: Session, entry: dict[str, Any]) -> dict[str, Any]:
+    op_id = entry.get("id")
+    opname = entry.get("op")
+    payload = entry.get("payload") or {}
+    try:
+        handler = _OPS[opname]
+    except KeyError:
+        return {"id": op_id, "ok": False, "result": None, "error": f"unknown op: {opname}"}
+
+    t0 = time.perf_counter()
+    try:
+        out = handler(db, payload)
+        return {"id": op_id, "ok": True, "result": out, "error": None}
+    except Exception as e:
+        return {"id": op_id, "ok": False, "result": None, "error": str(e)}
+    finally:
+        _OP_SECONDS[opname].observe(time.perf_counter() - t0)
+
+def _op_uuid(entry: dict[str, Any]) -> UUID | None:
+    try:
+        return UUID(str(entry.get("id")))
+    except (TypeError, ValueError):
+        return None
+
+def _replayed(entry: dict[str, Any], response: Any) -> dict[str, Any]:
+    return {"id": entry.get("id"), "ok": True, "result": response, "error": None, "replayed": True}
+
+def _log_op(db: Session, entry: dict[str, Any], result: dict[str, Any]) -> Any:
+    """Write the op's outcome to op_log (ops without a UUID id are not logged)."""
+    op_id = _op_uuid(entry)
+    if op_id is None:
+        return None
+    return record_op(
+        db,
+        op_id=op_id,
+        op_type=str(entry.get("op")),
+        request=entry,
+        response=result["result"],
+        error=result["error"],
+    )
+
+def _savepoint_session(db: Session) -> Session:
+    """
+    A session on db's transaction whose commits only release a savepoint,
+    so handlers that commit can run inside a larger transaction.
+    """
+    return Session(
+        bind=db.connection(),
+        join_transaction_mode="create_savepoint",
+        info={OUTER_SESSION: db},  # cache invalidations wait for db's commit
+    )
 
+def _run_sequential(db: Session, ops: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Run ops one by one, each committing on its own. Ops whose id already
+    completed (op_log / replay cache) return the stored response instead of
+    running again.
+
+    An op with a UUID id is first claimed in op_log (claim_op) and runs in a
+    savepoint of the claiming transaction, so its effects and its op_log
+    outcome commit together. A concurrent retry of the same id waits on the
+    claim and then replays the stored response.
+    """
+    replays = get_replays(db, [i for i in map(_op_uuid, ops) if i])
+    results: list[dict[str, Any]] = []
+    for entry in ops:
+        op_id = _op_uuid(entry)
+        if op_id in replays:
+            results.append(_replayed(entry, replays[op_id]))
+            continue
+        if op_id is None:
+            result = _run_op(db, entry)
+            if not result["ok"]:
+                db.rollback()
+            results.append(result)
+            continue
+
+        stored = claim_op(db, op_id=op_id, op_type=str(entry.get("op")), request=entry)
+        if stored is None:
+            op_db = _savepoint_session(db)
+            try:
+                result = _run_op(op_db, entry)
+                if result["ok"]:
+                    op_db.commit()
+                else:
+                    op_db.rollback()
+            finally:
+                op_db.close()
+            stored = _log_op(db, entry, result)
+        else:
+            result = _replayed(entry, stored)
+        db.commit()
+        if result["ok"]:
+            remember_op(op_id, stored)
+            replays[op_id] = stored
+        results.append(result)
     return {"results": results}
+
+def _run_atomic(db: Session, ops: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Run the whole batch in the request's transaction. Ops run in a session
+    joined with join_transaction_mode="create_savepoint", so the handlers'
+    own commits only release a per-op savepoint and a failing op rolls back
+    alone. Consecutive ops of a kind in _BULK_OPS run as one set-based call
+    (falling back to op-by-op if it fails). Advisory locks for every
+    touched (branch, item) are taken once, in sorted order, up front;
+    inventory summaries come from one query after the final commit.
+    Each op id is claimed in op_log (claim_op) before it runs, so a
+    concurrent batch retrying it waits for this transaction and replays it;
+    already-completed ids are replayed, and each op's outcome is written
+    inside its own savepoint.
+    """
+    ops_db = _savepoint_session(db)
+    results: list[dict[str, Any] | None] = [None] * len(ops)
+    completed: dict[UUID, Any] = {}
+    try:
+        replays = get_replays(ops_db, [i for i in map(_op_uuid, ops) if i])
+        pairs = _touched_pairs(ops_db, ops)
+        lock_pairs(ops_db, pairs)
+        ops_db.commit()
+
+        for opname, group in groupby(enumerate(ops), key=lambda e: e[1].get("op")):
+            run = []
+            for idx, entry in group:
+                op_id = _op_uuid(entry)
+                if op_id is not None and op_id not in replays:
+                    stored = claim_op(ops_db, op_id=op_id, op_type=str(opname), request=entry)
+                    if stored is not None:
+                        replays[op_id] = stored
+                if op_id in replays:
+                    results[idx] = _replayed(entry, replays[op_id])
+                else:
+                    run.append((idx, entry))
+            # Keep the claims when a bulk attempt below rolls back.
+            ops_db.commit()
+
+            bulk = _BULK_OPS.get(opname)
+            if bulk and len(run) > 1:
+                try:
+                    t0 = time.perf_counter()
+                    outs = bulk(ops_db, [e.get("payload") or {} for _, e in run])
+                    per_op = (time.perf_counter() - t0) / len(run)
+                    for _ in run:
+                        _OP_SECONDS[opname].observe(per_op)
+                    done = {}
+                    for (idx, entry), out in zip(run, outs):
+                        results[idx] = {"id": entry.get("id"), "ok": True, "result": out, "error": None}
+                        op_id = _op_uuid(entry)
+                        if op_id is not None:
+                            done[op_id] = _log_op(ops_db, entry, results[idx])
+                    ops_db.commit()
+                    completed.update(done)
+                    replays.update(done)
+                    continue
+                except Exception:
+                    ops_db.rollback()
+
+            for idx, entry in run:
+                op_id = _op_uuid(entry)
+                if op_id in replays:
+                    results[idx] = _replayed(entry, replays[op_id])
+                    continue
+                result = _run_op(ops_db, entry)
+                if not result["ok"]:
+                    ops_db.rollback()
+                stored = _log_op(ops_db, entry, result)
+                ops_db.commit()
+                if result["ok"] and op_id is not None:
+                    completed[op_id] = stored
+                    replays[op_id] = stored
+                results[idx] = result
+    finally:
+        ops_db.close()
+
+    db.commit()
+    for op_id, stored in completed.items():
+        remember_op(op_id, stored)
+    return {"results": results, "inventory": get_pair_summaries(db, pairs)}
+
+@router.post("/batch")
+def sync_batch(body: dict[str, Any], db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)) -> dict[str, Any]:
+    ops = body.get("operations") or []
+    if body.get("mode") == "atomic":
+        _BATCH_OPS["atomic"].observe(len(ops))
+        return _run_atomic(db, ops)
+    _BATCH_OPS["sequential"].observe(len(ops))
+    return _run_sequential(db, ops)
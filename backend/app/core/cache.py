@@ -0,0 +1,113 @@
+"""Small in-process caches shared by services."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe, size-bounded least-recently-used mapping."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = max(int(maxsize), 1)
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class TTLCache:
+    """
+    LRUCache whose entries expire `ttl` seconds after being stored, with
+    hit/miss counters. ttl <= 0 disables caching (every get is a miss).
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256, clock=time.monotonic):
+        self.ttl = float(ttl)
+        self._clock = clock
+        self._data = LRUCache(maxsize)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is not None and entry[0] <= self._clock():
+            self._data.pop(key)
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        self._data.put(key, (self._clock() + self.ttl, value))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "ttl_seconds": self.ttl}
+
+
+# Session.info key naming an outer session that owns this one's commit
+# hooks. A session joined to an outer transaction with savepoints (sync
+# atomic mode) "commits" by releasing a savepoint, so its cache
+# invalidations must wait for the outer session's real commit.
+OUTER_SESSION = "outer_session"
+
+
+def pop_committed(session, key: str) -> set | None:
+    """
+    For after_commit hooks: pop the dirty set stored under `key` and return
+    it for processing. When `session` has an OUTER_SESSION, the set is
+    merged into that session's info instead and None is returned.
+    """
+    dirty = session.info.pop(key, None)
+    outer = session.info.get(OUTER_SESSION)
+    if dirty and outer is not None:
+        outer.info.setdefault(key, set()).update(dirty)
+        return None
+    return dirty
@@ -12,6 +12,8 @@ from uuid import uuid4
 from fastapi import FastAPI, Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 
+from backend.app.core import query_profiler
+
 
 class JSONFormatter(logging.Formatter):
     """Emit each log record as a single JSON line."""
@@ -28,13 +30,26 @@ class JSONFormatter(logging.Formatter):
         }
         if hasattr(record, "request_id"):
             log_entry["request_id"] = record.request_id
+        if hasattr(record, "db"):
+            log_entry["db"] = record.db
         if record.exc_info and record.exc_info[0] is not None:
             log_entry["exception"] = self.formatException(record.exc_info)
         return json.dumps(log_entry, default=str)
 
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Attach a request_id to every request and log request/response."""
+    """
+    Attach a request_id to every request and log request/response. With
+    profile_queries the response log line also carries the request's SQL
+    profile (see core.query_profiler) and X-DB-Queries / X-DB-Time headers
+    are set; fingerprints repeated repeat_threshold times or more are
+    logged as a warning with their SQL.
+    """
+
+    def __init__(self, app, profile_queries: bool = False, repeat_threshold: int = 10):
+        super().__init__(app)
+        self.profile_queries = profile_queries
+        self.repeat_threshold = repeat_threshold
 
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
         request_id = request.headers.get("X-Request-ID", str(uuid4())[:8])
@@ -50,17 +65,46 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
 
         import time
         t0 = time.perf_counter()
-        response = await call_next(request)
+        token = query_profiler.start() if self.profile_queries else None
+        try:
+            response = await call_next(request)
+        finally:
+            profile = query_profiler.stop(token) if token is not None else None
         ms = round((time.perf_counter() - t0) * 1000)
 
-        logger.info(
-            "%s %s -> %s (%dms)",
-            request.method,
-            request.url.path,
-            response.status_code,
-            ms,
-            extra={"request_id": request_id},
-        )
+        extra = {"request_id": request_id}
+        if profile is None:
+            logger.info(
+                "%s %s -> %s (%dms)",
+                request.method,
+                request.url.path,
+                response.status_code,
+                ms,
+                extra=extra,
+            )
+        else:
+            extra["db"] = profile.summary()
+            logger.info(
+                "%s %s -> %s (%dms, %d queries, %.1fms db)",
+                request.method,
+                request.url.path,
+                response.status_code,
+                ms,
+                profile.count,
+                profile.total_ms,
+                extra=extra,
+            )
+            repeated = profile.repeated(self.repeat_threshold)
+            if repeated:
+                logger.warning(
+                    "%s %s repeated queries (N+1?): %s",
+                    request.method,
+                    request.url.path,
+                    "; ".join(f"{r['count']}x {r['sql']}" for r in repeated),
+                    extra={"request_id": request_id, "db": {"repeated": repeated, "slowest_sql": profile.slowest_sql}},
+                )
+            response.headers["X-DB-Queries"] = str(profile.count)
+            response.headers["X-DB-Time"] = f"{profile.total_ms:.1f}"
         response.headers["X-Request-ID"] = request_id
         return response
 
@@ -85,5 +129,7 @@ def setup_logging(app_env: str = "dev") -> None:
     logger.info("Logging initialized (level=%s, env=%s)", logging.getLevelName(log_level), app_env)
 
 
-def register_logging_middleware(app: FastAPI) -> None:
-    app.add_middleware(RequestLoggingMiddleware)
+def register_logging_middleware(app: FastAPI, profile_queries: bool = False, repeat_threshold: int = 10) -> None:
+    if profile_queries:
+        query_profiler.install()
+    app.add_middleware(RequestLoggingMiddleware, profile_queries=profile_queries, repeat_threshold=repeat_threshold)
@@ -0,0 +1,171 @@
+"""
+Prometheus metrics, on prometheus_client.
+
+Metrics are declared once, at import, below, and their label children are
+bound ahead of time (prepare_routes, the sync module), so instrumented hot
+paths only look up a child. Scrape-time values (pool occupancy, cache
+counters, database state) come from the collectors in
+services/metrics_service.py, added with register_collector().
+
+Gunicorn workers share one port: run them with PROMETHEUS_MULTIPROC_DIR
+set (and emptied before the server starts), and render() aggregates every
+worker's values with MultiProcessCollector. Background workers are single
+processes serving their own registry with serve(port), one port each.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.registry import Collector
+
+logger = logging.getLogger("eltafawook.metrics")
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# Seconds; suits HTTP handlers and DB-bound jobs alike.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_collectors: list[Collector] = []
+
+
+def register_collector(collector: Collector) -> None:
+    """Add a scrape-time collector (idempotent)."""
+    if collector not in _collectors:
+        _collectors.append(collector)
+        REGISTRY.register(collector)
+
+
+def render() -> bytes:
+    if not MULTIPROCESS:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in _collectors:
+        registry.register(collector)
+    return generate_latest(registry)
+
+
+def serve(port: int) -> Any:
+    """
+    Serve this process's metrics on `port` from a daemon thread (for worker
+    processes). A port that cannot be bound (e.g. taken by another worker)
+    is logged and the worker carries on without a metrics endpoint.
+    """
+    try:
+        server, _ = start_http_server(port)
+    except OSError:
+        logger.warning("cannot serve metrics on port %s; metrics endpoint disabled", port, exc_info=True)
+        return None
+    return server
+
+
+# ── Declarations ──
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "eltafawook_http_request_duration_seconds",
+    "Time to produce a response, by route template.",
+    ("method", "route"),
+    buckets=DEFAULT_BUCKETS,
+)
+HTTP_REQUESTS = Counter(
+    "eltafawook_http_requests",
+    "Responses by route template and status class.",
+    ("method", "route", "status"),
+)
+EXPIRY_RUN_SECONDS = Histogram(
+    "eltafawook_reservation_expiry_duration_seconds",
+    "Duration of one expire_reservations run (all batches).",
+    buckets=DEFAULT_BUCKETS,
+)
+EXPIRY_ROWS = Counter(
+    "eltafawook_reservation_expiry_rows",
+    "Reservations expired by the expiry job.",
+)
+SYNC_BATCH_OPS = Histogram(
+    "eltafawook_sync_batch_operations",
+    "Operations per /sync/batch request, by mode.",
+    ("mode",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+SYNC_OP_SECONDS = Histogram(
+    "eltafawook_sync_op_duration_seconds",
+    "Time to apply one /sync/batch operation, by op (bulk runs count their mean per op).",
+    ("op",),
+    buckets=DEFAULT_BUCKETS,
+)
+
+_STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+UNMATCHED = "unmatched"
+
+
+class _RouteSeries:
+    __slots__ = ("seconds", "by_status")
+
+    def __init__(self, method: str, route: str):
+        self.seconds = HTTP_REQUEST_SECONDS.labels(method, route)
+        self.by_status = tuple(HTTP_REQUESTS.labels(method, route, c) for c in _STATUS_CLASSES)
+
+
+_route_series: dict[tuple[str, str], _RouteSeries] = {}
+
+
+def prepare_routes(routes: Iterable[Any]) -> None:
+    """Create the series of every (method, path template) in `routes` up front."""
+    for route in routes:
+        path = getattr(route, "path", None)
+        for method in getattr(route, "methods", None) or ():
+            if path is not None and (method, path) not in _route_series:
+                _route_series[(method, path)] = _RouteSeries(method, path)
+
+
+def _series(method: str, path: str | None) -> _RouteSeries:
+    s = _route_series.get((method, path)) if path is not None else None
+    if s is None:
+        # Unknown paths share one series so scanners cannot add label values.
+        s = _route_series.get((method, UNMATCHED))
+        if s is None:
+            s = _route_series.setdefault((method, UNMATCHED), _RouteSeries(method, UNMATCHED))
+    return s
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording HTTP_REQUEST_SECONDS / HTTP_REQUESTS per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def _send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            route = scope.get("route")
+            s = _series(scope["method"], getattr(route, "path", None))
+            s.seconds.observe(time.perf_counter() - t0)
+            s.by_status[min(max(status // 100, 1), 5) - 1].inc()
@@ -0,0 +1,110 @@
+"""
+Per-request SQL profiling (opt-in with QUERY_PROFILE=true).
+
+Engine cursor events add every statement a request runs to that request's
+QueryProfile: statement count, total time in the database, the slowest
+statement, and a count per fingerprint (the SQL with parameters, literals
+and IN lists folded). A fingerprint that repeats QUERY_PROFILE_REPEAT_THRESHOLD
+times or more in one request is an N+1 pattern, e.g. a per-row loop issuing
+the same SELECT with different ids.
+
+The profile lives in a ContextVar, so it follows the request into the
+threadpool (sync routes) and into SQLAlchemy's greenlets (async routes).
+Statements run while a StreamingResponse body is sent, after the handler
+has returned, are not counted.
+"""
+from __future__ import annotations
+
+import re
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_current: ContextVar[QueryProfile | None] = ContextVar("query_profile", default=None)
+_installed = False
+
+_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+|\?|:\w+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """`statement` with whitespace collapsed and every value replaced by `?`."""
+    s = _STRING.sub("?", statement)
+    s = _PARAM.sub("?", s)
+    s = _NUMBER.sub("?", s)
+    s = _LIST.sub("(?+)", s)
+    return _SPACES.sub(" ", s).strip()
+
+
+@dataclass
+class QueryProfile:
+    count: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_sql: str | None = None
+    # fingerprint -> [executions, total ms]
+    by_fingerprint: dict[str, list] = field(default_factory=dict)
+
+    def record(self, statement: str, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.slowest_ms:
+            self.slowest_ms, self.slowest_sql = ms, statement
+        entry = self.by_fingerprint.setdefault(fingerprint(statement), [0, 0.0])
+        entry[0] += 1
+        entry[1] += ms
+
+    def repeated(self, threshold: int) -> list[dict[str, Any]]:
+        """Fingerprints executed at least `threshold` times, most frequent first."""
+        hits = [
+            {"sql": fp, "count": n, "total_ms": round(ms, 2)}
+            for fp, (n, ms) in self.by_fingerprint.items() if n >= threshold
+        ]
+        return sorted(hits, key=lambda h: -h["count"])
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "queries": self.count,
+            "db_ms": round(self.total_ms, 2),
+            "slowest_ms": round(self.slowest_ms, 2),
+            "distinct_queries": len(self.by_fingerprint),
+        }
+
+
+def start() -> Token:
+    """Begin profiling the current context; pass the token to stop()."""
+    return _current.set(QueryProfile())
+
+
+def stop(token: Token) -> QueryProfile:
+    profile = _current.get()
+    _current.reset(token)
+    return profile
+
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._query_profile_t0 = time.perf_counter()
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    t0 = getattr(context, "_query_profile_t0", None)
+    if profile is not None and t0 is not None:
+        profile.record(statement, (time.perf_counter() - t0) * 1000)
+
+
+def install() -> None:
+    """Listen on every Engine (sync, async and replica). Idempotent."""
+    global _installed
+    if not _installed:
+        event.listen(Engine, "before_cursor_execute", _before)
+        event.listen(Engine, "after_cursor_execute", _after)
+        _installed = True
@@ -0,0 +1,110 @@
+from __future__ import annotations
+import logging
+import time
+
+import psycopg
+
+from sqlalchemy.engine import make_url
+
+from backend.app.core.config import settings
+from backend.app.db.session import engine
+
+logger = logging.getLogger("eltafawook.events")
+
+# Postgres NOTIFY channel fed by the triggers in migration 7a3f0c2d9e14.
+# Payloads: 'outbox' when messages are queued, 'reservation:<status>' when a
+# reservation changes status, 'refdata:<table>' when branches/items/schools
+# change (migration e91c4a7d3b02).
+CHANNEL = "eltafawook_events"
+
+# After the first notification, keep collecting for this long so a burst
+# (e.g. a bulk allocation) wakes the worker once.
+COALESCE_SECONDS = 0.1
+
+# How often a Listener whose connection dropped tries to reopen it.
+RETRY_SECONDS = 5.0
+
+
+def listen(channel: str = CHANNEL) -> psycopg.Connection:
+    """
+    Open a dedicated autocommit connection (outside the pool) LISTENing on
+    `channel`. LISTEN is session state, so behind PgBouncer in transaction
+    mode this must go to the server directly: DATABASE_DIRECT_URL.
+    """
+    base = make_url(settings.database_direct_url) if settings.database_direct_url else engine.url
+    url = base.set(drivername="postgresql").render_as_string(hide_password=False)
+    conn = psycopg.connect(url, autocommit=True)
+    conn.execute(f'LISTEN "{channel}"')
+    return conn
+
+
+def wait(conn: psycopg.Connection, timeout: float | None) -> set[str]:
+    """
+    Block until a notification arrives or `timeout` seconds pass (None waits
+    forever). Returns the distinct payloads received; empty on timeout.
+    """
+    payloads: set[str] = set()
+    if timeout is not None and timeout <= 0:
+        return payloads
+    for n in conn.notifies(timeout=timeout, stop_after=1):
+        payloads.add(n.payload)
+    if payloads:
+        deadline = time.monotonic() + COALESCE_SECONDS
+        for n in conn.notifies(timeout=COALESCE_SECONDS):
+            payloads.add(n.payload)
+            if time.monotonic() >= deadline:
+                break
+    return payloads
+
+
+class Listener:
+    """
+    A LISTEN connection for long-running workers that survives Postgres
+    restarts, failovers and idle-timeout drops. While connected, wait() is
+    the module-level wait(). When the connection fails it is closed and
+    reopened every `retry_seconds`; wait() then returns empty once
+    `timeout` passes or the connection is back (notifications sent while it
+    was down are lost), so callers fall back to their timer and rescan.
+    """
+
+    def __init__(self, channel: str = CHANNEL, retry_seconds: float = RETRY_SECONDS):
+        self.channel = channel
+        self.retry_seconds = retry_seconds
+        self.conn: psycopg.Connection | None = None
+        self._connect()
+
+    @property
+    def connected(self) -> bool:
+        return self.conn is not None
+
+    def _connect(self) -> bool:
+        try:
+            self.conn = listen(self.channel)
+        except psycopg.Error:
+            logger.warning("LISTEN connect failed; retrying in %ss", self.retry_seconds, exc_info=True)
+            return False
+        return True
+
+    def wait(self, timeout: float | None) -> set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self.conn is not None:
+            try:
+                return wait(self.conn, timeout)
+            except psycopg.Error:
+                logger.warning("LISTEN connection lost; reconnecting", exc_info=True)
+                self.close()
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            time.sleep(self.retry_seconds if remaining is None else min(self.retry_seconds, remaining))
+            if self._connect():
+                return set()
+
+    def close(self) -> None:
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except psycopg.Error:
+                pass
+            self.conn = None
@@ -10,7 +10,8 @@ from backend.app.db.base import Base
 from backend.app.models import (
     branch, item, ledger, reservation, order, school, 
     student, teacher, user, adjustment, notify, op_log, sale,
-    kg_student, kg_items, kg_sale, kg_inventory_ledger
+    kg_student, kg_items, kg_sale, kg_inventory_ledger, stock_balance,
+    ledger_checkpoint, sales_rollup
 )
 
 config = context.config
@@ -0,0 +1,48 @@
+"""user_token_version
+
+Revision ID: 3b8e5d1f0a92
+Revises: e91c4a7d3b02
+Create Date: 2026-10-18 20:21:40.117853
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e5d1f0a92'
+down_revision: Union[str, Sequence[str], None] = 'e91c4a7d3b02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+    # Any change that should end existing sessions bumps the version, whatever
+    # wrote it (API, scripts/create_user.py, psql).
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_user_token_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.token_version := OLD.token_version + 1;
+            RETURN NEW;
+        END $$;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_users_token_version
+        BEFORE UPDATE ON users
+        FOR EACH ROW
+        WHEN (OLD.role IS DISTINCT FROM NEW.role
+              OR OLD.branch_id IS DISTINCT FROM NEW.branch_id
+              OR OLD.is_active IS DISTINCT FROM NEW.is_active
+              OR OLD.hashed_password IS DISTINCT FROM NEW.hashed_password)
+        EXECUTE FUNCTION bump_user_token_version();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_users_token_version ON users")
+    op.execute("DROP FUNCTION IF EXISTS bump_user_token_version()")
+    op.drop_column('users', 'token_version')
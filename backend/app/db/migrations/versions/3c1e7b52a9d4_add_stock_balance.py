@@ -0,0 +1,59 @@
+"""add_stock_balance
+
+Revision ID: 3c1e7b52a9d4
+Revises: 6a9589e740d3
+Create Date: 2026-10-18 09:12:41.507213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1e7b52a9d4'
+down_revision: Union[str, Sequence[str], None] = '6a9589e740d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stock_balance',
+        sa.Column('branch_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('branches.id', ondelete='RESTRICT'), primary_key=True),
+        sa.Column('item_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('items.id', ondelete='RESTRICT'), primary_key=True),
+        sa.Column('on_hand', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reserved', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('available', sa.Integer(), sa.Computed('on_hand - reserved', persisted=True)),
+        sa.Column('ledger_high_watermark', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('now()')),
+    )
+
+    op.execute("""
+        WITH ledger AS (
+            SELECT branch_id, item_id,
+                   COALESCE(SUM(qty) FILTER (WHERE event NOT IN ('reserve_hold','reserve_release')), 0) AS on_hand,
+                   MAX(id) AS high_watermark
+              FROM stock_ledger
+             GROUP BY branch_id, item_id
+        ),
+        res AS (
+            SELECT branch_id, item_id, SUM(qty) AS reserved
+              FROM reservations
+             WHERE status IN ('hold','active')
+             GROUP BY branch_id, item_id
+        )
+        INSERT INTO stock_balance (branch_id, item_id, on_hand, reserved, ledger_high_watermark)
+        SELECT branch_id, item_id,
+               COALESCE(l.on_hand, 0)::int,
+               COALESCE(r.reserved, 0)::int,
+               COALESCE(l.high_watermark, 0)
+          FROM ledger l
+          FULL OUTER JOIN res r USING (branch_id, item_id)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('stock_balance')
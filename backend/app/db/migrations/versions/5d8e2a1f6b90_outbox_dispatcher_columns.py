@@ -0,0 +1,35 @@
+"""outbox_dispatcher_columns
+
+Revision ID: 5d8e2a1f6b90
+Revises: c47a9e0b5d12
+Create Date: 2026-10-18 15:12:40.318275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8e2a1f6b90'
+down_revision: Union[str, Sequence[str], None] = 'c47a9e0b5d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('notification_outbox', sa.Column('claimed_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.add_column('notification_outbox', sa.Column('latency_ms', sa.Integer(), nullable=True))
+    op.create_index(
+        'ix_outbox_channel_pending',
+        'notification_outbox',
+        ['channel', 'created_at'],
+        postgresql_where=sa.text("state IN ('pending', 'sending')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_channel_pending', table_name='notification_outbox')
+    op.drop_column('notification_outbox', 'latency_ms')
+    op.drop_column('notification_outbox', 'claimed_at')
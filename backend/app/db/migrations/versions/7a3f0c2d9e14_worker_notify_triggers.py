@@ -0,0 +1,57 @@
+"""worker_notify_triggers
+
+Revision ID: 7a3f0c2d9e14
+Revises: e2b7c9d41a6f
+Create Date: 2026-10-18 16:20:37.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3f0c2d9e14'
+down_revision: Union[str, Sequence[str], None] = 'e2b7c9d41a6f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Statement-level for the outbox so a multi-row INSERT notifies once;
+    # Postgres also folds identical notifications within a transaction.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_outbox_queued() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify('eltafawook_events', 'outbox');
+            RETURN NULL;
+        END $$;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_outbox_notify
+        AFTER INSERT ON notification_outbox
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_outbox_queued();
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_reservation_status() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify('eltafawook_events', 'reservation:' || NEW.status);
+            RETURN NULL;
+        END $$;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_reservation_status_notify
+        AFTER UPDATE OF status ON reservations
+        FOR EACH ROW
+        WHEN (OLD.status IS DISTINCT FROM NEW.status)
+        EXECUTE FUNCTION notify_reservation_status();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_reservation_status_notify ON reservations")
+    op.execute("DROP FUNCTION IF EXISTS notify_reservation_status()")
+    op.execute("DROP TRIGGER IF EXISTS trg_outbox_notify ON notification_outbox")
+    op.execute("DROP FUNCTION IF EXISTS notify_outbox_queued()")
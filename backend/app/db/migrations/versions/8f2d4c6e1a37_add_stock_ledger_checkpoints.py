@@ -0,0 +1,120 @@
+"""add_stock_ledger_checkpoints
+
+Revision ID: 8f2d4c6e1a37
+Revises: 3c1e7b52a9d4
+Create Date: 2026-10-18 11:40:07.215480
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2d4c6e1a37'
+down_revision: Union[str, Sequence[str], None] = '3c1e7b52a9d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_OLD_VIEW = """
+    CREATE VIEW inventory_view AS
+    WITH onhand AS (
+      SELECT branch_id, item_id, COALESCE(SUM(qty), 0) AS on_hand
+      FROM stock_ledger
+      GROUP BY branch_id, item_id
+    ),
+    reserved AS (
+      SELECT branch_id, item_id, COALESCE(SUM(qty), 0) AS reserved
+      FROM reservations
+      WHERE status IN ('hold','active')
+      GROUP BY branch_id, item_id
+    )
+    SELECT
+      COALESCE(o.branch_id, r.branch_id) AS branch_id,
+      COALESCE(o.item_id,  r.item_id)    AS item_id,
+      COALESCE(o.on_hand, 0) AS on_hand,
+      COALESCE(r.reserved, 0) AS reserved,
+      (COALESCE(o.on_hand,0) - COALESCE(r.reserved,0)) AS available
+    FROM onhand o
+    FULL OUTER JOIN reserved r
+      ON r.branch_id=o.branch_id AND r.item_id=o.item_id;
+"""
+
+# on_hand = latest checkpoint + tail, physical events only (same rule as
+# inventory_service.on_hand).
+_NEW_VIEW = """
+    CREATE VIEW inventory_view AS
+    WITH cp AS (
+      SELECT id, as_of, ledger_high_watermark
+      FROM stock_ledger_checkpoints
+      ORDER BY as_of DESC
+      LIMIT 1
+    ),
+    ledger_src AS (
+      SELECT t.branch_id, t.item_id, t.event, t.qty
+      FROM stock_ledger_checkpoint_totals t
+      JOIN cp ON cp.id = t.checkpoint_id
+      UNION ALL
+      SELECT l.branch_id, l.item_id, l.event, l.qty
+      FROM stock_ledger l
+      LEFT JOIN cp ON true
+      WHERE cp.id IS NULL OR l.at >= cp.as_of OR l.id > cp.ledger_high_watermark
+    ),
+    onhand AS (
+      SELECT branch_id, item_id, COALESCE(SUM(qty), 0)::bigint AS on_hand
+      FROM ledger_src
+      WHERE event NOT IN ('reserve_hold','reserve_release')
+      GROUP BY branch_id, item_id
+    ),
+    reserved AS (
+      SELECT branch_id, item_id, COALESCE(SUM(qty), 0) AS reserved
+      FROM reservations
+      WHERE status IN ('hold','active')
+      GROUP BY branch_id, item_id
+    )
+    SELECT
+      COALESCE(o.branch_id, r.branch_id) AS branch_id,
+      COALESCE(o.item_id,  r.item_id)    AS item_id,
+      COALESCE(o.on_hand, 0) AS on_hand,
+      COALESCE(r.reserved, 0) AS reserved,
+      (COALESCE(o.on_hand,0) - COALESCE(r.reserved,0)) AS available
+    FROM onhand o
+    FULL OUTER JOIN reserved r
+      ON r.branch_id=o.branch_id AND r.item_id=o.item_id;
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stock_ledger_checkpoints',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('as_of', sa.TIMESTAMP(timezone=True), nullable=False, unique=True),
+        sa.Column('ledger_high_watermark', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('now()')),
+    )
+    op.create_table(
+        'stock_ledger_checkpoint_totals',
+        sa.Column('checkpoint_id', sa.BigInteger(), sa.ForeignKey('stock_ledger_checkpoints.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('branch_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('branches.id', ondelete='RESTRICT'), primary_key=True),
+        sa.Column('item_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('items.id', ondelete='RESTRICT'), primary_key=True),
+        sa.Column('event', postgresql.ENUM(name='stock_event', create_type=False), primary_key=True),
+        sa.Column('qty', sa.BigInteger(), nullable=False),
+    )
+    op.create_index('ix_stock_ledger_at', 'stock_ledger', ['at'])
+
+    op.execute("DROP VIEW IF EXISTS inventory_view;")
+    op.execute(_NEW_VIEW)
+    op.execute("GRANT SELECT ON inventory_view TO eltfawook;")
+
+
+def downgrade() -> None:
+    op.execute("DROP VIEW IF EXISTS inventory_view;")
+    op.execute(_OLD_VIEW)
+    op.execute("GRANT SELECT ON inventory_view TO eltfawook;")
+
+    op.drop_index('ix_stock_ledger_at', table_name='stock_ledger')
+    op.drop_table('stock_ledger_checkpoint_totals')
+    op.drop_table('stock_ledger_checkpoints')
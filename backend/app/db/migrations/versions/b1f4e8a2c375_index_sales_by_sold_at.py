@@ -0,0 +1,30 @@
+"""index_sales_by_sold_at
+
+Revision ID: b1f4e8a2c375
+Revises: 7a3f0c2d9e14
+Create Date: 2026-10-18 17:05:11.620348
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1f4e8a2c375'
+down_revision: Union[str, Sequence[str], None] = '7a3f0c2d9e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Date filters are now half-open ranges on the bare timestamp, so these
+    # serve branch reports (branch_id, sold_at) and all-branch dashboard
+    # totals (sold_at).
+    op.create_index('ix_kg_sales_branch_sold_at', 'kg_sales', ['branch_id', 'sold_at'])
+    op.create_index('ix_sales_sold_at', 'sales', ['sold_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sales_sold_at', table_name='sales')
+    op.drop_index('ix_kg_sales_branch_sold_at', table_name='kg_sales')
@@ -0,0 +1,31 @@
+"""index_open_reservations_by_hold_end
+
+Revision ID: c47a9e0b5d12
+Revises: 8f2d4c6e1a37
+Create Date: 2026-10-18 13:58:22.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47a9e0b5d12'
+down_revision: Union[str, Sequence[str], None] = '8f2d4c6e1a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_reservations_open_hold_end',
+        'reservations',
+        [sa.text('upper(hold_window)')],
+        postgresql_where=sa.text("status IN ('hold','active')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservations_open_hold_end', table_name='reservations')
@@ -0,0 +1,44 @@
+"""student_name_search
+
+Revision ID: c7d2e9f41a68
+Revises: f3a6d8b20c51
+Create Date: 2026-10-18 19:04:12.518309
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e9f41a68'
+down_revision: Union[str, Sequence[str], None] = 'f3a6d8b20c51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Snapshot of utils.search.name_search_sql('full_name') at this revision.
+NAME_SEARCH_SQL = (
+    "btrim(regexp_replace(lower(translate("
+    r"regexp_replace(full_name, '[\u064B-\u065F\u0670\u0640]', '', 'g'), "
+    "'\u0623\u0625\u0622\u0671\u0649\u0629\u0624\u0626', "
+    "'\u0627\u0627\u0627\u0627\u064A\u0647\u0648\u064A')), "
+    r"'\s+', ' ', 'g'))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        'students',
+        sa.Column('name_search', sa.Text(), sa.Computed(NAME_SEARCH_SQL, persisted=True)),
+    )
+    op.create_index(
+        'ix_students_name_search_trgm', 'students', ['name_search'],
+        postgresql_using='gin', postgresql_ops={'name_search': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_students_name_search_trgm', table_name='students')
+    op.drop_column('students', 'name_search')
@@ -0,0 +1,37 @@
+"""student_phone_suffix_indexes
+
+Revision ID: d84b1c6e2f37
+Revises: c7d2e9f41a68
+Create Date: 2026-10-18 19:31:55.204716
+
+Existing phone_norm values were written in two formats (last 10 digits on
+create, leading 0 on update). Run `python -m backend.app.workers.jobs.backfill_phone_keys`
+after upgrading to rewrite them in batches.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd84b1c6e2f37'
+down_revision: Union[str, Sequence[str], None] = 'c7d2e9f41a68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_students_phone_norm_rev', 'students',
+        [sa.text('reverse(phone_norm) text_pattern_ops')],
+    )
+    op.create_index(
+        'ix_students_parent_phone_norm_rev', 'students',
+        [sa.text('reverse(parent_phone_norm) text_pattern_ops')],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_students_parent_phone_norm_rev', table_name='students')
+    op.drop_index('ix_students_phone_norm_rev', table_name='students')
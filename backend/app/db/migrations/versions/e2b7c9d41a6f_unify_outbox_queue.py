@@ -0,0 +1,68 @@
+"""unify_outbox_queue
+
+Revision ID: e2b7c9d41a6f
+Revises: 5d8e2a1f6b90
+Create Date: 2026-10-18 15:48:03.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c9d41a6f'
+down_revision: Union[str, Sequence[str], None] = '5d8e2a1f6b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'notification_outbox',
+        sa.Column('next_attempt_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('now()')),
+    )
+    op.execute("UPDATE notification_outbox SET next_attempt_at = created_at")
+    op.drop_index('ix_outbox_channel_pending', table_name='notification_outbox')
+    op.create_index(
+        'ix_outbox_channel_due',
+        'notification_outbox',
+        ['channel', 'next_attempt_at'],
+        postgresql_where=sa.text("state IN ('pending', 'sending')"),
+    )
+
+    # wa_outbox was created outside of migrations by the old raw-psycopg
+    # enqueue endpoint; carry its rows over when it exists. The table itself
+    # is left in place.
+    op.execute("""
+        DO $$
+        BEGIN
+            IF to_regclass('wa_outbox') IS NOT NULL THEN
+                INSERT INTO notification_outbox
+                    (id, channel, "to", message, variables, state, attempts, last_error,
+                     created_at, updated_at, sent_at, next_attempt_at)
+                SELECT w.id::uuid, 'wa_web', w."to", w.message, w.tags::jsonb,
+                       CASE w.status
+                           WHEN 'sent' THEN 'sent'
+                           WHEN 'failed' THEN 'failed'
+                           ELSE 'pending'
+                       END,
+                       COALESCE(w.attempts, 0), w.last_error,
+                       w.created_at, COALESCE(w.updated_at, w.created_at), w.sent_at, now()
+                  FROM wa_outbox w
+                ON CONFLICT (id) DO NOTHING;
+            END IF;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_channel_due', table_name='notification_outbox')
+    op.create_index(
+        'ix_outbox_channel_pending',
+        'notification_outbox',
+        ['channel', 'created_at'],
+        postgresql_where=sa.text("state IN ('pending', 'sending')"),
+    )
+    op.drop_column('notification_outbox', 'next_attempt_at')
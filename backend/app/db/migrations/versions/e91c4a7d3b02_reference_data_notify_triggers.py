@@ -0,0 +1,45 @@
+"""reference_data_notify_triggers
+
+Revision ID: e91c4a7d3b02
+Revises: d84b1c6e2f37
+Create Date: 2026-10-18 19:58:06.731442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91c4a7d3b02'
+down_revision: Union[str, Sequence[str], None] = 'd84b1c6e2f37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('branches', 'items', 'schools')
+
+
+def upgrade() -> None:
+    # 'refdata:<table>' tells every API process to drop its cached rows of
+    # that table (services/reference_cache). Statement-level, and Postgres
+    # folds identical notifications within a transaction.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_reference_changed() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify('eltafawook_events', 'refdata:' || TG_TABLE_NAME);
+            RETURN NULL;
+        END $$;
+    """)
+    for table in TABLES:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_refdata_notify
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_changed();
+        """)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_refdata_notify ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_reference_changed()")
@@ -0,0 +1,58 @@
+"""add_sales_daily_rollup
+
+Revision ID: f3a6d8b20c51
+Revises: b1f4e8a2c375
+Create Date: 2026-10-18 18:22:47.391026
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from backend.app.core.config import get_settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a6d8b20c51'
+down_revision: Union[str, Sequence[str], None] = 'b1f4e8a2c375'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_daily_rollup',
+        sa.Column('branch_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('branches.id', ondelete='RESTRICT'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('context', sa.Text(), primary_key=True),
+        sa.Column('item_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('payment_method', sa.Text(), primary_key=True),
+        sa.Column('sales_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('qty', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('total_cents', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('now()')),
+    )
+    op.create_index('ix_sales_daily_rollup_day', 'sales_daily_rollup', ['day', 'context'])
+
+    # Days are local (settings.tz) dates, matching sales_rollup_service.
+    op.get_bind().execute(sa.text("""
+        INSERT INTO sales_daily_rollup (branch_id, day, context, item_id, payment_method, sales_count, qty, total_cents)
+        SELECT branch_id, (sold_at AT TIME ZONE :tz)::date, 'bookstore',
+               item_id, payment_method::text,
+               COUNT(*), SUM(qty), SUM(total_cents)
+          FROM sales
+         GROUP BY 1, 2, 4, 5
+        UNION ALL
+        SELECT branch_id, (sold_at AT TIME ZONE :tz)::date, 'kindergarten',
+               kg_item_id, 'unspecified',
+               COUNT(*), SUM(qty), SUM(total_cents)
+          FROM kg_sales
+         GROUP BY 1, 2, 4
+    """), {"tz": get_settings().tz})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sales_daily_rollup_day', table_name='sales_daily_rollup')
+    op.drop_table('sales_daily_rollup')
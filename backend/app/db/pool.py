@@ -0,0 +1,112 @@
+"""
+Instrumented connection pools.
+
+Same behaviour as SQLAlchemy's QueuePool / AsyncAdaptedQueuePool, plus a
+record of how long each checkout waited for a connection: a cumulative
+histogram over CHECKOUT_BUCKETS_MS, the total and the worst wait, and how
+many checkouts timed out. pool_stats() adds the pool's live occupancy.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Upper bounds (ms) of the checkout-wait histogram buckets; a final +Inf
+# bucket catches the rest.
+CHECKOUT_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class CheckoutMetrics:
+    """Thread-safe checkout-wait histogram with a timeout counter."""
+
+    def __init__(self, buckets_ms: tuple[float, ...] = CHECKOUT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._counts = [0] * (len(buckets_ms) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def observe(self, ms: float) -> None:
+        i = bisect.bisect_left(self.buckets_ms, ms)
+        with self._lock:
+            self._counts[i] += 1
+            self.count += 1
+            self.sum_ms += ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def timed_out(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            out = {
+                "checkouts": self.count,
+                "checkout_timeouts": self.timeouts,
+                "wait_ms_sum": round(self.sum_ms, 3),
+                "wait_ms_max": round(self.max_ms, 3),
+            }
+        cumulative, running = [], 0
+        for le, n in zip((*self.buckets_ms, float("inf")), counts):
+            running += n
+            cumulative.append((le, running))
+        out["wait_ms_buckets"] = cumulative
+        return out
+
+
+class _Instrumented:
+    """Pool mixin timing _do_get, the step that blocks when the pool is exhausted."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = CheckoutMetrics()
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timed_out()
+            raise
+        finally:
+            self.metrics.observe((time.perf_counter() - t0) * 1000)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics.
+        new = super().recreate()
+        new.metrics = self.metrics
+        return new
+
+
+class InstrumentedQueuePool(_Instrumented, QueuePool):
+    pass
+
+
+class InstrumentedAsyncPool(_Instrumented, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(pool: Pool) -> dict[str, Any]:
+    """Occupancy of `pool` plus its checkout metrics when it is instrumented."""
+    out: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        out.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    metrics = getattr(pool, "metrics", None)
+    if isinstance(metrics, CheckoutMetrics):
+        out.update(metrics.snapshot())
+    return out
@@ -0,0 +1,94 @@
+"""
+Staleness gate for the read replica.
+
+Read sessions go to the replica only while its measured replay lag is at
+most READ_MAX_LAG_SECONDS. The lag is measured on a read session at most
+once every READ_LAG_CHECK_SECONDS per process (other requests reuse the
+last verdict), and a replica that cannot be reached counts as too far
+behind, so callers fall back to the primary until the next check says
+otherwise.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("eltafawook.replica")
+
+# Seconds the replica is behind. 0 on a primary (e.g. a second plain
+# Postgres used for testing) and on a standby that has replayed all WAL it
+# received; otherwise the age of the last replayed transaction.
+LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaGate:
+    def __init__(self, max_lag_seconds: float, check_interval_seconds: float, clock=time.monotonic):
+        self.max_lag_seconds = float(max_lag_seconds)
+        self.check_interval_seconds = float(check_interval_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self.lag_seconds: float | None = None
+        self.healthy = False
+        self.fallbacks = 0
+
+    def _claim_check(self) -> bool:
+        # Only one caller measures per interval; the rest use the last verdict.
+        with self._lock:
+            now = self._clock()
+            if now < self._next_check:
+                return False
+            self._next_check = now + self.check_interval_seconds
+            return True
+
+    def record(self, lag_seconds: float | None) -> None:
+        """Store a measurement; None means the replica could not be reached."""
+        was_healthy = self.healthy
+        self.lag_seconds = lag_seconds
+        self.healthy = lag_seconds is not None and lag_seconds <= self.max_lag_seconds
+        if was_healthy and lag_seconds is not None and not self.healthy:
+            logger.warning("read replica lag %.1fs exceeds %.1fs; reading from primary",
+                           lag_seconds, self.max_lag_seconds)
+
+    def check(self, db: Session) -> bool:
+        """
+        True when `db` (a replica session) may serve the request. Measures
+        the lag on `db` when a check is due; on failure `db` is rolled back
+        and left for the caller to close.
+        """
+        if self._claim_check():
+            try:
+                self.record(float(db.execute(LAG_SQL).scalar() or 0))
+            except SQLAlchemyError:
+                logger.warning("read replica lag check failed; reading from primary", exc_info=True)
+                self.record(None)
+                try:
+                    db.rollback()
+                except SQLAlchemyError:
+                    pass
+        if not self.healthy:
+            with self._lock:
+                self.fallbacks += 1
+        return self.healthy
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "fallbacks": self.fallbacks,
+        }
@@ -1,16 +1,45 @@
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from typing import Any
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from backend.app.core.config import settings
+from backend.app.db.pool import InstrumentedAsyncPool, InstrumentedQueuePool, pool_stats
+from backend.app.db.replica import ReplicaGate
 
 DATABASE_URL = settings.database_url
 
+
+def engine_options(pool_size: int, max_overflow: int) -> dict[str, Any]:
+    """
+    create_engine / create_async_engine kwargs from the DB_POOL_* settings.
+
+    With DB_PGBOUNCER on, consecutive transactions may run on different
+    server connections, so nothing may outlive a transaction: psycopg's
+    automatic server-side prepared statements are turned off
+    (prepare_threshold=None). The app sets no other session state; LISTEN,
+    which needs a session, connects to DATABASE_DIRECT_URL instead (see
+    db/events.py).
+    """
+    connect_args: dict[str, Any] = {"connect_timeout": 10}
+    if settings.db_pgbouncer:
+        connect_args["prepare_threshold"] = None
+    return {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "connect_args": connect_args,
+    }
+
+
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=5,
-    pool_recycle=1800,
-    connect_args={"connect_timeout": 10},
+    poolclass=InstrumentedQueuePool,
+    **engine_options(settings.db_pool_size, settings.db_max_overflow),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -21,3 +50,94 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# The async engine (psycopg's asyncio mode, same URL) has its own pool and
+# is created on first use, so the workers and scripts never open it.
+_async_engine: AsyncEngine | None = None
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            DATABASE_URL,
+            poolclass=InstrumentedAsyncPool,
+            **engine_options(settings.async_db_pool_size, settings.async_db_max_overflow),
+        )
+    return _async_engine
+
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    AsyncSession for `async def` routes. Existing sync services run on it
+    unchanged through `await db.run_sync(fn, ...)`, which waits on the
+    database without holding a threadpool thread.
+    """
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
+
+# Optional read replica (DATABASE_READ_URL) for reports, exports and
+# dashboards. Read sessions go there only while replica_gate says its lag is
+# within bounds; otherwise, and when no replica is configured, they are
+# ordinary primary sessions.
+read_engine = (
+    create_engine(
+        settings.database_read_url,
+        poolclass=InstrumentedQueuePool,
+        **engine_options(settings.db_pool_size, settings.db_max_overflow),
+    )
+    if settings.database_read_url else None
+)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+replica_gate = ReplicaGate(settings.read_max_lag_seconds, settings.read_lag_check_seconds)
+
+@contextmanager
+def read_session() -> Iterator[Session]:
+    """A replica session when the replica is configured and fresh enough, else a primary one."""
+    if read_engine is not None:
+        db = ReadSessionLocal()
+        if replica_gate.check(db):
+            try:
+                yield db
+            finally:
+                db.close()
+            return
+        db.close()
+    with SessionLocal() as db:
+        yield db
+
+def get_read_db():
+    """get_db for read-only analytical endpoints; see read_session()."""
+    with read_session() as db:
+        yield db
+
+_async_read_engine: AsyncEngine | None = None
+
+def get_async_read_engine() -> AsyncEngine:
+    global _async_read_engine
+    if _async_read_engine is None:
+        _async_read_engine = create_async_engine(
+            settings.database_read_url,
+            poolclass=InstrumentedAsyncPool,
+            **engine_options(settings.async_db_pool_size, settings.async_db_max_overflow),
+        )
+    return _async_read_engine
+
+async def get_async_read_db() -> AsyncIterator[AsyncSession]:
+    """get_async_db counterpart of get_read_db, with the same replica gate."""
+    if settings.database_read_url:
+        async with AsyncSessionLocal(bind=get_async_read_engine()) as db:
+            if await db.run_sync(replica_gate.check):
+                yield db
+                return
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
+
+
+def pool_metrics() -> dict[str, Any]:
+    """Pool occupancy and checkout waits of each engine created so far."""
+    out = {"sync": pool_stats(engine.pool)}
+    for name, eng in (("async", _async_engine), ("read", read_engine), ("async_read", _async_read_engine)):
+        if eng is not None:
+            out[name] = pool_stats(eng.pool)
+    return out
@@ -1,14 +1,18 @@
 # backend/app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from backend.app.core import metrics
 from backend.app.core.config import get_settings
 from backend.app.core.exceptions import register_exception_handlers
 from backend.app.core.logging_config import setup_logging, register_logging_middleware
 from backend.app.api.v1.router import api_router
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
-from backend.app.db.session import SessionLocal
+from backend.app.db.session import SessionLocal, engine
+from backend.app.services import metrics_service, reference_cache
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+import hmac
 import os
 
 settings = get_settings()
@@ -22,8 +26,12 @@ app.include_router(api_router, prefix="/api/v1")
 # Register global exception handlers (structured error responses)
 register_exception_handlers(app)
 
-# Request logging middleware (adds request_id, logs request/response)
-register_logging_middleware(app)
+# Request logging middleware (adds request_id, logs request/response; SQL profile with QUERY_PROFILE)
+register_logging_middleware(
+    app,
+    profile_queries=settings.query_profile,
+    repeat_threshold=settings.query_profile_repeat_threshold,
+)
 
 MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", "var/uploads")).resolve()
 MEDIA_ROOT.mkdir(parents=True, exist_ok=True)
@@ -37,11 +45,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latency covers every other middleware
+app.add_middleware(metrics.MetricsMiddleware)
+
 @app.on_event("startup")
 def _warm_db_pool():
     with SessionLocal() as s:
         s.execute(text("SELECT 1"))
 
+@app.on_event("startup")
+def _start_reference_listener():
+    # Each worker process keeps its own reference cache; NOTIFY keeps them in step.
+    if engine.dialect.name == "postgresql":
+        reference_cache.start_listener()
+
+@app.on_event("startup")
+def _prepare_metrics():
+    metrics.prepare_routes(app.routes)
+    metrics_service.register()
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics(authorization: str | None = Header(default=None)):
+    # Route traffic, reservation counts and outbox backlog are not public.
+    if not settings.metrics_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(authorization or "", f"Bearer {settings.metrics_token}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/healthz")
 def healthz():
     return {"status": "ok", "env": settings.app_env}
@@ -21,4 +21,5 @@ class KgSale(Base):
 
     __table_args__ = (
         sa.CheckConstraint('qty > 0', name='ck_kg_sales_qty_positive'),
+        sa.Index('ix_kg_sales_branch_sold_at', 'branch_id', 'sold_at'),
     )
\ No newline at end of file
@@ -45,4 +45,5 @@ class StockLedger(Base):
 
     __table_args__ = (
         sa.Index("ix_stock_ledger_branch_item_at", "branch_id", "item_id", "at"),
+        sa.Index("ix_stock_ledger_at", "at"),
     )
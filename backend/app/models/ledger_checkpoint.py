@@ -0,0 +1,38 @@
+from __future__ import annotations
+from datetime import datetime
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy import func, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.app.db.base import Base
+from backend.app.models.ledger import StockEvent
+
+
+class StockLedgerCheckpoint(Base):
+    """
+    Closing point of the stock ledger.
+    Its totals cover every stock_ledger row with at < as_of and
+    id <= ledger_high_watermark; anything else is the tail.
+    """
+    __tablename__ = "stock_ledger_checkpoints"
+
+    id: Mapped[int] = mapped_column(sa.BigInteger, primary_key=True, autoincrement=True)
+    as_of: Mapped[datetime] = mapped_column(sa.TIMESTAMP(timezone=True), nullable=False, unique=True)
+    ledger_high_watermark: Mapped[int] = mapped_column(sa.BigInteger, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(sa.TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+
+
+class StockLedgerCheckpointTotal(Base):
+    """
+    Cumulative Sum(qty) per (branch_id, item_id, event) at a checkpoint.
+    """
+    __tablename__ = "stock_ledger_checkpoint_totals"
+
+    checkpoint_id: Mapped[int] = mapped_column(sa.BigInteger, ForeignKey("stock_ledger_checkpoints.id", ondelete="CASCADE"), primary_key=True)
+    branch_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("branches.id", ondelete="RESTRICT"), primary_key=True)
+    item_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("items.id", ondelete="RESTRICT"), primary_key=True)
+    event: Mapped[str] = mapped_column(StockEvent, primary_key=True)
+    qty: Mapped[int] = mapped_column(sa.BigInteger, nullable=False)
@@ -4,12 +4,15 @@ from typing import Optional
 from uuid import UUID, uuid4
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB
-from sqlalchemy import Text, Integer, TIMESTAMP, func, ForeignKey, Index
+from sqlalchemy import Text, Integer, TIMESTAMP, func, ForeignKey, Index, text
 from backend.app.db.base import Base
 
 class NotifyOutbox(Base):
     __tablename__ = "notification_outbox"
-    __table_args__ = (Index("ix_outbox_state_created", "state", "created_at"),)
+    __table_args__ = (
+        Index("ix_outbox_state_created", "state", "created_at"),
+        Index("ix_outbox_channel_due", "channel", "next_attempt_at", postgresql_where=text("state IN ('pending', 'sending')")),
+    )
 
     id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
 
@@ -31,3 +34,6 @@ class NotifyOutbox(Base):
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     sent_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    next_attempt_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    latency_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
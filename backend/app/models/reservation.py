@@ -54,4 +54,9 @@ class Reservation(Base):
             "payment_method IS NULL OR payment_method IN ('cash','vodafone','instapay')",
             name="ck_reservations_payment_method"
         ),
+        sa.Index(
+            "ix_reservations_open_hold_end",
+            sa.text("upper(hold_window)"),
+            postgresql_where=sa.text("status IN ('hold','active')"),
+        ),
     )
@@ -12,6 +12,10 @@ PaymentMethod = sa.Enum("cash", "vodafone_cash", "instapay", name="payment_metho
 
 class Sale(Base):
     __tablename__ = "sales"
+    __table_args__ = (
+        sa.Index("ix_sales_branch_sold_at", "branch_id", "sold_at"),
+        sa.Index("ix_sales_sold_at", "sold_at"),
+    )
 
     id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     created_at: Mapped[datetime] = mapped_column(sa.TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
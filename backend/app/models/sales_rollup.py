@@ -0,0 +1,36 @@
+from __future__ import annotations
+from datetime import date, datetime
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy import func, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.app.db.base import Base
+
+
+class SalesDailyRollup(Base):
+    """
+    Sales totals per (branch, local day, context, item, payment_method),
+    folded in by the same statement that inserts or deletes each sale.
+      context        = 'bookstore' (sales) | 'kindergarten' (kg_sales)
+      item_id        = items.id or kg_items.id depending on context
+      payment_method = sales.payment_method; kg sales use 'unspecified'
+    """
+    __tablename__ = "sales_daily_rollup"
+    __table_args__ = (
+        sa.Index("ix_sales_daily_rollup_day", "day", "context"),
+    )
+
+    branch_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("branches.id", ondelete="RESTRICT"), primary_key=True)
+    day: Mapped[date] = mapped_column(sa.Date, primary_key=True)
+    context: Mapped[str] = mapped_column(sa.Text, primary_key=True)
+    item_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    payment_method: Mapped[str] = mapped_column(sa.Text, primary_key=True)
+
+    sales_count: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default="0")
+    qty: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, server_default="0")
+    total_cents: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, server_default="0")
+
+    updated_at: Mapped[datetime] = mapped_column(sa.TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
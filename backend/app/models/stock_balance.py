@@ -0,0 +1,30 @@
+from __future__ import annotations
+from datetime import datetime
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy import func, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.app.db.base import Base
+
+
+class StockBalance(Base):
+    """
+    Running totals per (branch_id, item_id), folded in from stock_ledger
+    in the same statement that appends each ledger row.
+      on_hand  = Sum(qty) over physical ledger events
+      reserved = Sum(qty) over hold/active reservations
+    """
+    __tablename__ = "stock_balance"
+
+    branch_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("branches.id", ondelete="RESTRICT"), primary_key=True)
+    item_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("items.id", ondelete="RESTRICT"), primary_key=True)
+
+    on_hand: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default="0")
+    reserved: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default="0")
+    available: Mapped[int] = mapped_column(sa.Integer, sa.Computed("on_hand - reserved", persisted=True))
+
+    ledger_high_watermark: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(sa.TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
@@ -9,6 +9,7 @@ from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.app.db.base import Base
+from backend.app.utils.search import name_search_sql
 
 Gender = sa.Enum("male", "female", name="gender", create_type=False)
 Section = sa.Enum("science", "math", "literature", "", name="section", create_type=False)
@@ -19,8 +20,11 @@ class Student(Base):
 
     id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     full_name: Mapped[str] = mapped_column(sa.Text, nullable=False)
+    # Normalized full_name for search (see utils.search); maintained by Postgres.
+    name_search: Mapped[str] = mapped_column(sa.Text, sa.Computed(name_search_sql("full_name"), persisted=True))
 
     phone: Mapped[Optional[str]] = mapped_column(sa.Text, nullable=True)
+    # Lookup keys from utils.phone.phone_key, set on every write.
     phone_norm: Mapped[Optional[str]] = mapped_column(sa.Text, nullable=True)
     parent_phone: Mapped[Optional[str]] = mapped_column(sa.Text, nullable=True)
     parent_phone_norm: Mapped[Optional[str]] = mapped_column(sa.Text, nullable=True)
@@ -40,7 +44,15 @@ class Student(Base):
         sa.CheckConstraint("grade in (1,2,3)", name="ck_students_grade_123"),
         sa.Index("ix_students_phone_norm", "phone_norm"),
         sa.Index("ix_students_parent_phone_norm", "parent_phone_norm"),
+        # Last-N-digit lookups (utils.phone.phone_match) as prefix scans on the reversed key.
+        sa.Index("ix_students_phone_norm_rev", func.reverse(sa.column("phone_norm")).label("phone_norm_rev"),
+                 postgresql_ops={"phone_norm_rev": "text_pattern_ops"}),
+        sa.Index("ix_students_parent_phone_norm_rev",
+                 func.reverse(sa.column("parent_phone_norm")).label("parent_phone_norm_rev"),
+                 postgresql_ops={"parent_phone_norm_rev": "text_pattern_ops"}),
         sa.Index("ix_students_name", "full_name"),
+        sa.Index("ix_students_name_search_trgm", "name_search",
+                 postgresql_using="gin", postgresql_ops={"name_search": "gin_trgm_ops"}),
         sa.Index("ix_students_branch", "branch_id"),
         sa.CheckConstraint(r"phone ~ '^\+20(10|11|12|15)[0-9]{8}$'", name="ck_students_phone_eg"),
         sa.CheckConstraint(r"(parent_phone IS NULL) OR (parent_phone ~ '^\+20(10|11|12|15)[0-9]{8}$')",
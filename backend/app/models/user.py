@@ -17,6 +17,9 @@ class User(Base):
     branch_id: Mapped[UUID | None] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("branches.id"), nullable=True)
     
     is_active: Mapped[bool] = mapped_column(sa.Boolean, default=True, server_default=sa.text("true"))
+    # Carried in tokens as "ver"; bumped by a trigger when role, branch,
+    # is_active or the password change, which revokes older tokens.
+    token_version: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default="0")
     created_at: Mapped[datetime] = mapped_column(sa.TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(sa.TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
@@ -1,5 +1,5 @@
 from uuid import UUID
-from pydantic import BaseModel, PositiveInt, Field
+from pydantic import BaseModel, PositiveInt, Field, field_validator, model_validator
 from backend.app.schemas.inventory import InventorySummary
 
 class ReceiveRequest(BaseModel):
@@ -15,3 +15,33 @@ class AdjustRequest(BaseModel):
 
 class AdjustResponse(BaseModel):
     summary: InventorySummary
+
+class ManifestLine(BaseModel):
+    """One delivery line: either item_id, or sku + teacher_id + grade."""
+    item_id: UUID | None = None
+    sku: str | None = None
+    teacher_id: UUID | None = None
+    grade: int | None = None
+    qty: PositiveInt
+
+    @model_validator(mode="after")
+    def _identify_item(self):
+        if self.item_id is None and (not self.sku or self.teacher_id is None or self.grade is None):
+            raise ValueError("Each line needs item_id, or sku + teacher_id + grade")
+        return self
+
+class ReceiveManifestRequest(BaseModel):
+    branch_id: UUID
+    lines: list[ManifestLine]
+
+    @field_validator("lines")
+    @classmethod
+    def _non_empty_lines(cls, v):
+        if not v:
+            raise ValueError("At least one line is required")
+        return v
+
+class ReceiveManifestResponse(BaseModel):
+    received_lines: int
+    activated_holds: int
+    summaries: list[InventorySummary]
@@ -1,29 +1,169 @@
-"""Reusable pagination parameters and response wrapper."""
+"""Reusable pagination parameters, response wrapper and query helper."""
 from __future__ import annotations
 
-from typing import Generic, TypeVar, Sequence
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Generic, TypeVar
+from uuid import UUID
 
-from fastapi import Query
+import sqlalchemy as sa
+from fastapi import HTTPException, Query
 from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
 
 T = TypeVar("T")
 
 
 class PaginationParams:
-    """Inject as a dependency: ``params: PaginationParams = Depends()``"""
+    """
+    Inject as a dependency: ``params: PaginationParams = Depends()``
+
+    Two modes: ``offset``/``limit`` as before, or ``cursor`` (the previous
+    page's ``next_cursor``), which seeks past the last row on the sort key
+    and so costs the same on every page. ``include_total=false`` skips the
+    count query.
+    """
 
     def __init__(
         self,
-        offset: int = Query(0, ge=0, description="Number of records to skip"),
+        offset: int = Query(0, ge=0, description="Number of records to skip (ignored with cursor)"),
         limit: int = Query(50, ge=1, le=200, description="Max records to return"),
+        cursor: str | None = Query(None, description="Opaque next_cursor from the previous page"),
+        include_total: bool = Query(True, description="Count all matching records"),
     ):
         self.offset = offset
         self.limit = limit
+        self.cursor = cursor
+        self.include_total = include_total
+        self.after = decode_cursor(cursor) if cursor else None
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: list[T]
-    total: int
+    total: int | None
     offset: int
     limit: int
     has_more: bool
+    next_cursor: str | None = None
+
+
+_ENCODERS = {
+    bool: "b",
+    int: "i",
+    float: "f",
+    str: "s",
+    UUID: "u",
+    datetime: "t",
+    date: "d",
+}
+_DECODERS = {
+    "b": bool,
+    "i": int,
+    "f": float,
+    "s": str,
+    "u": UUID,
+    "t": datetime.fromisoformat,
+    "d": date.fromisoformat,
+}
+
+
+def encode_cursor(values: list[Any]) -> str:
+    out = []
+    for v in values:
+        if v is None:
+            out.append(["n", None])
+            continue
+        tag = _ENCODERS.get(type(v))
+        if tag is None:
+            raise TypeError(f"Cannot encode {type(v).__name__} in a cursor")
+        out.append([tag, v.isoformat() if tag in ("t", "d") else v if tag in ("b", "i", "f", "s") else str(v)])
+    raw = json.dumps(out, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return [None if tag == "n" else _DECODERS[tag](v) for tag, v in json.loads(raw)]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _sort_keys(order_by) -> list[tuple[Any, bool]]:
+    """(expression, descending) per ORDER BY item; accepts plain columns or .asc()/.desc()."""
+    keys = []
+    for o in order_by:
+        if isinstance(o, UnaryExpression) and o.modifier in (operators.desc_op, operators.asc_op):
+            keys.append((o.element, o.modifier is operators.desc_op))
+        else:
+            keys.append((o, False))
+    return keys
+
+
+def _after(keys: list[tuple[Any, bool]], values: list[Any]):
+    """
+    Rows strictly after `values` in the order of `keys`:
+      k1 > v1 OR (k1 = v1 AND k2 > v2) OR ...   (< for descending keys)
+    plus a plain bound on k1, which is what lets an index on the leading
+    key start the scan at the cursor. A None value matches only NULLs and
+    never bounds; put an `expr IS NULL` key before a nullable one.
+    """
+    branches, equal = [], []
+    bound = None
+    for n, ((expr, desc), v) in enumerate(zip(keys, values)):
+        if v is None:
+            equal.append(expr.is_(None))
+            continue
+        v = sa.literal(v, expr.type)
+        branches.append(sa.and_(*equal, expr < v if desc else expr > v))
+        equal.append(expr == v)
+        if n == 0:
+            bound = expr <= v if desc else expr >= v
+    cond = sa.or_(*branches)
+    return cond if bound is None else sa.and_(bound, cond)
+
+
+def paginate(db: Session, stmt, pg: PaginationParams, *order_by, scalars: bool = False) -> tuple[list, dict[str, Any]]:
+    """
+    Run one page of `stmt` ordered by `order_by`, whose last item must be
+    unique (normally the primary key). Returns (rows, meta) where meta has
+    total (None when include_total is off), offset, limit, has_more and
+    next_cursor. One extra row is fetched to tell whether a next page
+    exists, so no count is needed for that. With scalars=True rows are
+    the first column only (the ORM entity for select(Model)).
+    """
+    keys = _sort_keys(order_by)
+    total = None
+    if pg.include_total:
+        total = db.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar() or 0
+
+    labels = [f"_page_key_{n}" for n in range(len(keys))]
+    page = stmt.add_columns(*(expr.label(name) for (expr, _), name in zip(keys, labels))).order_by(*order_by)
+    if pg.after is not None:
+        if len(pg.after) != len(keys):
+            raise HTTPException(status_code=400, detail="Cursor does not match this listing")
+        page = page.where(_after(keys, pg.after))
+    else:
+        page = page.offset(pg.offset)
+
+    rows = db.execute(page.limit(pg.limit + 1)).all()
+    has_more = len(rows) > pg.limit
+    rows = rows[:pg.limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor([last[name] for name in labels])
+
+    meta = {
+        "total": total,
+        "offset": 0 if pg.after is not None else pg.offset,
+        "limit": pg.limit,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+    }
+    return ([r[0] for r in rows] if scalars else rows), meta
@@ -33,6 +33,8 @@ class OperationOut(BaseModel):
 
 class BatchIn(BaseModel):
     operations: list[OperationIn]
+    mode: Literal["sequential", "atomic"] = "sequential"
 
 class BatchOut(BaseModel):
     results: list[OperationOut]
+    inventory: list[dict[str, Any]] | None = None
@@ -0,0 +1,188 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy import select, update, insert, func, literal, text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session, aliased
+
+from backend.app.models.ledger import StockLedger, StockEvent
+from backend.app.models.reservation import Reservation
+from backend.app.models.stock_balance import StockBalance
+from backend.app.services import dashboard_cache
+from backend.app.services.notify.outbox_service import enqueue_ready_bulk
+from backend.app.services.stock_balance_service import balance_upsert
+
+Pair = tuple[UUID, UUID]
+
+HOLD_DAYS = 14
+
+
+def _unique_pairs(pairs: Iterable[Pair]) -> list[Pair]:
+    return sorted({(b, i) for b, i in pairs}, key=lambda p: (str(p[0]), str(p[1])))
+
+
+def lock_pairs(db: Session, pairs: Iterable[Pair]) -> None:
+    """
+    Take the per-(branch, item) advisory xact locks used by fulfilment, in a
+    fixed order so concurrent multi-pair callers cannot deadlock.
+    """
+    keys = [f"{b}:{i}" for b, i in _unique_pairs(pairs)]
+    if not keys:
+        return
+    db.execute(
+        text("""
+            SELECT pg_advisory_xact_lock(hashtextextended(k, 0))
+              FROM (SELECT k FROM unnest(CAST(:keys AS text[])) AS k ORDER BY k) AS ordered
+        """),
+        {"keys": keys},
+    )
+
+
+def _pairs_values(pairs: list[Pair]):
+    return sa.values(
+        sa.column("branch_id", PG_UUID(as_uuid=True)),
+        sa.column("item_id", PG_UUID(as_uuid=True)),
+        name="pairs",
+    ).data(pairs)
+
+
+def _fifo_candidates(pairs: list[Pair], status: str, capacity):
+    """
+    Rows of `status` for the given pairs, locked (SKIP LOCKED), with a running
+    FIFO total per pair. A row fits when the running total up to and
+    including it is within `capacity`, which is exactly "allocate in
+    created_at order and stop at the first one that does not fit".
+    """
+    p = _pairs_values(pairs)
+    locked = (
+        select(Reservation.id, Reservation.branch_id, Reservation.item_id, Reservation.qty, Reservation.created_at)
+        .join(p, sa.and_(p.c.branch_id == Reservation.branch_id, p.c.item_id == Reservation.item_id))
+        .where(Reservation.status == status)
+        .with_for_update(of=Reservation, skip_locked=True)
+        .cte("locked")
+    )
+    running = func.sum(locked.c.qty).over(
+        partition_by=(locked.c.branch_id, locked.c.item_id),
+        order_by=(locked.c.created_at, locked.c.id),
+    )
+    ranked = (
+        select(locked.c.id, locked.c.branch_id, locked.c.item_id, locked.c.qty, running.label("running"), capacity(locked).label("capacity"))
+        .cte("ranked")
+    )
+    return select(ranked.c.id).where(ranked.c.running <= ranked.c.capacity)
+
+
+def _counts(rows) -> dict[Pair, int]:
+    out: dict[Pair, int] = {}
+    for r in rows:
+        key = (r.branch_id, r.item_id)
+        out[key] = out.get(key, 0) + 1
+    return out
+
+
+def allocate_queued(db: Session, pairs: Iterable[Pair], *, when: datetime | None = None) -> dict[Pair, int]:
+    """
+    Move queued reservations to 'active' FIFO for every pair at once, against
+    each pair's available stock (stock_balance). One statement updates the
+    reservations, appends their reserve_hold ledger rows and updates
+    stock_balance. Does not commit. Returns allocations per pair.
+    """
+    pairs = _unique_pairs(pairs)
+    if not pairs:
+        return {}
+    when = when or datetime.now(timezone.utc)
+    lock_pairs(db, pairs)
+
+    def available(locked):
+        return func.coalesce(
+            select(StockBalance.available)
+            .where(StockBalance.branch_id == locked.c.branch_id, StockBalance.item_id == locked.c.item_id)
+            .scalar_subquery(),
+            0,
+        )
+
+    chosen = _fifo_candidates(pairs, "queued", available)
+    activated = (
+        update(Reservation)
+        .where(Reservation.id.in_(chosen))
+        .values(
+            status="active",
+            hold_window=func.tstzrange(when, when + timedelta(days=HOLD_DAYS), "[)"),
+            notified_at=None,
+        )
+        .returning(Reservation.id, Reservation.branch_id, Reservation.item_id, Reservation.qty)
+        .cte("activated")
+    )
+    ledger_rows = (
+        insert(StockLedger)
+        .from_select(
+            ["branch_id", "item_id", "event", "qty", "ref_type", "ref_id"],
+            select(
+                activated.c.branch_id,
+                activated.c.item_id,
+                sa.cast(literal("reserve_hold"), StockEvent),
+                -activated.c.qty,
+                literal("reservation"),
+                activated.c.id,
+            ),
+        )
+        .returning(StockLedger.id, StockLedger.branch_id, StockLedger.item_id, StockLedger.event, StockLedger.qty)
+        .cte("ledger_rows")
+    )
+    balance = balance_upsert(ledger_rows).returning(literal(1)).cte("balance")
+    rows = db.execute(
+        select(activated.c.id, activated.c.branch_id, activated.c.item_id).add_cte(ledger_rows, balance)
+    ).all()
+    if rows:
+        dashboard_cache.invalidate(db, *{r.branch_id for r in rows})
+    return _counts(rows)
+
+
+def activate_holds(db: Session, pairs: Iterable[Pair]) -> dict[Pair, int]:
+    """
+    Promote the oldest 'hold' reservations of every pair to 'active' up to
+    capacity = on_hand - sum(active.qty), opening a fresh 14-day window and
+    queueing one WhatsApp message per activated reservation (multi-row).
+    Holds are already counted in reserved, so no ledger rows are written.
+    Does not commit. Returns activations per pair.
+    """
+    pairs = _unique_pairs(pairs)
+    if not pairs:
+        return {}
+    lock_pairs(db, pairs)
+
+    active = aliased(Reservation)
+
+    def capacity(locked):
+        on_hand = (
+            select(StockBalance.on_hand)
+            .where(StockBalance.branch_id == locked.c.branch_id, StockBalance.item_id == locked.c.item_id)
+            .scalar_subquery()
+        )
+        active_qty = (
+            select(func.sum(active.qty))
+            .where(active.branch_id == locked.c.branch_id, active.item_id == locked.c.item_id, active.status == "active")
+            .scalar_subquery()
+        )
+        return func.coalesce(on_hand, 0) - func.coalesce(active_qty, 0)
+
+    chosen = _fifo_candidates(pairs, "hold", capacity)
+    end = func.now() + timedelta(days=HOLD_DAYS)
+    rows = db.execute(
+        update(Reservation)
+        .where(Reservation.id.in_(chosen))
+        .values(
+            status="active",
+            hold_window=func.tstzrange(func.now(), end, "[)"),
+            notified_at=func.now(),
+        )
+        .returning(Reservation.id, Reservation.branch_id, Reservation.item_id)
+    ).all()
+
+    enqueue_ready_bulk(db, reservation_ids=[r.id for r in rows])
+    if rows:
+        dashboard_cache.invalidate(db, *{r.branch_id for r in rows})
+    return _counts(rows)
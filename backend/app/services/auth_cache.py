@@ -0,0 +1,105 @@
+"""
+Per-process cache of authenticated principals, keyed by username.
+
+A cached principal is only served for a token whose "ver" claim equals
+its token_version; any other version reloads the user, so a token issued
+before a role change or deactivation is rejected as soon as the entry is
+reloaded. update_user evicts the entry when its session commits; other
+processes keep theirs until AUTH_CACHE_TTL_SECONDS runs out.
+
+With AUTH_TRUST_TOKEN_CLAIMS the principal is built from the token's
+claims alone and no lookup happens at all; a revoked token then stays
+usable until it expires.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from backend.app.core.cache import TTLCache, pop_committed
+from backend.app.core.config import settings
+from backend.app.models.user import User
+
+_cache = TTLCache(ttl=settings.auth_cache_ttl_seconds, maxsize=1024)
+
+_DIRTY = "auth_dirty_usernames"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as routes see it (the fields they read off current_user)."""
+    id: UUID | None
+    username: str
+    role: str
+    branch_id: UUID | None
+    is_active: bool
+    token_version: int
+
+
+def _from_user(user) -> Principal:
+    return Principal(
+        id=user.id,
+        username=user.username,
+        role=user.role,
+        branch_id=user.branch_id,
+        is_active=bool(user.is_active),
+        token_version=int(user.token_version or 0),
+    )
+
+
+def _from_claims(claims: dict[str, Any]) -> Principal | None:
+    if "role" not in claims or "ver" not in claims:
+        return None
+    return Principal(
+        id=UUID(claims["uid"]) if claims.get("uid") else None,
+        username=claims["sub"],
+        role=claims["role"],
+        branch_id=UUID(claims["branch_id"]) if claims.get("branch_id") else None,
+        is_active=True,  # tokens are only issued to active users
+        token_version=int(claims["ver"]),
+    )
+
+
+def principal(db: Session, claims: dict[str, Any]) -> Principal | None:
+    """
+    Resolve decoded access-token `claims` to a Principal, or None when the
+    user is gone or the token's version is stale. Tokens issued before
+    versions existed count as version 0.
+    """
+    if settings.auth_trust_token_claims:
+        p = _from_claims(claims)
+        if p is not None:
+            return p
+
+    username, version = claims["sub"], int(claims.get("ver") or 0)
+    p = _cache.get(username)
+    if p is None or p.token_version != version:
+        user = db.execute(select(User).where(User.username == username)).scalar_one_or_none()
+        if user is None:
+            return None
+        p = _from_user(user)
+        _cache.put(username, p)
+    return p if p.token_version == version else None
+
+
+def invalidate(db: Session, *usernames: str) -> None:
+    """Evict `usernames` from this process's cache once `db` commits."""
+    db.info.setdefault(_DIRTY, set()).update(usernames)
+
+
+def stats() -> dict[str, Any]:
+    return _cache.stats()
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_on_commit(session: Session) -> None:
+    for username in pop_committed(session, _DIRTY) or ():
+        _cache.pop(username)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY, None)
@@ -0,0 +1,66 @@
+"""
+Per-branch cache of dashboard summaries.
+
+Writers that change sales or reservations call invalidate(db, branch_id);
+the entries are dropped when that session commits (nothing happens on
+rollback), so a reader cannot re-cache pre-commit numbers; the summary is
+read from the primary for the same reason (a lagging replica would serve
+them after the commit). The cache is
+per process: other API workers and the background workers' writes are
+only picked up when the TTL runs out.
+"""
+from __future__ import annotations
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.app.core.cache import TTLCache, pop_committed
+from backend.app.core.config import settings
+
+_cache = TTLCache(ttl=settings.dashboard_cache_ttl_seconds)
+
+_DIRTY = "dashboard_dirty_branches"
+_EVERYTHING = object()
+
+
+def get(branch_id: UUID | None) -> Any:
+    return _cache.get(branch_id)
+
+
+def put(branch_id: UUID | None, summary: Any) -> None:
+    _cache.put(branch_id, summary)
+
+
+def invalidate(db: Session, *branch_ids: UUID | None) -> None:
+    """
+    Drop the cached summaries of `branch_ids` (plus the all-branches one)
+    once `db` commits. Without ids every entry is dropped.
+    """
+    dirty = db.info.setdefault(_DIRTY, set())
+    dirty.update(branch_ids or (_EVERYTHING,))
+
+
+def evict(branch_ids) -> None:
+    if _EVERYTHING in branch_ids:
+        _cache.clear()
+        return
+    for b in set(branch_ids) | {None}:
+        _cache.pop(b)
+
+
+def stats() -> dict[str, Any]:
+    return _cache.stats()
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_on_commit(session: Session) -> None:
+    dirty = pop_committed(session, _DIRTY)
+    if dirty:
+        evict(dirty)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY, None)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+from datetime import date
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import func, select, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from backend.app.models.branch import Branch
+from backend.app.models.kg_student import KgStudent
+from backend.app.models.reservation import Reservation
+from backend.app.models.sales_rollup import SalesDailyRollup
+from backend.app.models.stock_balance import StockBalance
+from backend.app.models.student import Student
+from backend.app.services import dashboard_cache
+from backend.app.services.sales_rollup_service import BOOKSTORE
+from backend.app.utils.date_range import local_today
+
+
+def _key(name: str):
+    # json_build_object takes "any" arguments, so a bound key would have no type.
+    return literal_column(f"'{name}'")
+
+
+def _summary_stmt(branch_id: UUID | None, today: date):
+    """
+    Every dashboard figure in one statement: counts as scalar subqueries,
+    sales totals from one pass over the month's rollup rows, and the
+    status and per-branch breakdowns aggregated to JSON.
+    """
+    r = SalesDailyRollup
+
+    def scoped(q, column):
+        return q.where(column == branch_id) if branch_id else q
+
+    students = scoped(select(func.count()).select_from(Student), Student.branch_id).scalar_subquery()
+    kg_students = scoped(select(func.count()).select_from(KgStudent), KgStudent.branch_id).scalar_subquery()
+    low_stock = scoped(
+        select(func.count()).select_from(StockBalance).where(StockBalance.available <= 0),
+        StockBalance.branch_id,
+    ).scalar_subquery()
+
+    sales = scoped(
+        select(
+            func.coalesce(func.sum(r.sales_count).filter(r.day == today), 0).label("today_count"),
+            func.coalesce(func.sum(r.total_cents).filter(r.day == today), 0).label("today_cents"),
+            func.coalesce(func.sum(r.sales_count), 0).label("month_count"),
+            func.coalesce(func.sum(r.total_cents), 0).label("month_cents"),
+        ).where(r.context == BOOKSTORE, r.day >= today.replace(day=1), r.day <= today),
+        r.branch_id,
+    ).cte("sales")
+
+    res = scoped(
+        select(Reservation.status, func.count().label("cnt")).group_by(Reservation.status),
+        Reservation.branch_id,
+    ).cte("res")
+    by_status = select(
+        func.coalesce(func.json_object_agg(res.c.status, res.c.cnt), literal_column("'{}'::json"))
+    ).scalar_subquery()
+
+    per_branch = (
+        select(
+            Branch.code,
+            Branch.name,
+            func.sum(r.sales_count).label("sales_count"),
+            func.sum(r.total_cents).label("revenue_cents"),
+        )
+        .join(r, r.branch_id == Branch.id)
+        .where(r.context == BOOKSTORE, r.day == today)
+        .group_by(Branch.id)
+        .cte("per_branch")
+    )
+    branches_today = select(
+        func.coalesce(
+            func.json_agg(aggregate_order_by(
+                func.json_build_object(
+                    _key("code"), per_branch.c.code,
+                    _key("name"), per_branch.c.name,
+                    _key("sales_count"), per_branch.c.sales_count,
+                    _key("revenue_cents"), per_branch.c.revenue_cents,
+                ),
+                per_branch.c.code,
+            )),
+            literal_column("'[]'::json"),
+        )
+    ).scalar_subquery()
+
+    return select(
+        students.label("total_students"),
+        kg_students.label("total_kg_students"),
+        sales.c.today_count,
+        sales.c.today_cents,
+        sales.c.month_count,
+        sales.c.month_cents,
+        by_status.label("reservations_by_status"),
+        low_stock.label("low_stock_items"),
+        branches_today.label("branches_today"),
+    ).select_from(sales)
+
+
+def summary(db: Session, *, branch_id: UUID | None = None) -> dict[str, Any]:
+    """Dashboard KPIs for one branch (or all), served from dashboard_cache within its TTL."""
+    cached = dashboard_cache.get(branch_id)
+    if cached is not None:
+        return cached
+
+    today = local_today()
+    row = db.execute(_summary_stmt(branch_id, today)).one()
+    result = {
+        "date": str(today),
+        "total_students": int(row.total_students),
+        "total_kg_students": int(row.total_kg_students),
+        "sales_today": {"count": int(row.today_count), "revenue_cents": int(row.today_cents)},
+        "sales_month": {"count": int(row.month_count), "revenue_cents": int(row.month_cents)},
+        "reservations_by_status": dict(row.reservations_by_status or {}),
+        "low_stock_items": int(row.low_stock_items),
+        "branches_today": list(row.branches_today or []),
+    }
+    dashboard_cache.put(branch_id, result)
+    return result
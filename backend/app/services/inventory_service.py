@@ -5,23 +5,11 @@ import sqlalchemy as sa
 from sqlalchemy import select, func, insert, and_, update
 from sqlalchemy.orm import Session
 
-from backend.app.models.ledger import StockLedger
-from backend.app.models.reservation import Reservation
 from backend.app.models.adjustment import Adjustment
-from backend.app.services.notify.outbox_service import ensure_queued_ready
-
-_PHYSICAL_EXCLUDE = ("reserve_hold", "reserve_release")
-
-def _active_reserved_qty(db: Session, branch_id: _UUID, item_id: _UUID) -> int:
-    q = (
-        select(func.coalesce(func.sum(Reservation.qty), 0))
-        .where(
-            Reservation.branch_id == branch_id,
-            Reservation.item_id == item_id,
-            Reservation.status == "active",
-        )
-    )
-    return int(db.execute(q).scalar_one())
+from backend.app.models.item import Item
+from backend.app.models.stock_balance import StockBalance
+from backend.app.services.allocation_service import activate_holds
+from backend.app.services.stock_balance_service import get_balance, post_ledger, post_ledger_event
 
 def _activate_oldest_holds(db: Session, branch_id: _UUID, item_id: _UUID) -> int:
     """
@@ -30,72 +18,26 @@ def _activate_oldest_holds(db: Session, branch_id: _UUID, item_id: _UUID) -> int
     Sets hold_window = [now, now+14d], stamps notified_at, enqueues WA.
     Returns number of reservations activated.
     """
-    oh = on_hand(db, branch_id, item_id)
-    cap = oh - _active_reserved_qty(db, branch_id, item_id)
-    if cap <= 0:
-        return 0
-
-    rows = db.execute(
-        select(Reservation.id, Reservation.qty)
-        .where(
-            Reservation.branch_id == branch_id,
-            Reservation.item_id == item_id,
-            Reservation.status == "hold",
+    return activate_holds(db, [(branch_id, item_id)]).get((branch_id, item_id), 0)
+
+def _balance_column(column, branch_id: _UUID, item_id: _UUID):
+    return select(
+        func.coalesce(
+            select(column)
+            .where(StockBalance.branch_id == branch_id, StockBalance.item_id == item_id)
+            .scalar_subquery(),
+            0,
         )
-        .order_by(Reservation.created_at.asc())
-        .limit(1000)
-    ).all()
-
-    activated = 0
-    now = sa.func.now()
-    for r in rows:
-        q = int(r.qty)
-        if q > cap:
-            break
-        end = sa.func.now() + sa.text("interval '14 days'")
-        db.execute(
-            sa.update(Reservation)
-            .where(Reservation.id == r.id)
-            .values(
-                status="active",
-                hold_window=sa.func.tstzrange(now, end, "[)"),
-                notified_at=sa.func.now(),
-            )
-        )
-        try:
-            ensure_queued_ready(db, reservation_id=r.id)
-        except Exception:
-            pass
-        cap -= q
-        activated += 1
-
-    return activated
+    )
 
 def on_hand(db: Session, branch_id: _UUID, item_id: _UUID) -> int:
-    q = (
-        select(func.coalesce(func.sum(StockLedger.qty), 0))
-        .where(
-            StockLedger.branch_id == branch_id,
-            StockLedger.item_id == item_id,
-            StockLedger.event.notin_(_PHYSICAL_EXCLUDE),
-        )
-    )
-    return int(db.execute(q).scalar_one())
+    return int(db.execute(_balance_column(StockBalance.on_hand, branch_id, item_id)).scalar_one())
 
 def reserved_qty(db: Session, branch_id: _UUID, item_id: _UUID) -> int:
-    q = (
-        select(func.coalesce(func.sum(Reservation.qty), 0))
-        .where(
-            Reservation.branch_id == branch_id,
-            Reservation.item_id == item_id,
-            Reservation.status.in_(("hold", "active")),
-        )
-    )
-    return int(db.execute(q).scalar_one())
+    return int(db.execute(_balance_column(StockBalance.reserved, branch_id, item_id)).scalar_one())
 
 def get_inventory_summary(db: Session, branch_id: _UUID, item_id: _UUID) -> dict:
-    oh = on_hand(db, branch_id, item_id)
-    rq = reserved_qty(db, branch_id, item_id)
+    oh, rq = get_balance(db, branch_id, item_id)
     return {
         "branch_id": branch_id,
         "item_id": item_id,
@@ -104,17 +46,42 @@ def get_inventory_summary(db: Session, branch_id: _UUID, item_id: _UUID) -> dict
         "available": oh - rq,
     }
 
+def get_inventory_summaries(db: Session, branch_id: _UUID, item_ids: list[_UUID]) -> list[dict]:
+    """Summaries for many items of one branch from a single query, in input order."""
+    return get_pair_summaries(db, [(branch_id, item_id) for item_id in item_ids])
+
+def get_pair_summaries(db: Session, pairs: list[tuple[_UUID, _UUID]]) -> list[dict]:
+    """Summaries for any set of (branch_id, item_id) pairs from a single query, in input order."""
+    if not pairs:
+        return []
+    rows = db.execute(
+        select(StockBalance.branch_id, StockBalance.item_id, StockBalance.on_hand, StockBalance.reserved).where(
+            sa.tuple_(StockBalance.branch_id, StockBalance.item_id).in_(pairs)
+        )
+    ).all()
+    found = {(r.branch_id, r.item_id): (int(r.on_hand), int(r.reserved)) for r in rows}
+    out = []
+    for branch_id, item_id in pairs:
+        oh, rq = found.get((branch_id, item_id), (0, 0))
+        out.append({
+            "branch_id": branch_id,
+            "item_id": item_id,
+            "on_hand": oh,
+            "reserved": rq,
+            "available": oh - rq,
+        })
+    return out
+
 def receive_stock(db: Session, *, branch_id: _UUID, item_id: _UUID, qty: int) -> dict:
     if qty <= 0:
         raise ValueError("qty must be > 0")
-    db.execute(
-        insert(StockLedger).values(
-            branch_id=branch_id,
-            item_id=item_id,
-            event="receive",
-            qty=int(qty),
-            ref_type="receipt",
-        )
+    post_ledger_event(
+        db,
+        branch_id=branch_id,
+        item_id=item_id,
+        event="receive",
+        qty=int(qty),
+        ref_type="receipt",
     )
     db.commit()
 
@@ -126,6 +93,75 @@ def receive_stock(db: Session, *, branch_id: _UUID, item_id: _UUID, qty: int) ->
 
     return get_inventory_summary(db, branch_id, item_id)
 
+def _manifest_code(line: dict) -> tuple:
+    return (line["sku"].lower(), line["teacher_id"], int(line["grade"]))
+
+def _resolve_manifest_items(db: Session, lines: list[dict]) -> list[_UUID]:
+    """
+    Map each manifest line to an item id (by id, or sku + teacher + grade)
+    in one query. Skus match case-insensitively, like the items' unique key.
+    """
+    ids = {line["item_id"] for line in lines if line.get("item_id")}
+    codes = {_manifest_code(line) for line in lines if not line.get("item_id")}
+
+    conds = []
+    if ids:
+        conds.append(Item.id.in_(ids))
+    if codes:
+        conds.append(sa.tuple_(func.lower(Item.sku), Item.teacher_id, Item.grade).in_(codes))
+    rows = db.execute(select(Item.id, Item.sku, Item.teacher_id, Item.grade).where(sa.or_(*conds))).all()
+
+    known_ids = {r.id for r in rows}
+    by_code = {(r.sku.lower(), r.teacher_id, int(r.grade)): r.id for r in rows}
+
+    resolved, missing = [], []
+    for n, line in enumerate(lines, start=1):
+        if line.get("item_id"):
+            item_id = line["item_id"] if line["item_id"] in known_ids else None
+        else:
+            item_id = by_code.get(_manifest_code(line))
+        if item_id is None:
+            missing.append(str(n))
+        resolved.append(item_id)
+    if missing:
+        raise ValueError(f"Unknown item on manifest line(s): {', '.join(missing)}")
+    return resolved
+
+def receive_manifest(db: Session, *, branch_id: _UUID, lines: list[dict]) -> dict:
+    """
+    Receive a whole delivery: all 'receive' ledger rows in one statement,
+    hold activation once for the affected items, summaries in one query.
+    Lines for the same item are merged.
+    """
+    if not lines:
+        raise ValueError("At least one line is required")
+    if any(int(line["qty"]) <= 0 for line in lines):
+        raise ValueError("qty must be > 0")
+
+    item_ids = _resolve_manifest_items(db, lines)
+    totals: dict[_UUID, int] = {}
+    for item_id, line in zip(item_ids, lines):
+        totals[item_id] = totals.get(item_id, 0) + int(line["qty"])
+
+    post_ledger(db, [
+        dict(branch_id=branch_id, item_id=item_id, event="receive", qty=qty, ref_type="receipt", ref_id=None)
+        for item_id, qty in totals.items()
+    ])
+    db.commit()
+
+    activated = 0
+    try:
+        activated = sum(activate_holds(db, [(branch_id, i) for i in totals]).values())
+        db.commit()
+    except Exception:
+        db.rollback()
+
+    return {
+        "received_lines": len(lines),
+        "activated_holds": activated,
+        "summaries": get_inventory_summaries(db, branch_id, list(totals)),
+    }
+
 def adjust_stock(
     db: Session, *, branch_id: _UUID, item_id: _UUID, delta: int, reason: str | None = None
 ) -> dict:
@@ -149,14 +185,14 @@ def adjust_stock(
         .returning(Adjustment.id)
     ).scalar_one()
 
-    db.execute(
-        insert(StockLedger).values(
-            branch_id=branch_id,
-            item_id=item_id,
-            event="adjust",
-            qty=int(delta),
-            ref_type="adjustment",
-        )
+    post_ledger_event(
+        db,
+        branch_id=branch_id,
+        item_id=item_id,
+        event="adjust",
+        qty=int(delta),
+        ref_type="adjustment",
+        ref_id=adj_id,
     )
     db.commit()
     return get_inventory_summary(db, branch_id, item_id)
@@ -177,26 +213,12 @@ def transfer_stock(
 
     now = sa.func.now()
 
-    db.execute(
-        insert(StockLedger).values(
-            branch_id=from_branch_id,
-            item_id=item_id,
-            event="transfer_out",
-            qty=-int(qty),
-            at=now,
-            ref_type="transfer",
-        )
-    )
-    db.execute(
-        insert(StockLedger).values(
-            branch_id=to_branch_id,
-            item_id=item_id,
-            event="transfer_in",
-            qty=int(qty),
-            at=now,
-            ref_type="transfer",
-        )
-    )
+    post_ledger(db, [
+        dict(branch_id=from_branch_id, item_id=item_id, event="transfer_out",
+             qty=-int(qty), at=now, ref_type="transfer", ref_id=None),
+        dict(branch_id=to_branch_id, item_id=item_id, event="transfer_in",
+             qty=int(qty), at=now, ref_type="transfer", ref_id=None),
+    ])
     db.commit()
     return {
         "from_summary": get_inventory_summary(db, branch_id=from_branch_id, item_id=item_id),
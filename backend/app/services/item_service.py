@@ -3,6 +3,7 @@ from uuid import UUID
 from sqlalchemy import select, insert, func
 from sqlalchemy.orm import Session
 from backend.app.models.item import Item
+from backend.app.services import reference_cache
 
 def get_or_create_item(
     db: Session, *,
@@ -29,5 +30,6 @@ def get_or_create_item(
             default_price_cents=default_price_cents,
         ).returning(Item.id)
     ).scalar_one()
+    reference_cache.invalidate(db, reference_cache.ITEMS)
     db.commit()
     return new_id
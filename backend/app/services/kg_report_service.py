@@ -1,26 +1,33 @@
 from datetime import date, timedelta
 from uuid import UUID as PyUUID
-from sqlalchemy import select, func, text, cast, Date
+from sqlalchemy import select, func, text
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
 from backend.app.models.branch import Branch
 from backend.app.models.kg_items import KgItem
-from backend.app.models.kg_sale import KgSale
 from backend.app.models.revenue_adjustment import RevenueAdjustment
+from backend.app.models.sales_rollup import SalesDailyRollup
 from backend.app.schemas.kg_report import KgDailySalesOut
+from backend.app.services.sales_rollup_service import KINDERGARTEN
+
+def _rollup_range(branch_id: PyUUID, start_date: date, end_date: date):
+    r = SalesDailyRollup
+    return sa.and_(
+        r.branch_id == branch_id,
+        r.day >= start_date,
+        r.day <= end_date,
+        r.context == KINDERGARTEN,
+    )
 
 def daily_sales_totals(db: Session, *, branch_id: PyUUID, start_date: date, end_date: date) -> KgDailySalesOut:
     code = db.execute(select(Branch.code).where(Branch.id == branch_id)).scalar_one()
 
+    r = SalesDailyRollup
     sales_agg = db.execute(
         select(
-            func.coalesce(func.sum(KgSale.total_cents), 0).label("total_cents"),
-            func.count(KgSale.id).label("sales_count")
-        ).where(
-            KgSale.branch_id == branch_id,
-            cast(KgSale.sold_at.op('AT TIME ZONE')('Africa/Cairo'), Date) >= start_date,
-            cast(KgSale.sold_at.op('AT TIME ZONE')('Africa/Cairo'), Date) <= end_date
-        )
+            func.coalesce(func.sum(r.total_cents), 0).label("total_cents"),
+            func.coalesce(func.sum(r.sales_count), 0).label("sales_count")
+        ).where(_rollup_range(branch_id, start_date, end_date))
     ).one()
     
     sales_total_cents = int(sales_agg.total_cents)
@@ -49,17 +56,17 @@ def daily_sales_totals(db: Session, *, branch_id: PyUUID, start_date: date, end_
     )
 
 def get_detailed_sales_report(db: Session, *, branch_id: PyUUID, start_date: date, end_date: date):
+    r = SalesDailyRollup
     stmt = (
         select(
             KgItem.name.label("item_name"),
-            func.sum(KgSale.qty).label("total_qty"),
-            func.sum(KgSale.total_cents).label("total_amount_cents")
+            func.sum(r.qty).label("total_qty"),
+            func.sum(r.total_cents).label("total_amount_cents")
         )
-        .join(KgItem, KgSale.kg_item_id == KgItem.id)
+        .join(KgItem, r.item_id == KgItem.id)
         .where(
-            KgSale.branch_id == branch_id,
-            cast(KgSale.sold_at.op('AT TIME ZONE')('Africa/Cairo'), Date) >= start_date,
-            cast(KgSale.sold_at.op('AT TIME ZONE')('Africa/Cairo'), Date) <= end_date
+            _rollup_range(branch_id, start_date, end_date),
+            r.sales_count > 0,
         )
         .group_by(KgItem.name)
         .order_by(KgItem.name)
@@ -4,13 +4,13 @@ from sqlalchemy import insert, select
 from typing import List
 
 from backend.app.models.kg_items import KgItem
-from backend.app.models.kg_sale import KgSale
 from backend.app.models.kg_inventory_ledger import KgInventoryLedger
 from backend.app.schemas.kg_sale import KgSaleCreate
 from backend.app.services import kg_inventory_service
+from backend.app.services.sales_rollup_service import post_kg_sales
 
-def create_kg_sale(db: Session, *, sale_in: KgSaleCreate) -> List[KgSale]:
-    created_sales = []
+def create_kg_sale(db: Session, *, sale_in: KgSaleCreate) -> List:
+    sales = []
     
     with db.begin():
         for line in sale_in.lines:
@@ -33,15 +33,16 @@ def create_kg_sale(db: Session, *, sale_in: KgSaleCreate) -> List[KgSale]:
                 )
 
             total_cents = item.default_price_cents * line.qty
-            sale_obj = KgSale(
+            sales.append(dict(
                 branch_id=sale_in.branch_id,
                 kg_student_id=sale_in.kg_student_id,
                 kg_item_id=line.kg_item_id,
                 qty=line.qty,
                 unit_price_cents=item.default_price_cents,
                 total_cents=total_cents
-            )
-            db.add(sale_obj)
-            created_sales.append(sale_obj)
+            ))
+
+        # All lines in one statement, which also updates sales_daily_rollup.
+        created_sales = post_kg_sales(db, sales)
     
-    return created_sales
\ No newline at end of file
+    return created_sales
@@ -0,0 +1,184 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select, insert, func, or_, text, union_all, literal
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from backend.app.models.ledger import StockLedger
+from backend.app.models.ledger_checkpoint import StockLedgerCheckpoint, StockLedgerCheckpointTotal
+
+# Ledger rows per (branch_id, item_id, event) as "latest checkpoint totals +
+# tail". For raw SQL callers (rebuild, inventory_view) that always want the
+# current state; `id` is the highest ledger id each row stands for.
+LEDGER_SOURCE_SQL = """
+    cp AS (
+        SELECT id, as_of, ledger_high_watermark
+          FROM stock_ledger_checkpoints
+         ORDER BY as_of DESC
+         LIMIT 1
+    ),
+    ledger_src AS (
+        SELECT t.branch_id, t.item_id, t.event, t.qty, cp.ledger_high_watermark AS id
+          FROM stock_ledger_checkpoint_totals t
+          JOIN cp ON cp.id = t.checkpoint_id
+        UNION ALL
+        SELECT l.branch_id, l.item_id, l.event, l.qty, l.id
+          FROM stock_ledger l
+          LEFT JOIN cp ON true
+         WHERE cp.id IS NULL
+            OR l.at >= cp.as_of
+            OR l.id > cp.ledger_high_watermark
+    )
+"""
+
+
+def latest_checkpoint(db: Session, *, at_or_before: datetime | None = None) -> Row | None:
+    stmt = (
+        select(StockLedgerCheckpoint.id, StockLedgerCheckpoint.as_of, StockLedgerCheckpoint.ledger_high_watermark)
+        .order_by(StockLedgerCheckpoint.as_of.desc())
+        .limit(1)
+    )
+    if at_or_before is not None:
+        stmt = stmt.where(StockLedgerCheckpoint.as_of <= at_or_before)
+    return db.execute(stmt).one_or_none()
+
+
+def event_totals_query(
+    cp: Row | None,
+    *,
+    as_of: datetime | None = None,
+    branch_id: UUID | None = None,
+    per_item: bool = True,
+):
+    """
+    Sum(qty) per (branch_id, item_id, event) over ledger rows with at < as_of
+    (all rows if as_of is None), read as checkpoint `cp` + the rows it does
+    not cover: those at/after cp.as_of, plus late rows written with an older
+    `at` after the checkpoint was taken (id > watermark).
+    `cp` must satisfy cp.as_of <= as_of.
+    """
+    L = StockLedger
+    T = StockLedgerCheckpointTotal
+
+    tail = select(L.branch_id, L.item_id, L.event, L.qty)
+    if cp is not None:
+        tail = tail.where(or_(L.at >= cp.as_of, L.id > cp.ledger_high_watermark))
+    if as_of is not None:
+        tail = tail.where(L.at < as_of)
+    if branch_id is not None:
+        tail = tail.where(L.branch_id == branch_id)
+    parts = [tail]
+
+    if cp is not None:
+        head = select(T.branch_id, T.item_id, T.event, T.qty).where(T.checkpoint_id == cp.id)
+        if branch_id is not None:
+            head = head.where(T.branch_id == branch_id)
+        parts.append(head)
+
+    u = union_all(*parts).subquery()
+    keys = [u.c.branch_id, u.c.item_id, u.c.event] if per_item else [u.c.event]
+    return select(*keys, func.sum(u.c.qty).label("qty")).group_by(*keys)
+
+
+def branch_event_totals(db: Session, *, branch_id: UUID, as_of: datetime) -> dict[str, int]:
+    """Sum(qty) per event for a branch over ledger rows with at < as_of."""
+    cp = latest_checkpoint(db, at_or_before=as_of)
+    rows = db.execute(event_totals_query(cp, as_of=as_of, branch_id=branch_id, per_item=False)).all()
+    return {str(r[0]): int(r[1] or 0) for r in rows}
+
+
+def advance_checkpoint(db: Session, *, as_of: datetime) -> dict[str, Any]:
+    """
+    Write a checkpoint closing the ledger at `as_of`, built from the previous
+    checkpoint + tail rather than full history. Ledger writers are blocked
+    (SHARE lock) while it runs so the id watermark has no in-flight gaps.
+    Caller commits.
+    """
+    existing = db.execute(
+        select(StockLedgerCheckpoint.id).where(StockLedgerCheckpoint.as_of == as_of)
+    ).scalar_one_or_none()
+    if existing is not None:
+        return {"checkpoint_id": existing, "as_of": as_of, "created": False, "rows": 0}
+
+    db.execute(text("LOCK TABLE stock_ledger IN SHARE MODE"))
+
+    watermark = int(db.execute(select(func.coalesce(func.max(StockLedger.id), 0))).scalar_one())
+    prev = latest_checkpoint(db, at_or_before=as_of)
+
+    cp_id = db.execute(
+        insert(StockLedgerCheckpoint)
+        .values(as_of=as_of, ledger_high_watermark=watermark)
+        .returning(StockLedgerCheckpoint.id)
+    ).scalar_one()
+
+    totals = event_totals_query(prev, as_of=as_of).subquery()
+    result = db.execute(
+        insert(StockLedgerCheckpointTotal).from_select(
+            ["checkpoint_id", "branch_id", "item_id", "event", "qty"],
+            select(literal(cp_id, StockLedgerCheckpoint.id.type), totals.c.branch_id, totals.c.item_id, totals.c.event, totals.c.qty),
+        )
+    )
+    return {
+        "checkpoint_id": cp_id,
+        "as_of": as_of,
+        "created": True,
+        "rows": int(result.rowcount or 0),
+        "based_on": prev.id if prev is not None else None,
+    }
+
+
+def verify_checkpoint(db: Session, *, checkpoint_id: int | None = None) -> dict[str, Any]:
+    """
+    Recompute a checkpoint (latest by default) from the full ledger history
+    and list every (branch_id, item_id, event) whose stored total differs.
+    """
+    C = StockLedgerCheckpoint
+    stmt = select(C.id, C.as_of, C.ledger_high_watermark)
+    if checkpoint_id is not None:
+        stmt = stmt.where(C.id == checkpoint_id)
+    else:
+        stmt = stmt.order_by(C.as_of.desc()).limit(1)
+    cp = db.execute(stmt).one_or_none()
+    if cp is None:
+        return {"checkpoint_id": checkpoint_id, "checked": False, "mismatches": []}
+
+    rows = db.execute(
+        text("""
+            WITH full_history AS (
+                SELECT branch_id, item_id, event, SUM(qty) AS qty
+                  FROM stock_ledger
+                 WHERE at < :as_of AND id <= :watermark
+                 GROUP BY branch_id, item_id, event
+            ),
+            stored AS (
+                SELECT branch_id, item_id, event, qty
+                  FROM stock_ledger_checkpoint_totals
+                 WHERE checkpoint_id = :cp_id
+            )
+            SELECT branch_id, item_id, event, s.qty AS stored, f.qty AS expected
+              FROM full_history f
+              FULL OUTER JOIN stored s USING (branch_id, item_id, event)
+             WHERE COALESCE(s.qty, 0) <> COALESCE(f.qty, 0)
+             ORDER BY branch_id, item_id, event
+        """),
+        {"as_of": cp.as_of, "watermark": cp.ledger_high_watermark, "cp_id": cp.id},
+    ).mappings().all()
+
+    return {
+        "checkpoint_id": cp.id,
+        "as_of": cp.as_of,
+        "checked": True,
+        "mismatches": [
+            {
+                "branch_id": r["branch_id"],
+                "item_id": r["item_id"],
+                "event": str(r["event"]),
+                "stored": int(r["stored"] or 0),
+                "expected": int(r["expected"] or 0),
+            }
+            for r in rows
+        ],
+    }
@@ -0,0 +1,182 @@
+"""
+Scrape-time collectors for /metrics: connection pools, the read replica
+gate, in-process caches, and database state (outbox depth and age,
+reservations by status).
+
+Pool, replica and cache figures belong to the process answering the scrape; under
+gunicorn (multi-process mode) they carry a `pid` label so each worker's
+series stay apart. The database figures are read on a read session and
+kept for METRICS_DB_TTL_SECONDS, so frequent scrapes or several
+Prometheus servers cost one pair of GROUP BY queries per interval per
+process.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+from prometheus_client.registry import Collector
+from prometheus_client.utils import floatToGoString
+from sqlalchemy import func, select
+
+from backend.app.core import metrics
+from backend.app.core.cache import TTLCache
+from backend.app.core.config import settings
+from backend.app.db import session
+from backend.app.models.notify import NotifyOutbox
+from backend.app.models.reservation import Reservation
+from backend.app.services import auth_cache, dashboard_cache, reference_cache
+from backend.app.services.notify import queue
+
+_db_snapshot = TTLCache(ttl=settings.metrics_db_ttl_seconds, maxsize=1)
+
+RESERVATION_STATUSES = ("queued", "hold", "active", "fulfilled", "cancelled", "expired")
+OUTBOX_STATES = (queue.PENDING, queue.SENDING, queue.SENT, queue.FAILED)
+
+_PID = ["pid"] if metrics.MULTIPROCESS else []
+
+
+def _pid() -> list[str]:
+    return [str(os.getpid())] if _PID else []
+
+
+class PoolCollector(Collector):
+    def collect(self):
+        gauges = {
+            key: GaugeMetricFamily(f"eltafawook_db_pool_{key}", help, labels=["engine", *_PID])
+            for key, help in (
+                ("size", "Configured pool size."),
+                ("checked_out", "Connections currently checked out."),
+                ("overflow", "Connections open beyond the pool size."),
+            )
+        }
+        timeouts = CounterMetricFamily(
+            "eltafawook_db_pool_checkout_timeouts",
+            "Checkouts that gave up waiting for a connection.",
+            labels=["engine", *_PID],
+        )
+        waits = HistogramMetricFamily(
+            "eltafawook_db_pool_checkout_wait_seconds",
+            "Time spent waiting for a pooled connection.",
+            labels=["engine", *_PID],
+        )
+        for eng, s in session.pool_metrics().items():
+            labels = [eng, *_pid()]
+            for key, family in gauges.items():
+                if key in s:
+                    family.add_metric(labels, s[key])
+            if "checkout_timeouts" in s:
+                timeouts.add_metric(labels, s["checkout_timeouts"])
+            if "wait_ms_buckets" in s:
+                waits.add_metric(
+                    labels,
+                    [(floatToGoString(le / 1000), n) for le, n in s["wait_ms_buckets"]],
+                    s["wait_ms_sum"] / 1000,
+                )
+        yield from gauges.values()
+        yield timeouts
+        yield waits
+
+
+class ReplicaCollector(Collector):
+    def collect(self):
+        if session.read_engine is None:
+            return
+        s = session.replica_gate.stats()
+        labels = _pid()
+        healthy = GaugeMetricFamily(
+            "eltafawook_read_replica_healthy", "Whether reads currently go to the replica.", labels=_PID
+        )
+        healthy.add_metric(labels, 1 if s["healthy"] else 0)
+        yield healthy
+        if s["lag_seconds"] is not None:
+            lag = GaugeMetricFamily("eltafawook_read_replica_lag_seconds", "Last measured replica lag.", labels=_PID)
+            lag.add_metric(labels, s["lag_seconds"])
+            yield lag
+        fallbacks = CounterMetricFamily(
+            "eltafawook_read_replica_fallbacks", "Read sessions sent to the primary instead.", labels=_PID
+        )
+        fallbacks.add_metric(labels, s["fallbacks"])
+        yield fallbacks
+
+
+class CacheCollector(Collector):
+    def collect(self):
+        caches = {"dashboard": dashboard_cache.stats(), "reference": reference_cache.stats(), "auth": auth_cache.stats()}
+        hits = CounterMetricFamily("eltafawook_cache_hits", "In-process cache hits.", labels=["cache", *_PID])
+        misses = CounterMetricFamily("eltafawook_cache_misses", "In-process cache misses.", labels=["cache", *_PID])
+        size = GaugeMetricFamily("eltafawook_cache_size", "Entries held by the in-process cache.", labels=["cache", *_PID])
+        for name, s in caches.items():
+            labels = [name, *_pid()]
+            hits.add_metric(labels, s["hits"])
+            misses.add_metric(labels, s["misses"])
+            size.add_metric(labels, s["size"])
+        yield from (hits, misses, size)
+
+
+def _db_state() -> dict[str, Any]:
+    state = _db_snapshot.get("state")
+    if state is None:
+        with session.read_session() as db:
+            outbox = db.execute(
+                select(
+                    NotifyOutbox.state,
+                    func.count(),
+                    func.extract("epoch", func.now() - func.min(NotifyOutbox.created_at)),
+                ).group_by(NotifyOutbox.state)
+            ).all()
+            reservations = db.execute(
+                select(Reservation.status, func.count()).group_by(Reservation.status)
+            ).all()
+        state = {
+            "outbox": {s: int(n) for s, n, _ in outbox},
+            "outbox_oldest_pending": next((float(age) for s, _, age in outbox if s == queue.PENDING and age is not None), 0.0),
+            "reservations": {s: int(n) for s, n in reservations},
+        }
+        _db_snapshot.put("state", state)
+    return state
+
+
+class DbStateCollector(Collector):
+    def describe(self):
+        # Registration would otherwise run collect(), i.e. the queries.
+        return []
+
+    def collect(self):
+        up = GaugeMetricFamily("eltafawook_metrics_db_up", "Whether the database figures below could be read.")
+        try:
+            state = _db_state()
+        except Exception:
+            up.add_metric([], 0)
+            yield up
+            return
+        up.add_metric([], 1)
+        yield up
+
+        outbox = GaugeMetricFamily("eltafawook_outbox_messages", "Notification outbox messages by state.", labels=["state"])
+        for state_name, n in (dict.fromkeys(OUTBOX_STATES, 0) | state["outbox"]).items():
+            outbox.add_metric([state_name], n)
+        yield outbox
+
+        yield GaugeMetricFamily(
+            "eltafawook_outbox_oldest_pending_age_seconds",
+            "Age of the oldest pending outbox message (0 when none).",
+            value=state["outbox_oldest_pending"],
+        )
+
+        reservations = GaugeMetricFamily("eltafawook_reservations", "Reservations by status.", labels=["status"])
+        for status, n in (dict.fromkeys(RESERVATION_STATUSES, 0) | state["reservations"]).items():
+            reservations.add_metric([status], n)
+        yield reservations
+
+
+POOLS = PoolCollector()
+REPLICA = ReplicaCollector()
+CACHES = CacheCollector()
+DB_STATE = DbStateCollector()
+
+
+def register() -> None:
+    for collector in (POOLS, REPLICA, CACHES, DB_STATE):
+        metrics.register_collector(collector)
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import settings
+from backend.app.services.notify import queue
+
+Sender = Callable[[str, str], Dict[str, object]]
+
+
+class TokenBucket:
+    """
+    Token bucket: `rate` tokens per second, at most `burst` banked. acquire()
+    waits only as long as needed for the next token instead of a fixed sleep
+    after every send.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, *, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._last = clock()
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop = None
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return the seconds to wait."""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def full_in(self) -> float:
+        """Seconds until `burst` tokens are banked again."""
+        self._refill()
+        return (self.burst - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        # drain_whatsapp runs each batch in a fresh event loop; asyncio locks
+        # must not be shared across loops.
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        async with self._lock:
+            while (wait := self.try_acquire()) > 0:
+                await asyncio.sleep(wait)
+
+
+@dataclass
+class Channel:
+    sender: Sender
+    bucket: TokenBucket
+    concurrency: int = 1
+
+
+_channels: dict[str, Channel] = {}
+
+
+def register_channel(name: str, sender: Sender, *, rate_per_minute: float, burst: int = 1, concurrency: int = 1) -> Channel:
+    ch = Channel(sender=sender, bucket=TokenBucket(rate_per_minute / 60.0, burst), concurrency=max(1, concurrency))
+    _channels[name] = ch
+    return ch
+
+
+def get_channel(name: str) -> Channel:
+    ch = _channels.get(name)
+    if ch is None:
+        ch = _default_channel(name)
+    return ch
+
+
+def _default_channel(name: str) -> Channel:
+    if name != "wa_web":
+        raise ValueError(f"No sender registered for channel {name!r}")
+    if settings.notify_sender in ("fake", "noop"):
+        from backend.app.services.notify.fake_sender import FakeSender
+        sender: Sender = FakeSender()
+    else:
+        from backend.app.services.notify.whatsapp_pywhatkit import send_ready_message
+        sender = send_ready_message
+    # WhatsApp Web drives a single browser, so one send at a time (across
+    # processes too: see _send_lock).
+    return register_channel(
+        name,
+        sender,
+        rate_per_minute=settings.wa_rate_per_minute,
+        burst=settings.wa_burst,
+        concurrency=1,
+    )
+
+
+async def _send_one(ch: Channel, sem: asyncio.Semaphore, row) -> dict:
+    async with sem:
+        await ch.bucket.acquire()
+        started = time.perf_counter()
+        try:
+            res = await asyncio.to_thread(ch.sender, row.to, row.message)
+            ok = bool(res.get("ok")) if isinstance(res, dict) else False
+            err = None
+            if not ok:
+                err_val = res.get("error") if isinstance(res, dict) else None
+                err = str(err_val) if err_val is not None else "unknown"
+        except Exception as e:
+            ok, err = False, str(e)
+        latency_ms = int((time.perf_counter() - started) * 1000)
+    return {"id": row.id, "attempts": row.attempts, "ok": ok, "error": err, "latency_ms": latency_ms}
+
+
+@contextmanager
+def _send_lock(db: Session, channel: str, *, wait: bool) -> Iterator[bool]:
+    """
+    The channel's send lock, shared by every process that sends (the
+    dispatcher worker and /notifications/wa/drain in each API worker): a
+    session-level advisory lock on a dedicated connection, so concurrency
+    and the token bucket hold across processes. Yields whether it was
+    taken; with wait=False it gives up at once when another process has it.
+    """
+    key = {"k": f"notify:{channel}"}
+    with db.get_bind().connect() as conn:
+        if wait:
+            conn.execute(text("SELECT pg_advisory_lock(hashtextextended(:k, 0))"), key)
+            locked = True
+        else:
+            locked = bool(conn.execute(text("SELECT pg_try_advisory_lock(hashtextextended(:k, 0))"), key).scalar())
+        try:
+            yield locked
+        finally:
+            if locked:
+                conn.execute(text("SELECT pg_advisory_unlock(hashtextextended(:k, 0))"), key)
+
+
+async def dispatch_batch(db: Session, *, channel: str = "wa_web", limit: int | None = None, wait: bool = True) -> dict:
+    """
+    Claim one batch and send it concurrently (bounded by the channel's
+    concurrency and token bucket), holding the channel's send lock. With
+    wait=False a lock held by another process returns {"busy": True} at
+    once. DB work stays on the calling thread; blocking senders run in
+    worker threads.
+    """
+    ch = get_channel(channel)
+    with _send_lock(db, channel, wait=wait) as locked:
+        if not locked:
+            return {"sent": 0, "retrying": 0, "failed": 0, "scanned": 0, "busy": True}
+        rows = queue.claim(db, channel=channel, limit=limit or settings.notify_batch_size)
+        if not rows:
+            return {"sent": 0, "retrying": 0, "failed": 0, "scanned": 0}
+
+        sem = asyncio.Semaphore(ch.concurrency)
+        results = await asyncio.gather(*(_send_one(ch, sem, r) for r in rows))
+        counts = queue.ack(db, results)
+        # The next holder may be another process starting with a full
+        # bucket; hand over only once ours is full again.
+        await asyncio.sleep(ch.bucket.full_in())
+
+    return {
+        "sent": counts[queue.SENT],
+        "retrying": counts[queue.PENDING],
+        "failed": counts[queue.FAILED],
+        "scanned": len(rows),
+        "avg_latency_ms": int(sum(r["latency_ms"] for r in results) / len(results)),
+    }
+
+
+async def run_forever(session_factory, *, channel: str = "wa_web", listener=None, idle_seconds: float = 5.0) -> None:
+    """
+    Dispatch batches until cancelled. When the outbox is idle, wait until the
+    next retry is due, capped at WORKER_FALLBACK_SECONDS; with a connected
+    `listener` (db.events.Listener) an 'outbox' notification wakes it at
+    once, without one (or while it reconnects) it polls every
+    `idle_seconds`. A failed batch is retried after `idle_seconds` too.
+    """
+    while True:
+        db = session_factory()
+        due = None
+        try:
+            result = await dispatch_batch(db, channel=channel)
+            if not result["scanned"]:
+                due = queue.next_due_in(db, channel=channel)
+        except Exception as e:
+            db.rollback()
+            result = {"dispatch_error": str(e)}
+        finally:
+            db.close()
+        if result.get("scanned") or "dispatch_error" in result:
+            print(result)
+        if result.get("scanned"):
+            continue
+
+        listening = listener is not None and listener.connected and "dispatch_error" not in result
+        timeout = float(settings.worker_fallback_seconds if listening else idle_seconds)
+        if due is not None:
+            timeout = max(0.0, min(timeout, due))
+        if listener is not None:
+            await asyncio.to_thread(listener.wait, timeout)
+        else:
+            await asyncio.sleep(timeout)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+import time
+from typing import Dict
+
+
+class FakeSender:
+    """
+    In-process sender for tests and local runs: records every message instead
+    of driving a browser. Numbers in `fail_for` get {"ok": False}.
+    """
+
+    def __init__(self, *, delay: float = 0.0, fail_for: set[str] | None = None):
+        self.delay = delay
+        self.fail_for = set(fail_for or ())
+        self.sent: list[tuple[str, str]] = []
+
+    def __call__(self, phone: str, message: str) -> Dict[str, object]:
+        if self.delay:
+            time.sleep(self.delay)
+        if phone in self.fail_for:
+            return {"ok": False, "error": "fake failure"}
+        self.sent.append((phone, message))
+        return {"ok": True}
@@ -1,29 +1,22 @@
 from __future__ import annotations
 
-import time
-from datetime import datetime, timezone
+import asyncio
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
 import sqlalchemy as sa
-from sqlalchemy import insert, select, update, func
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 
-from backend.app.models.notify import NotifyOutbox
-from backend.app.services.notify.whatsapp_pywhatkit import send_ready_message
+from backend.app.services.notify import queue
+from backend.app.services.notify.dispatcher import dispatch_batch
 
 from backend.app.models.reservation import Reservation
 from backend.app.models.student import Student
 from backend.app.models.item import Item
 from backend.app.models.branch import Branch
 
-MAX_ATTEMPTS = 2
-
-
-def _now_utc() -> datetime:
-    return datetime.now(timezone.utc)
-
-
 def queue_whatsapp_ready(
     db: Session,
     *,
@@ -42,21 +35,13 @@ def queue_whatsapp_ready(
       - attempts: starts at 0
       - reservation_id: foreign key for traceability
     """
-    outbox_id = (
-        db.execute(
-            insert(NotifyOutbox)
-            .values(
-                channel="wa_web",
-                to=phone,
-                message=message,
-                template_key="reservation_ready",
-                state="pending",
-                attempts=0,
-                reservation_id=reservation_id,
-            )
-            .returning(NotifyOutbox.id)
-        )
-        .scalar_one()
+    outbox_id = queue.enqueue(
+        db,
+        channel="wa_web",
+        to=phone,
+        message=message,
+        template_key="reservation_ready",
+        reservation_id=reservation_id,
     )
     db.commit()
     return outbox_id
@@ -71,21 +56,8 @@ def ensure_queued_ready(
     """
     If we have a phone, enqueue a ready message for this reservation.
     """
-    r, s, i, b = Reservation, Student, Item, Branch
     row = (
-        db.execute(
-            select(
-                s.phone.label("phone"),
-                s.full_name.label("student_name"),
-                i.name.label("item_name"),
-                b.code.label("branch_code"),
-                func.upper(r.hold_window).label("end"),
-            )
-            .join(b, b.id == r.branch_id)
-            .join(i, i.id == r.item_id)
-            .outerjoin(s, s.id == r.student_id)
-            .where(r.id == reservation_id)
-        )
+        db.execute(_ready_details().where(Reservation.id == reservation_id))
         .mappings()
         .one_or_none()
     )
@@ -96,73 +68,68 @@ def ensure_queued_ready(
     if not phone:
         return None
 
-    msg = (
-        f"Hi {row['student_name'] or ''} 👋\n"
-        f"Your book '{row['item_name']}' is ready at {row['branch_code']}.\n"
-        f"Please collect before: {row['end']}. "
-        f"Note: No returns are allowed."
-    )
-
     return queue_whatsapp_ready(
         db,
         reservation_id=reservation_id,
         phone=phone,
-        message=msg,
+        message=_ready_message(row),
     )
 
 
-def drain_whatsapp(db: Session, *, limit: int = 10, sleep_between: float = 2.0) -> dict:
+def enqueue_ready_bulk(db: Session, *, reservation_ids: list[UUID]) -> int:
     """
-    Try to send up to `limit` pending wa_web messages.
+    Queue "ready for pickup" messages for many reservations with one SELECT
+    and one multi-row INSERT. Reservations without a phone are skipped.
+    Does not commit; returns the number of messages queued.
     """
-    q = (
-        select(NotifyOutbox)
-        .where(NotifyOutbox.channel == "wa_web", NotifyOutbox.state == "pending")
-        .order_by(NotifyOutbox.created_at.asc())
-        .limit(limit)
-    )
-    rows = db.execute(q).scalars().all()
-
-    sent = 0
-    failed = 0
-    for o in rows:
-        db.execute(
-            update(NotifyOutbox)
-            .where(NotifyOutbox.id == o.id)
-            .values(attempts=o.attempts + 1)
+    if not reservation_ids:
+        return 0
+    rows = db.execute(_ready_details().where(Reservation.id.in_(reservation_ids))).mappings().all()
+    values = [
+        {
+            "channel": "wa_web",
+            "to": (row["phone"] or "").strip(),
+            "message": _ready_message(row),
+            "template_key": "reservation_ready",
+            "reservation_id": row["reservation_id"],
+        }
+        for row in rows
+        if (row["phone"] or "").strip()
+    ]
+    return queue.enqueue_many(db, values)
+
+
+def _ready_details():
+    r, s, i, b = Reservation, Student, Item, Branch
+    return (
+        select(
+            r.id.label("reservation_id"),
+            s.phone.label("phone"),
+            s.full_name.label("student_name"),
+            i.name.label("item_name"),
+            b.code.label("branch_code"),
+            func.upper(r.hold_window).label("end"),
         )
-        db.commit()
-
-        try:
-            res = send_ready_message(o.to, o.message)
-            ok = bool(res.get("ok")) if isinstance(res, dict) else False
-            if ok:
-                db.execute(
-                    update(NotifyOutbox)
-                    .where(NotifyOutbox.id == o.id)
-                    .values(state="sent", sent_at=_now_utc(), last_error=None)
-                )
-                db.commit()
-                sent += 1
-            else:
-                err_val = res.get("error") if isinstance(res, dict) else None
-                err = str(err_val) if err_val is not None else "unknown"
-                _mark_failed(db, o.id, err, o.attempts + 1)
-                failed += 1
-        except Exception as e:
-            _mark_failed(db, o.id, str(e), o.attempts + 1)
-            failed += 1
-
-        time.sleep(sleep_between)
-
-    return {"sent": sent, "failed": failed, "scanned": len(rows)}
-
-
-def _mark_failed(db: Session, outbox_id: UUID, err: str, attempts: int) -> None:
-    state = "failed" if attempts >= MAX_ATTEMPTS else "pending"
-    db.execute(
-        update(NotifyOutbox)
-        .where(NotifyOutbox.id == outbox_id)
-        .values(state=state, last_error=err)
+        .join(b, b.id == r.branch_id)
+        .join(i, i.id == r.item_id)
+        .outerjoin(s, s.id == r.student_id)
     )
-    db.commit()
+
+
+def _ready_message(row) -> str:
+    return (
+        f"Hi {row['student_name'] or ''} 👋\n"
+        f"Your book '{row['item_name']}' is ready at {row['branch_code']}.\n"
+        f"Please collect before: {row['end']}. "
+        f"Note: No returns are allowed."
+    )
+
+
+def drain_whatsapp(db: Session, *, limit: int = 10) -> dict:
+    """
+    Send up to `limit` pending wa_web messages now (one dispatcher batch).
+    Pacing comes from the channel's token bucket; see notify.dispatcher.
+    Returns {"busy": True} without sending while another process (e.g. the
+    dispatcher worker) is sending.
+    """
+    return asyncio.run(dispatch_batch(db, channel="wa_web", limit=limit, wait=False))
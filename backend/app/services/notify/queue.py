@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import select, insert, update, or_, and_, func
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import settings
+from backend.app.models.notify import NotifyOutbox
+
+# One state machine for every channel:
+#
+#   pending --claim--> sending --ack ok--> sent
+#                         |
+#                         +--ack error--> pending (next_attempt_at = now + backoff)
+#                         +--ack error, attempts exhausted--> failed
+#
+# A 'sending' row whose claim is older than CLAIM_TIMEOUT (worker died
+# mid-send) is claimable again.
+PENDING, SENDING, SENT, FAILED = "pending", "sending", "sent", "failed"
+
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """Exponential backoff after the `attempts`-th failure, capped."""
+    base = settings.notify_backoff_seconds
+    seconds = min(base * (2 ** max(0, attempts - 1)), settings.notify_backoff_max_seconds)
+    return timedelta(seconds=seconds)
+
+
+def enqueue(
+    db: Session,
+    *,
+    channel: str,
+    to: str,
+    message: str,
+    template_key: Optional[str] = None,
+    variables: Optional[dict[str, Any]] = None,
+    reservation_id: Optional[UUID] = None,
+) -> UUID:
+    """Queue one message, due now. Does not commit."""
+    return db.execute(
+        insert(NotifyOutbox)
+        .values(
+            channel=channel,
+            to=to,
+            message=message,
+            template_key=template_key,
+            variables=variables,
+            state=PENDING,
+            attempts=0,
+            reservation_id=reservation_id,
+        )
+        .returning(NotifyOutbox.id)
+    ).scalar_one()
+
+
+def enqueue_many(db: Session, values: list[dict[str, Any]]) -> int:
+    """Queue many messages (NotifyOutbox column dicts) in one INSERT. Does not commit."""
+    if not values:
+        return 0
+    db.execute(insert(NotifyOutbox).values([{"state": PENDING, "attempts": 0, **v} for v in values]))
+    return len(values)
+
+
+def claim(db: Session, *, channel: str, limit: int) -> list:
+    """
+    Claim up to `limit` due messages (oldest due first) with FOR UPDATE SKIP
+    LOCKED, so concurrent workers never pick the same row, and mark them
+    'sending' with attempts + 1. Commits the claim.
+    """
+    now = func.now()
+    picked = (
+        select(NotifyOutbox.id)
+        .where(
+            NotifyOutbox.channel == channel,
+            or_(
+                and_(NotifyOutbox.state == PENDING, NotifyOutbox.next_attempt_at <= now),
+                and_(NotifyOutbox.state == SENDING, NotifyOutbox.claimed_at < now - CLAIM_TIMEOUT),
+            ),
+        )
+        .order_by(NotifyOutbox.next_attempt_at.asc(), NotifyOutbox.created_at.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        update(NotifyOutbox)
+        .where(NotifyOutbox.id.in_(picked))
+        .values(state=SENDING, claimed_at=now, attempts=NotifyOutbox.attempts + 1)
+        .returning(NotifyOutbox.id, NotifyOutbox.to, NotifyOutbox.message, NotifyOutbox.attempts)
+    ).all()
+    db.commit()
+    return rows
+
+
+def ack(db: Session, results: list[dict]) -> dict[str, int]:
+    """
+    Record the outcome of claimed messages. Each result has id, attempts,
+    ok, error and optionally latency_ms. Failures are rescheduled with
+    backoff until attempts are exhausted. One bulk UPDATE per shape, one
+    commit. Returns counts per resulting state.
+    """
+    if not results:
+        return {SENT: 0, PENDING: 0, FAILED: 0}
+    now = datetime.now(timezone.utc)
+    groups: dict[tuple[str, ...], list[dict]] = {}
+    counts = {SENT: 0, PENDING: 0, FAILED: 0}
+    for r in results:
+        p: dict[str, Any] = {"id": r["id"], "latency_ms": r.get("latency_ms")}
+        if r["ok"]:
+            p.update(state=SENT, sent_at=now, last_error=None)
+        elif r["attempts"] >= settings.notify_max_attempts:
+            p.update(state=FAILED, last_error=r["error"])
+        else:
+            p.update(state=PENDING, last_error=r["error"], next_attempt_at=now + backoff_delay(r["attempts"]))
+        counts[p["state"]] += 1
+        groups.setdefault(tuple(sorted(p)), []).append(p)
+    for params in groups.values():
+        db.execute(update(NotifyOutbox), params)
+    db.commit()
+    return counts
+
+
+def next_due_in(db: Session, *, channel: str) -> float | None:
+    """Seconds until the next pending message of `channel` is due, or None if there is none."""
+    due = db.execute(
+        select(func.min(NotifyOutbox.next_attempt_at)).where(
+            NotifyOutbox.channel == channel, NotifyOutbox.state == PENDING
+        )
+    ).scalar_one_or_none()
+    if due is None:
+        return None
+    return (due - datetime.now(timezone.utc)).total_seconds()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+from typing import Any, Iterable
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from backend.app.core.cache import LRUCache
+from backend.app.core.config import settings
+from backend.app.models.op_log import OpLog
+
+# op id -> stored response of recently completed ops, so client retries of
+# the same op are answered without a database round trip.
+_replay_cache = LRUCache(maxsize=settings.op_replay_cache_size)
+
+
+def get_replays(db: Session, op_ids: Iterable[UUID]) -> dict[UUID, Any]:
+    """
+    Stored responses of already-completed ops among `op_ids`: from the
+    in-process cache first, then one op_log query for the rest.
+    """
+    found: dict[UUID, Any] = {}
+    misses: list[UUID] = []
+    for op_id in set(op_ids):
+        cached = _replay_cache.get(op_id)
+        if cached is not None:
+            found[op_id] = cached
+        else:
+            misses.append(op_id)
+    if misses:
+        rows = db.execute(
+            select(OpLog.id, OpLog.response).where(OpLog.id.in_(misses), OpLog.status == "ok")
+        ).all()
+        for op_id, response in rows:
+            _replay_cache.put(op_id, response)
+            found[op_id] = response
+    return found
+
+
+def claim_op(db: Session, *, op_id: UUID, op_type: str, request: dict[str, Any]) -> Any:
+    """
+    Claim `op_id` in the current transaction before running the op: insert
+    a 'pending' op_log row, or lock the existing one. Returns None when the
+    caller now owns the op and must record_op() its outcome in this same
+    transaction; otherwise the stored response of the completed op.
+
+    A concurrent claimer of the same id blocks (on the insert or the row
+    lock) until the owning transaction ends, so a retry racing the original
+    waits for it and replays its response instead of running again.
+    """
+    claimed = db.execute(
+        pg_insert(OpLog)
+        .values(id=op_id, op_type=op_type, request=jsonable_encoder(request), status="pending")
+        .on_conflict_do_nothing(index_elements=[OpLog.id])
+        .returning(OpLog.id)
+    ).scalar_one_or_none()
+    if claimed is not None:
+        return None
+    row = db.execute(
+        select(OpLog.status, OpLog.response).where(OpLog.id == op_id).with_for_update()
+    ).one_or_none()
+    # A failed ('error') entry is now locked to us, so the caller retries it.
+    if row is None or row.status != "ok":
+        return None
+    return row.response
+
+
+def record_op(
+    db: Session,
+    *,
+    op_id: UUID,
+    op_type: str,
+    request: dict[str, Any],
+    response: Any = None,
+    error: str | None = None,
+) -> Any:
+    """
+    Upsert the outcome of an op into op_log and return the stored response.
+    A completed ('ok') entry is never overwritten; a 'pending' claim or an
+    'error' entry is replaced. Does not commit; call remember_op() once the
+    surrounding transaction has committed.
+    """
+    stored = jsonable_encoder(response) if error is None else None
+    stmt = pg_insert(OpLog).values(
+        id=op_id,
+        op_type=op_type,
+        request=jsonable_encoder(request),
+        response=stored,
+        status="ok" if error is None else "error",
+        error=error,
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[OpLog.id],
+            set_={
+                "request": stmt.excluded.request,
+                "response": stmt.excluded.response,
+                "status": stmt.excluded.status,
+                "error": stmt.excluded.error,
+            },
+            where=OpLog.status != "ok",
+        )
+    )
+    return stored
+
+
+def remember_op(op_id: UUID, response: Any) -> None:
+    _replay_cache.put(op_id, response)
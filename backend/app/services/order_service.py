@@ -4,7 +4,7 @@ from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from backend.app.models.order import Order, OrderLine
-from backend.app.models.ledger import StockLedger
+from backend.app.services.stock_balance_service import post_ledger_event
 from backend.app.services.inventory_service import on_hand, reserved_qty, get_inventory_summary
 
 def create_quick_sale(db: Session, *, branch_id: UUID, item_id: UUID, qty: int) -> tuple[UUID, UUID]:
@@ -25,15 +25,14 @@ def create_quick_sale(db: Session, *, branch_id: UUID, item_id: UUID, qty: int)
         .returning(OrderLine.id)
     ).scalar_one()
 
-    db.execute(
-        insert(StockLedger).values(
-            branch_id=branch_id,
-            item_id=item_id,
-            event="ship",
-            qty=-int(qty),
-            ref_type="order",
-            ref_id=order_id,
-        )
+    post_ledger_event(
+        db,
+        branch_id=branch_id,
+        item_id=item_id,
+        event="ship",
+        qty=-int(qty),
+        ref_type="order",
+        ref_id=order_id,
     )
 
     db.commit()
@@ -0,0 +1,172 @@
+"""
+In-process cache of small reference rows (branches, items, schools).
+
+Entries are frozen snapshots keyed by (kind, version, key). Changing a
+kind bumps its version, which makes every older entry unreachable; a
+reader that loaded from the database while a bump happened stores under
+the old version, so it cannot re-cache a pre-change row.
+
+Versions are bumped:
+  - in this process when a session that called invalidate(db, kind)
+    commits (routers that create or update reference rows);
+  - in every process by the listener thread, on the 'refdata:<table>'
+    notifications the triggers from migration e91c4a7d3b02 send on commit.
+The TTL (REFERENCE_CACHE_TTL_SECONDS) only bounds staleness if the
+listener is down.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+from uuid import UUID
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from backend.app.core.cache import TTLCache, pop_committed
+from backend.app.core.config import settings
+from backend.app.db import events
+from backend.app.models.branch import Branch
+from backend.app.models.item import Item
+from backend.app.models.school import School
+
+logger = logging.getLogger("eltafawook.reference_cache")
+
+BRANCHES = "branches"
+ITEMS = "items"
+SCHOOLS = "schools"
+KINDS = (BRANCHES, ITEMS, SCHOOLS)
+
+PAYLOAD_PREFIX = "refdata:"
+
+_cache = TTLCache(ttl=settings.reference_cache_ttl_seconds, maxsize=4096)
+_versions = {k: 0 for k in KINDS}
+_lock = threading.Lock()
+
+_DIRTY = "reference_dirty_kinds"
+
+
+@dataclass(frozen=True)
+class BranchRef:
+    id: UUID
+    code: str
+    name: str
+
+
+@dataclass(frozen=True)
+class ItemRef:
+    id: UUID
+    sku: str
+    name: str
+    teacher_id: UUID | None
+    default_price_cents: int
+
+
+def _cached(kind: str, key: Hashable, load: Callable[[], Any]) -> Any:
+    """Return the cached value for (kind, key), loading and storing it on a miss. None is not cached."""
+    version = _versions[kind]
+    value = _cache.get((kind, version, key))
+    if value is None:
+        value = load()
+        if value is not None:
+            _cache.put((kind, version, key), value)
+    return value
+
+
+def _branch_ref(b) -> BranchRef | None:
+    return BranchRef(id=b.id, code=b.code, name=b.name) if b is not None else None
+
+
+def branch_by_code(db: Session, code: str) -> BranchRef | None:
+    return _cached(BRANCHES, ("code", code), lambda: _branch_ref(
+        db.execute(select(Branch.id, Branch.code, Branch.name).where(Branch.code == code)).first()
+    ))
+
+
+def branch(db: Session, branch_id: UUID) -> BranchRef | None:
+    return _cached(BRANCHES, ("id", branch_id), lambda: _branch_ref(
+        db.execute(select(Branch.id, Branch.code, Branch.name).where(Branch.id == branch_id)).first()
+    ))
+
+
+def item(db: Session, item_id: UUID) -> ItemRef | None:
+    def load():
+        row = db.execute(
+            select(Item.id, Item.sku, Item.name, Item.teacher_id, Item.default_price_cents).where(Item.id == item_id)
+        ).first()
+        if row is None:
+            return None
+        return ItemRef(
+            id=row.id, sku=row.sku, name=row.name, teacher_id=row.teacher_id,
+            default_price_cents=int(row.default_price_cents),
+        )
+    return _cached(ITEMS, item_id, load)
+
+
+def school_id_by_name(db: Session, name: str) -> UUID | None:
+    """Id of the school whose name equals `name` case-insensitively."""
+    return _cached(SCHOOLS, name.lower(), lambda: db.execute(
+        select(School.id).where(func.lower(School.name) == name.lower())
+    ).scalar_one_or_none())
+
+
+def invalidate(db: Session, *kinds: str) -> None:
+    """Bump `kinds` in this process once `db` commits (other processes hear it via NOTIFY)."""
+    db.info.setdefault(_DIRTY, set()).update(kinds)
+
+
+def bump(*kinds: str) -> None:
+    """Make every cached entry of `kinds` (all kinds when empty) unreachable."""
+    with _lock:
+        for k in kinds or KINDS:
+            if k in _versions:
+                _versions[k] += 1
+
+
+def stats() -> dict[str, Any]:
+    with _lock:
+        versions = dict(_versions)
+    return {**_cache.stats(), "versions": versions}
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    dirty = pop_committed(session, _DIRTY)
+    if dirty:
+        bump(*dirty)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY, None)
+
+
+def handle_payloads(payloads: set[str]) -> None:
+    kinds = [p[len(PAYLOAD_PREFIX):] for p in payloads if p.startswith(PAYLOAD_PREFIX)]
+    if kinds:
+        bump(*kinds)
+
+
+def _listen_forever() -> None:
+    while True:
+        try:
+            conn = events.listen()
+            # Changes made while we were not listening were never heard.
+            bump()
+            try:
+                while True:
+                    handle_payloads(events.wait(conn, None))
+            finally:
+                conn.close()
+        except Exception:
+            logger.warning("reference cache listener failed; reconnecting in 5s", exc_info=True)
+            time.sleep(5)
+
+
+def start_listener() -> threading.Thread:
+    t = threading.Thread(target=_listen_forever, name="refdata-listen", daemon=True)
+    t.start()
+    return t
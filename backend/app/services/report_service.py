@@ -2,7 +2,7 @@ from datetime import datetime, date
 from uuid import UUID as PyUUID
 from typing import Dict
 
-from sqlalchemy import select, func, text, and_, cast as sa_cast
+from sqlalchemy import select, func, and_, cast as sa_cast
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
 from sqlalchemy.dialects.postgresql import UUID
@@ -12,13 +12,15 @@ from backend.app.models.item import Item
 from backend.app.models.ledger import StockLedger
 from backend.app.models.reservation import Reservation
 from backend.app.models.revenue_adjustment import RevenueAdjustment
-from backend.app.models.sale import Sale
+from backend.app.models.sales_rollup import SalesDailyRollup
 from backend.app.models.teacher import Teacher
 from backend.app.schemas.report import DailySalesOut
 from backend.app.services.inventory_service import get_inventory_summary
+from backend.app.services import reference_cache
+from backend.app.services.sales_rollup_service import BOOKSTORE
 
-def branch_by_code(db: Session, code: str) -> Branch | None:
-    return db.execute(select(Branch).where(Branch.code == code)).scalar_one_or_none()
+def branch_by_code(db: Session, code: str) -> reference_cache.BranchRef | None:
+    return reference_cache.branch_by_code(db, code)
 
 inventory_view = sa.Table('inventory_view', sa.MetaData(),
     sa.Column('branch_id', UUID),
@@ -65,6 +67,9 @@ def branch_inventory_snapshot(db: Session, *, branch_id: PyUUID, sku: str | None
     return {"items": results}
 
 def daily_branch_activity(db: Session, *, branch_id: PyUUID, start: datetime, end: datetime) -> Dict:
+    # A plain window sum: it reads only [start, end) through the `at` index.
+    # Checkpoints answer "as of" totals; differencing two of them would scan
+    # every row since the nearest checkpoint, on each side.
     rows = db.execute(
         select(StockLedger.event, func.coalesce(func.sum(StockLedger.qty), 0))
         .where(
@@ -99,39 +104,39 @@ def daily_branch_activity(db: Session, *, branch_id: PyUUID, start: datetime, en
         "reservations_qty": int(res_qty or 0),
     }
 
+def _rollup_range(branch_id: PyUUID, start_date: date, end_date: date):
+    r = SalesDailyRollup
+    return and_(
+        r.branch_id == branch_id,
+        r.day >= start_date,
+        r.day <= end_date,
+        r.context == BOOKSTORE,
+    )
+
 def daily_sales_totals(db: Session, *, branch_id: PyUUID, start_date: date, end_date: date) -> DailySalesOut:
     """
-    Calculates sales and adjustment totals over a given date range.
+    Calculates sales and adjustment totals over a given date range, reading
+    sales from sales_daily_rollup rather than scanning sales.
     """
     code = db.execute(select(Branch.code).where(Branch.id == branch_id)).scalar_one()
 
-    # UPDATED: This query now groups sales by payment_method using FILTER
-    sales_query = text("""
-        SELECT
-            COUNT(*) AS sales_count,
-            COALESCE(SUM(total_cents) FILTER (WHERE payment_method = 'cash'), 0) AS sales_cash_cents,
-            COALESCE(SUM(total_cents) FILTER (WHERE payment_method = 'vodafone_cash'), 0) AS sales_voda_cents,
-            COALESCE(SUM(total_cents) FILTER (WHERE payment_method = 'instapay'), 0) AS sales_instapay_cents
-        FROM sales
-        WHERE branch_id = :branch_id 
-          AND (sold_at AT TIME ZONE 'Africa/Cairo')::date >= :start_date
-          AND (sold_at AT TIME ZONE 'Africa/Cairo')::date <= :end_date
-    """)
-    sales_row = db.execute(sales_query, {"branch_id": str(branch_id), "start_date": start_date, "end_date": end_date}).one()
+    r = SalesDailyRollup
+    sales_row = db.execute(
+        select(
+            func.coalesce(func.sum(r.sales_count), 0).label("sales_count"),
+            func.coalesce(func.sum(r.total_cents).filter(r.payment_method == 'cash'), 0).label("sales_cash_cents"),
+            func.coalesce(func.sum(r.total_cents).filter(r.payment_method == 'vodafone_cash'), 0).label("sales_voda_cents"),
+            func.coalesce(func.sum(r.total_cents).filter(r.payment_method == 'instapay'), 0).label("sales_instapay_cents"),
+            func.coalesce(func.sum(r.qty * Item.profit_cents), 0).label("total_profit_cents"),
+        )
+        .select_from(r)
+        .join(Item, Item.id == r.item_id)
+        .where(_rollup_range(branch_id, start_date, end_date))
+    ).one()
     
     sales_total_cents = int(sales_row.sales_cash_cents or 0) + int(sales_row.sales_voda_cents or 0) + int(sales_row.sales_instapay_cents or 0)
     sales_count = int(sales_row.sales_count or 0)
-
-    profit_query = text("""
-        SELECT COALESCE(SUM(s.qty * i.profit_cents), 0)
-        FROM sales s
-        JOIN items i ON s.item_id = i.id
-        WHERE s.branch_id = :branch_id
-          AND (s.sold_at AT TIME ZONE 'Africa/Cairo')::date >= :start_date
-          AND (s.sold_at AT TIME ZONE 'Africa/Cairo')::date <= :end_date
-    """)
-    total_profit_cents = db.execute(profit_query, {"branch_id": str(branch_id), "start_date": start_date, "end_date": end_date}).scalar_one()
-
+    total_profit_cents = sales_row.total_profit_cents
 
     adjustments_total_cents = db.execute(
         select(func.coalesce(func.sum(RevenueAdjustment.amount_cents), 0))
@@ -160,27 +165,27 @@ def daily_sales_totals(db: Session, *, branch_id: PyUUID, start_date: date, end_
     )
 
 def get_detailed_sales_report(db: Session, *, branch_id: PyUUID, start_date: date, end_date: date):
+    r = SalesDailyRollup
     stmt = (
         select(
             Teacher.name.label("teacher_name"),
             Item.name.label("item_name"),
             Item.grade.label("item_grade"),
-            Sale.payment_method,
-            func.sum(Sale.qty).label("total_qty"),
-            func.sum(Sale.total_cents).label("total_amount_cents")
+            r.payment_method,
+            func.sum(r.qty).label("total_qty"),
+            func.sum(r.total_cents).label("total_amount_cents")
         )
-        .join(Item, Sale.item_id == Item.id)
+        .join(Item, r.item_id == Item.id)
         .join(Teacher, Item.teacher_id == Teacher.id)
         .where(
-            Sale.branch_id == branch_id,
-            sa.cast(Sale.sold_at, sa.Date) >= start_date,
-            sa.cast(Sale.sold_at, sa.Date) <= end_date
+            _rollup_range(branch_id, start_date, end_date),
+            r.sales_count > 0,
         )
         .group_by(
             Teacher.name,
             Item.name,
             Item.grade,
-            Sale.payment_method
+            r.payment_method
         )
         .order_by(
             Teacher.name,
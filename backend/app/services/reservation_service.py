@@ -10,12 +10,18 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from backend.app.models.reservation import Reservation
-from backend.app.models.ledger import StockLedger
 from backend.app.models.sale import Sale
 from backend.app.models.branch import Branch
 from backend.app.models.item import Item
 from backend.app.models.student import Student
+from backend.app.models.stock_balance import StockBalance
 from backend.app.services.inventory_service import on_hand, reserved_qty, get_inventory_summary
+from backend.app.services.stock_balance_service import post_ledger, post_ledger_event
+from backend.app.services.allocation_service import allocate_queued, lock_pairs
+from backend.app.services.sales_rollup_service import post_sales, delete_sales
+from backend.app.services import dashboard_cache, reference_cache
+from backend.app.utils.phone import phone_match
+from backend.app.utils.search import name_match, name_rank
 
 def _now_utc() -> datetime:
     return datetime.now(timezone.utc)
@@ -26,42 +32,7 @@ def auto_allocate_queued(db: Session, *, branch_id: UUID, item_id: UUID, when: d
     creates reserve_hold in ledger, and opens a 14-day window.
     Returns number of reservations allocated.
     """
-    when = when or _now_utc()
-    available = on_hand(db, branch_id, item_id) - reserved_qty(db, branch_id, item_id)
-    if available <= 0:
-        return 0
-
-    rows = db.execute(
-        select(Reservation.id, Reservation.qty)
-        .where(
-            Reservation.branch_id == branch_id,
-            Reservation.item_id == item_id,
-            Reservation.status == "queued",
-        )
-        .order_by(Reservation.created_at.asc())
-        .with_for_update(skip_locked=True)
-    ).all()
-
-    count = 0
-    for rid, q in rows:
-        q = int(q)
-        if q > available:
-            break
-        db.execute(insert(StockLedger).values(
-            branch_id=branch_id, item_id=item_id,
-            event="reserve_hold", qty=-q,
-            ref_type="reservation", ref_id=rid,
-        ))
-        db.execute(update(Reservation)
-                  .where(Reservation.id == rid)
-                  .values(
-                      status="active",
-                      hold_window=sa.func.tstzrange(when, when + timedelta(days=14), "[)"),
-                      notified_at=None,
-                  ))
-        available -= q
-        count += 1
-
+    count = allocate_queued(db, [(branch_id, item_id)], when=when).get((branch_id, item_id), 0)
     if count:
         db.commit()
     return count
@@ -87,9 +58,8 @@ def create_reservation(
     lock_key = f"{branch_id}:{item_id}"
     db.execute(sa.text("SELECT pg_advisory_xact_lock(hashtextextended(:k, 0))"), {"k": lock_key})
 
-    item_price = db.execute(
-        select(Item.default_price_cents).where(Item.id == item_id)
-    ).scalar_one_or_none()
+    item = reference_cache.item(db, item_id)
+    item_price = item.default_price_cents if item is not None else None
 
     if item_price is None:
         raise ValueError(f"Could not find a price for item_id: {item_id}")
@@ -133,16 +103,16 @@ def create_reservation(
     try:
         res_id = db.execute(stmt).scalar_one()
         if not oos:
-            db.execute(
-                insert(StockLedger).values(
-                    branch_id=branch_id,
-                    item_id=item_id,
-                    event="reserve_hold",
-                    qty=-qty,
-                    ref_type="reservation",
-                    ref_id=res_id,
-                )
+            post_ledger_event(
+                db,
+                branch_id=branch_id,
+                item_id=item_id,
+                event="reserve_hold",
+                qty=-qty,
+                ref_type="reservation",
+                ref_id=res_id,
             )
+        dashboard_cache.invalidate(db, branch_id)
         db.commit()
         return res_id
 
@@ -190,18 +160,49 @@ def cancel_reservation(db: Session, *, reservation_id: UUID) -> None:
     )
 
     if str(row.status) in {"hold", "active"}:
-        db.execute(
-            insert(StockLedger).values(
-                branch_id=row.branch_id,
-                item_id=row.item_id,
-                event="reserve_release",
-                qty=int(row.qty),
-                ref_type="reservation",
-                ref_id=reservation_id,
-            )
+        post_ledger_event(
+            db,
+            branch_id=row.branch_id,
+            item_id=row.item_id,
+            event="reserve_release",
+            qty=int(row.qty),
+            ref_type="reservation",
+            ref_id=reservation_id,
         )
+    dashboard_cache.invalidate(db, row.branch_id)
     db.commit()
 
+def cancel_reservations_bulk(db: Session, *, reservation_ids: list[UUID]) -> None:
+    """
+    Set-based cancel_reservation for many reservations: one locking read,
+    one UPDATE and one multi-row ledger post. Raises ValueError (nothing
+    written) if any reservation is missing. Does not commit.
+    """
+    rows = db.execute(
+        select(Reservation.id, Reservation.branch_id, Reservation.item_id, Reservation.qty, Reservation.status)
+        .where(Reservation.id.in_(reservation_ids))
+        .with_for_update()
+    ).all()
+    if len(rows) != len(set(reservation_ids)):
+        raise ValueError("Reservation not found")
+
+    open_rows = [r for r in rows if str(r.status) not in {"fulfilled", "cancelled", "expired"}]
+    if not open_rows:
+        return
+
+    db.execute(
+        update(Reservation)
+        .where(Reservation.id.in_([r.id for r in open_rows]))
+        .values(status="cancelled")
+    )
+    dashboard_cache.invalidate(db, *{r.branch_id for r in open_rows})
+    post_ledger(db, [
+        dict(branch_id=r.branch_id, item_id=r.item_id, event="reserve_release", qty=int(r.qty),
+             ref_type="reservation", ref_id=r.id)
+        for r in open_rows
+        if str(r.status) in {"hold", "active"}
+    ])
+
 def prepay_reservation(
     db: Session,
     *,
@@ -285,14 +286,15 @@ def mark_ready_reservation(
         if available < int(qty):
             raise ValueError("Not enough on-hand to mark ready")
 
-        db.execute(insert(StockLedger).values(
+        post_ledger_event(
+            db,
             branch_id=b_id,
             item_id=i_id,
             event="reserve_hold",
             qty=-int(qty),
             ref_type="reservation",
             ref_id=reservation_id,
-        ))
+        )
 
     values: dict[str, Any] = {"status": "active", "hold_window": sa.func.tstzrange(when, end, "[)")}
     if notify:
@@ -303,6 +305,7 @@ def mark_ready_reservation(
         .where(Reservation.id == reservation_id)
         .values(**values)
     )
+    dashboard_cache.invalidate(db)
     db.commit()
 
     result = {
@@ -362,7 +365,7 @@ def fulfill_reservation(
       - ensure enough on_hand to ship
       - status -> fulfilled
       - ledger: ship (-qty)
-      - insert Sale (revenue today)
+      - insert Sale (revenue today) and fold it into sales_daily_rollup
     """
     sold_at = sold_at or _now_utc()
 
@@ -405,45 +408,24 @@ def fulfill_reservation(
         .values(status="fulfilled", fulfilled_at=sold_at)
     )
 
-    db.execute(
-        insert(StockLedger).values(
-            branch_id=b_id,
-            item_id=i_id,
-            event="reserve_release",
-            qty=qty,
-            ref_type="reservation",
-            ref_id=reservation_id,
-            at=sold_at,
-        )
-    )
-
-    db.execute(
-        insert(StockLedger).values(
-            branch_id=b_id,
-            item_id=i_id,
-            event="ship",
-            qty=-qty,
-            ref_type="reservation",
-            ref_id=reservation_id,
-            at=sold_at,
-        )
-    )
+    post_ledger(db, [
+        dict(branch_id=b_id, item_id=i_id, event="reserve_release", qty=qty,
+             ref_type="reservation", ref_id=reservation_id, at=sold_at),
+        dict(branch_id=b_id, item_id=i_id, event="ship", qty=-qty,
+             ref_type="reservation", ref_id=reservation_id, at=sold_at),
+    ])
 
     total_cents = unit_price_cents * qty
-    sale_id = db.execute(
-        insert(Sale)
-        .values(
-            branch_id=b_id,
-            item_id=i_id,
-            reservation_id=reservation_id,
-            qty=qty,
-            unit_price_cents=unit_price_cents,
-            total_cents=total_cents,
-            sold_at=sold_at,
-            payment_method=method,
-        )
-        .returning(Sale.id)
-    ).scalar_one()
+    sale_id = post_sales(db, [dict(
+        branch_id=b_id,
+        item_id=i_id,
+        reservation_id=reservation_id,
+        qty=qty,
+        unit_price_cents=unit_price_cents,
+        total_cents=total_cents,
+        sold_at=sold_at,
+        payment_method=method,
+    )])[0].id
 
     db.commit()
 
@@ -460,6 +442,103 @@ def fulfill_reservation(
         "inventory": inv,
     }
 
+def fulfill_reservations_bulk(
+    db: Session,
+    *,
+    reservation_ids: list[UUID],
+    sold_at: datetime | None = None,
+) -> list[dict]:
+    """
+    Set-based fulfill_reservation for many active reservations: one locking
+    read, one stock check, one UPDATE, one ledger post and one multi-row
+    Sale insert (with its sales_daily_rollup upsert). All-or-nothing: raises ValueError before writing if any
+    reservation is missing, not active, or its (branch, item) lacks on-hand
+    stock for the combined qty. Does not commit; results omit the per-item
+    inventory snapshot.
+    """
+    sold_at = sold_at or _now_utc()
+    if len(set(reservation_ids)) != len(reservation_ids):
+        raise ValueError("Duplicate reservation in batch")
+
+    rows = db.execute(
+        select(
+            Reservation.id,
+            Reservation.branch_id,
+            Reservation.item_id,
+            Reservation.qty,
+            Reservation.status,
+            Reservation.unit_price_cents,
+            Reservation.payment_method,
+        )
+        .where(Reservation.id.in_(reservation_ids))
+        .with_for_update()
+    ).all()
+    by_id = {r.id: r for r in rows}
+    missing = [rid for rid in reservation_ids if rid not in by_id]
+    if missing:
+        raise ValueError("Reservation not found")
+    for r in rows:
+        if str(r.status) != "active":
+            raise ValueError(f"Cannot fulfill reservation in status '{r.status}'")
+
+    need: dict[tuple[UUID, UUID], int] = {}
+    for r in rows:
+        need[(r.branch_id, r.item_id)] = need.get((r.branch_id, r.item_id), 0) + int(r.qty)
+
+    lock_pairs(db, need)
+    have = {
+        (s.branch_id, s.item_id): int(s.on_hand)
+        for s in db.execute(
+            select(StockBalance.branch_id, StockBalance.item_id, StockBalance.on_hand)
+            .where(sa.tuple_(StockBalance.branch_id, StockBalance.item_id).in_(list(need)))
+        ).all()
+    }
+    for pair, qty in need.items():
+        if have.get(pair, 0) < qty:
+            raise ValueError("Not enough on-hand stock to fulfill")
+
+    db.execute(
+        update(Reservation)
+        .where(Reservation.id.in_(reservation_ids))
+        .values(status="fulfilled", fulfilled_at=sold_at)
+    )
+
+    ledger_rows = []
+    for rid in reservation_ids:
+        r = by_id[rid]
+        ledger_rows.append(dict(branch_id=r.branch_id, item_id=r.item_id, event="reserve_release", qty=int(r.qty),
+                                ref_type="reservation", ref_id=rid, at=sold_at))
+        ledger_rows.append(dict(branch_id=r.branch_id, item_id=r.item_id, event="ship", qty=-int(r.qty),
+                                ref_type="reservation", ref_id=rid, at=sold_at))
+    post_ledger(db, ledger_rows)
+
+    sales = [
+        dict(
+            branch_id=by_id[rid].branch_id,
+            item_id=by_id[rid].item_id,
+            reservation_id=rid,
+            qty=int(by_id[rid].qty),
+            unit_price_cents=int(by_id[rid].unit_price_cents or 0),
+            total_cents=int(by_id[rid].unit_price_cents or 0) * int(by_id[rid].qty),
+            sold_at=sold_at,
+            payment_method=by_id[rid].payment_method or "cash",
+        )
+        for rid in reservation_ids
+    ]
+    sale_ids = dict(post_sales(db, sales))
+
+    return [
+        {
+            "reservation_id": s["reservation_id"],
+            "sale_id": str(sale_ids.get(s["reservation_id"])),
+            "qty": s["qty"],
+            "unit_price_cents": s["unit_price_cents"],
+            "total_cents": s["total_cents"],
+            "sold_at": sold_at.isoformat(),
+        }
+        for s in sales
+    ]
+
 def search_reservations(
     db: Session,
     *,
@@ -495,13 +574,15 @@ def search_reservations(
     )
 
     conds = []
-    if q:
-        q_like = f"%{q.lower()}%"
-        conds.append(func.lower(s.full_name).like(q_like))
+    match = name_match(s.name_search, q) if q else None
+    if match is not None:
+        conds.append(match)
+        # Best name match first; recency only breaks ties.
+        j = j.order_by(None).order_by(
+            name_rank(s.name_search, q).desc(), sa.desc(r.fulfilled_at.nullslast()), sa.desc(r.created_at)
+        )
     if phone:
-        phone_clean = phone.strip()
-        alt = ("+2" + phone_clean) if phone_clean.startswith("0") else phone_clean
-        conds.append(sa.or_(s.phone.ilike(f"%{phone_clean}%"), s.phone.ilike(f"%{alt}%")))
+        conds.append(phone_match(s.phone_norm, phone))
 
     if conds:
         j = j.where(and_(*conds))
@@ -601,29 +682,14 @@ def unfulfill_reservation(db: Session, *, reservation_id: UUID) -> dict:
     if str(row.status) != "fulfilled":
         return {"reservation_id": str(reservation_id), "status": str(row.status)}
 
-    sale_id = db.execute(
-        select(Sale.id).where(Sale.reservation_id == reservation_id)
-    ).scalar_one_or_none()
-    if sale_id:
-        db.execute(sa.delete(Sale).where(Sale.id == sale_id))
-
-    db.execute(insert(StockLedger).values(
-        branch_id=row.branch_id,
-        item_id=row.item_id,
-        event="reserve_hold",
-        qty=-int(row.qty),
-        ref_type="reservation",
-        ref_id=reservation_id,
-    ))
-
-    db.execute(insert(StockLedger).values(
-        branch_id=row.branch_id,
-        item_id=row.item_id,
-        event="ship",
-        qty=int(row.qty),
-        ref_type="reservation",
-        ref_id=reservation_id,
-    ))
+    delete_sales(db, Sale.reservation_id == reservation_id)
+
+    post_ledger(db, [
+        dict(branch_id=row.branch_id, item_id=row.item_id, event="reserve_hold",
+             qty=-int(row.qty), ref_type="reservation", ref_id=reservation_id),
+        dict(branch_id=row.branch_id, item_id=row.item_id, event="ship",
+             qty=int(row.qty), ref_type="reservation", ref_id=reservation_id),
+    ])
 
     db.execute(
         update(Reservation)
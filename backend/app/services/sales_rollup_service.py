@@ -0,0 +1,196 @@
+from __future__ import annotations
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy import select, insert, func, literal, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import settings
+from backend.app.models.kg_sale import KgSale
+from backend.app.models.sale import Sale
+from backend.app.models.sales_rollup import SalesDailyRollup
+from backend.app.services import dashboard_cache
+
+BOOKSTORE = "bookstore"
+KINDERGARTEN = "kindergarten"
+
+# kg_sales carry no payment method; their rollup rows all use this one.
+UNSPECIFIED = "unspecified"
+
+
+def local_day(sold_at):
+    """The business-timezone date of a timestamptz expression, computed by Postgres."""
+    return sa.cast(func.timezone(settings.tz, sold_at), sa.Date)
+
+
+def rollup_upsert(sale_rows: Any, *, context: str, sign: int = 1):
+    """
+    Build an INSERT .. ON CONFLICT that folds `sale_rows` (any selectable
+    exposing branch_id, item_id, sold_at, qty, total_cents and optionally
+    payment_method) into sales_daily_rollup. sign=-1 takes deleted sales
+    back out. Rows are aggregated per key first, so a multi-row insert
+    costs one upsert per (branch, day, item, method).
+    """
+    c = sale_rows.c
+    day = local_day(c.sold_at)
+    keys = [c.branch_id, day, c.item_id]
+    if "payment_method" in c:
+        method = sa.cast(c.payment_method, sa.Text)
+        keys.append(method)
+    else:
+        method = literal(UNSPECIFIED)
+    agg = (
+        select(
+            c.branch_id,
+            day,
+            literal(context),
+            c.item_id,
+            method,
+            func.count() * sign,
+            func.sum(c.qty) * sign,
+            func.sum(c.total_cents) * sign,
+        )
+        .select_from(sale_rows)
+        .group_by(*keys)
+    )
+    stmt = pg_insert(SalesDailyRollup).from_select(
+        ["branch_id", "day", "context", "item_id", "payment_method", "sales_count", "qty", "total_cents"], agg
+    )
+    r = SalesDailyRollup
+    return stmt.on_conflict_do_update(
+        index_elements=[r.branch_id, r.day, r.context, r.item_id, r.payment_method],
+        set_={
+            "sales_count": r.sales_count + stmt.excluded.sales_count,
+            "qty": r.qty + stmt.excluded.qty,
+            "total_cents": r.total_cents + stmt.excluded.total_cents,
+            "updated_at": func.now(),
+        },
+    )
+
+
+_SALE_COLUMNS = (Sale.branch_id, Sale.item_id, Sale.payment_method, Sale.sold_at, Sale.qty, Sale.total_cents)
+
+
+def post_sales(db: Session, rows: list[dict[str, Any]]) -> list:
+    """
+    Insert `rows` into sales and fold them into sales_daily_rollup in a
+    single statement (data-modifying CTE), so both always commit together.
+    Each row takes the Sale column names. Does not commit; returns
+    (reservation_id, id) per inserted sale.
+    """
+    if not rows:
+        return []
+    sale_rows = insert(Sale).values(rows).returning(Sale.id, Sale.reservation_id, *_SALE_COLUMNS).cte("sale_rows")
+    rollup = rollup_upsert(sale_rows, context=BOOKSTORE).returning(literal(1)).cte("rollup")
+    dashboard_cache.invalidate(db, *{r["branch_id"] for r in rows})
+    return db.execute(
+        select(sale_rows.c.reservation_id, sale_rows.c.id).add_cte(rollup)
+    ).all()
+
+
+def delete_sales(db: Session, *where) -> list:
+    """
+    Delete the sales matching `where` and take them back out of
+    sales_daily_rollup in the same statement. Does not commit; returns
+    the deleted sale ids.
+    """
+    gone = sa.delete(Sale).where(*where).returning(Sale.id, *_SALE_COLUMNS).cte("gone")
+    rollup = rollup_upsert(gone, context=BOOKSTORE, sign=-1).returning(literal(1)).cte("rollup")
+    rows = db.execute(select(gone.c.id, gone.c.branch_id).add_cte(rollup)).all()
+    dashboard_cache.invalidate(db, *{r.branch_id for r in rows})
+    return [r.id for r in rows]
+
+
+def post_kg_sales(db: Session, rows: list[dict[str, Any]]) -> list:
+    """
+    post_sales for kg_sales: one statement inserts the rows and folds them
+    into the 'kindergarten' rollup. Does not commit; returns the inserted
+    kg_sales rows (every column, in insert order).
+    """
+    if not rows:
+        return []
+    k = KgSale
+    sale_rows = (
+        insert(k)
+        .values(rows)
+        .returning(
+            k.id, k.branch_id, k.kg_student_id, k.kg_item_id, k.kg_item_id.label("item_id"),
+            k.qty, k.unit_price_cents, k.total_cents, k.sold_at,
+        )
+        .cte("sale_rows")
+    )
+    rollup = rollup_upsert(sale_rows, context=KINDERGARTEN).returning(literal(1)).cte("rollup")
+    c = sale_rows.c
+    return db.execute(
+        select(c.id, c.branch_id, c.kg_student_id, c.kg_item_id, c.qty, c.unit_price_cents, c.total_cents, c.sold_at)
+        .add_cte(rollup)
+    ).all()
+
+
+_EXPECTED_SQL = """
+    expected AS (
+        SELECT branch_id, (sold_at AT TIME ZONE :tz)::date AS day, 'bookstore' AS context,
+               item_id, payment_method::text AS payment_method,
+               COUNT(*)::int AS sales_count, SUM(qty)::bigint AS qty, SUM(total_cents)::bigint AS total_cents
+          FROM sales
+         GROUP BY 1, 2, 4, 5
+        UNION ALL
+        SELECT branch_id, (sold_at AT TIME ZONE :tz)::date, 'kindergarten',
+               kg_item_id, 'unspecified',
+               COUNT(*)::int, SUM(qty)::bigint, SUM(total_cents)::bigint
+          FROM kg_sales
+         GROUP BY 1, 2, 4
+    )
+"""
+
+
+def rebuild_rollup(db: Session, *, apply: bool = True) -> dict[str, Any]:
+    """
+    Recompute sales_daily_rollup from sales and kg_sales and report keys
+    whose stored totals differ. With apply=True the table is replaced.
+    Writers are blocked for the duration so the read and the correction
+    see the same state.
+    """
+    db.execute(text("LOCK TABLE sales_daily_rollup IN SHARE ROW EXCLUSIVE MODE"))
+    params = {"tz": settings.tz}
+
+    drift = db.execute(text(f"""
+        WITH {_EXPECTED_SQL}
+        SELECT branch_id, day, context, item_id, payment_method,
+               r.sales_count AS stored_count, e.sales_count AS expected_count,
+               r.total_cents AS stored_total_cents, e.total_cents AS expected_total_cents
+          FROM expected e
+          FULL OUTER JOIN sales_daily_rollup r USING (branch_id, day, context, item_id, payment_method)
+         WHERE COALESCE(r.sales_count, 0) <> COALESCE(e.sales_count, 0)
+            OR COALESCE(r.qty, 0)         <> COALESCE(e.qty, 0)
+            OR COALESCE(r.total_cents, 0) <> COALESCE(e.total_cents, 0)
+         ORDER BY day, branch_id, context, item_id, payment_method
+    """), params).mappings().all()
+
+    if apply:
+        db.execute(text("DELETE FROM sales_daily_rollup"))
+        db.execute(text(f"""
+            WITH {_EXPECTED_SQL}
+            INSERT INTO sales_daily_rollup (branch_id, day, context, item_id, payment_method, sales_count, qty, total_cents)
+            SELECT branch_id, day, context, item_id, payment_method, sales_count, qty, total_cents FROM expected
+        """), params)
+
+    return {
+        "applied": apply,
+        "drifted": len(drift),
+        "keys": [
+            {
+                "branch_id": r["branch_id"],
+                "day": r["day"],
+                "context": r["context"],
+                "item_id": r["item_id"],
+                "payment_method": r["payment_method"],
+                "stored_count": int(r["stored_count"] or 0),
+                "expected_count": int(r["expected_count"] or 0),
+                "stored_total_cents": int(r["stored_total_cents"] or 0),
+                "expected_total_cents": int(r["expected_total_cents"] or 0),
+            }
+            for r in drift
+        ],
+    }
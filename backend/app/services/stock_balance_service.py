@@ -0,0 +1,192 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select, insert, func, case, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from backend.app.models.ledger import StockLedger
+from backend.app.models.stock_balance import StockBalance
+from backend.app.services.ledger_checkpoint_service import LEDGER_SOURCE_SQL
+
+# Ledger events that move reservations rather than physical stock.
+PHYSICAL_EXCLUDE = ("reserve_hold", "reserve_release")
+
+# Ledger events written alongside a reservation entering (reserve_hold, qty<0)
+# or leaving (reserve_release / expire, qty>0) the hold/active states, so
+# reserved moves by -qty for each of them.
+RESERVING_EVENTS = ("reserve_hold", "reserve_release", "expire")
+
+
+def balance_upsert(ledger_rows: Any):
+    """
+    Build an INSERT .. ON CONFLICT that folds `ledger_rows` (any selectable
+    exposing id, branch_id, item_id, event, qty) into stock_balance.
+    Rows are aggregated per (branch_id, item_id) first so a multi-row
+    ledger insert costs one upsert per pair.
+    """
+    c = ledger_rows.c
+    agg = (
+        select(
+            c.branch_id,
+            c.item_id,
+            func.coalesce(func.sum(case((c.event.notin_(PHYSICAL_EXCLUDE), c.qty), else_=0)), 0),
+            func.coalesce(func.sum(case((c.event.in_(RESERVING_EVENTS), -c.qty), else_=0)), 0),
+            func.max(c.id),
+        )
+        .select_from(ledger_rows)
+        .group_by(c.branch_id, c.item_id)
+    )
+    stmt = pg_insert(StockBalance).from_select(
+        ["branch_id", "item_id", "on_hand", "reserved", "ledger_high_watermark"], agg
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[StockBalance.branch_id, StockBalance.item_id],
+        set_={
+            "on_hand": StockBalance.on_hand + stmt.excluded.on_hand,
+            "reserved": StockBalance.reserved + stmt.excluded.reserved,
+            "ledger_high_watermark": func.greatest(StockBalance.ledger_high_watermark, stmt.excluded.ledger_high_watermark),
+            "updated_at": func.now(),
+        },
+    )
+
+
+def post_ledger(db: Session, rows: list[dict[str, Any]]) -> None:
+    """
+    Append `rows` to stock_ledger and apply them to stock_balance in a
+    single statement (data-modifying CTE), so both always commit together.
+    Each row takes the StockLedger column names (branch_id, item_id, event,
+    qty, ref_type, ref_id, at).
+    """
+    if not rows:
+        return
+    ledger_rows = (
+        insert(StockLedger)
+        .values(rows)
+        .returning(StockLedger.id, StockLedger.branch_id, StockLedger.item_id, StockLedger.event, StockLedger.qty)
+        .cte("ledger_rows")
+    )
+    db.execute(balance_upsert(ledger_rows).add_cte(ledger_rows))
+
+
+def post_ledger_event(
+    db: Session,
+    *,
+    branch_id: UUID,
+    item_id: UUID,
+    event: str,
+    qty: int,
+    ref_type: str | None = None,
+    ref_id: UUID | None = None,
+    at: datetime | Any | None = None,
+) -> None:
+    row: dict[str, Any] = {
+        "branch_id": branch_id,
+        "item_id": item_id,
+        "event": event,
+        "qty": int(qty),
+        "ref_type": ref_type,
+        "ref_id": ref_id,
+    }
+    if at is not None:
+        row["at"] = at
+    post_ledger(db, [row])
+
+
+def get_balance(db: Session, branch_id: UUID, item_id: UUID) -> tuple[int, int]:
+    """(on_hand, reserved) for one pair; (0, 0) if nothing was ever posted."""
+    row = db.execute(
+        select(StockBalance.on_hand, StockBalance.reserved).where(
+            StockBalance.branch_id == branch_id,
+            StockBalance.item_id == item_id,
+        )
+    ).one_or_none()
+    if row is None:
+        return 0, 0
+    return int(row[0]), int(row[1])
+
+
+_EXPECTED_SQL = LEDGER_SOURCE_SQL + """,
+    ledger AS (
+        SELECT branch_id, item_id,
+               COALESCE(SUM(qty) FILTER (WHERE event NOT IN ('reserve_hold','reserve_release')), 0) AS on_hand,
+               MAX(id) AS high_watermark
+          FROM ledger_src
+         GROUP BY branch_id, item_id
+    ),
+    res AS (
+        SELECT branch_id, item_id, SUM(qty) AS reserved
+          FROM reservations
+         WHERE status IN ('hold','active')
+         GROUP BY branch_id, item_id
+    ),
+    expected AS (
+        SELECT branch_id, item_id,
+               COALESCE(l.on_hand, 0)::int        AS on_hand,
+               COALESCE(r.reserved, 0)::int       AS reserved,
+               COALESCE(l.high_watermark, 0)      AS high_watermark
+          FROM ledger l
+          FULL OUTER JOIN res r USING (branch_id, item_id)
+    )
+"""
+
+
+def rebuild_balances(db: Session, *, apply: bool = True) -> dict[str, Any]:
+    """
+    Recompute every stock_balance row from the ledger (latest checkpoint +
+    tail) and reservations, and report pairs whose stored totals differ.
+    With apply=True the table is corrected in place. Writers are blocked for the duration so the ledger
+    read and the correction see the same state.
+    """
+    db.execute(text("LOCK TABLE stock_balance IN SHARE ROW EXCLUSIVE MODE"))
+
+    drift = db.execute(text(f"""
+        WITH {_EXPECTED_SQL}
+        SELECT branch_id, item_id,
+               b.on_hand  AS stored_on_hand,  e.on_hand  AS expected_on_hand,
+               b.reserved AS stored_reserved, e.reserved AS expected_reserved
+          FROM expected e
+          FULL OUTER JOIN stock_balance b USING (branch_id, item_id)
+         WHERE b.on_hand  IS DISTINCT FROM COALESCE(e.on_hand, 0)
+            OR b.reserved IS DISTINCT FROM COALESCE(e.reserved, 0)
+         ORDER BY branch_id, item_id
+    """)).mappings().all()
+
+    if apply:
+        db.execute(text(f"""
+            WITH {_EXPECTED_SQL}
+            INSERT INTO stock_balance (branch_id, item_id, on_hand, reserved, ledger_high_watermark)
+            SELECT branch_id, item_id, on_hand, reserved, high_watermark FROM expected
+            ON CONFLICT (branch_id, item_id) DO UPDATE
+               SET on_hand = EXCLUDED.on_hand,
+                   reserved = EXCLUDED.reserved,
+                   ledger_high_watermark = EXCLUDED.ledger_high_watermark,
+                   updated_at = now()
+        """))
+        db.execute(text(f"""
+            WITH {_EXPECTED_SQL}
+            UPDATE stock_balance b
+               SET on_hand = 0, reserved = 0, updated_at = now()
+             WHERE NOT EXISTS (
+                   SELECT 1 FROM expected e
+                    WHERE e.branch_id = b.branch_id AND e.item_id = b.item_id)
+               AND (b.on_hand <> 0 OR b.reserved <> 0)
+        """))
+
+    return {
+        "applied": apply,
+        "drifted": len(drift),
+        "pairs": [
+            {
+                "branch_id": r["branch_id"],
+                "item_id": r["item_id"],
+                "stored_on_hand": r["stored_on_hand"],
+                "expected_on_hand": int(r["expected_on_hand"] or 0),
+                "stored_reserved": r["stored_reserved"],
+                "expected_reserved": int(r["expected_reserved"] or 0),
+            }
+            for r in drift
+        ],
+    }
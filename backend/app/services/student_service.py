@@ -1,13 +1,12 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import insert, select, func
 from uuid import UUID
 from typing import cast
 
 from backend.app.models.student import Student
 from backend.app.models.school import School
-from backend.app.models.branch import Branch
-from backend.app.utils.validators import normalize_phone
+from backend.app.utils.phone import phone_key
 from backend.app.schemas.student import StudentCreate
+from backend.app.services import reference_cache
 
 def _get_or_create_school_id(db: Session, student_in: StudentCreate) -> UUID:
     if student_in.school_id:
@@ -16,20 +15,18 @@ def _get_or_create_school_id(db: Session, student_in: StudentCreate) -> UUID:
     if not student_in.new_school_name:
         raise ValueError("A school must be provided.")
         
-    existing_school = db.execute(
-        select(School).where(func.lower(School.name) == func.lower(student_in.new_school_name))
-    ).scalar_one_or_none()
+    existing_school_id = reference_cache.school_id_by_name(db, student_in.new_school_name)
+    if existing_school_id:
+        return existing_school_id
 
-    if existing_school:
-        return cast(UUID, existing_school.id)
-
-    branch = db.get(Branch, student_in.branch_id)
+    branch = reference_cache.branch(db, student_in.branch_id)
     if not branch:
         raise ValueError("Invalid branch_id provided.")
 
     new_school = School(name=student_in.new_school_name, city=branch.name)
     db.add(new_school)
     db.flush()
+    reference_cache.invalidate(db, reference_cache.SCHOOLS)
     
     return cast(UUID, new_school.id)
 
@@ -39,8 +36,8 @@ def create_student(db: Session, *, student_in: StudentCreate) -> Student:
     student_data = student_in.model_dump(exclude={"new_school_name"})
     student_data["school_id"] = resolved_school_id
     
-    student_data["phone_norm"] = normalize_phone(student_data.get("phone"))
-    student_data["parent_phone_norm"] = normalize_phone(student_data.get("parent_phone"))
+    student_data["phone_norm"] = phone_key(student_data.get("phone"))
+    student_data["parent_phone_norm"] = phone_key(student_data.get("parent_phone"))
 
     student_obj = Student(**student_data)
     
@@ -1,8 +1,7 @@
 from uuid import UUID
-from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
-from backend.app.models.ledger import StockLedger
+from backend.app.services.stock_balance_service import post_ledger
 from backend.app.services.inventory_service import on_hand, reserved_qty, get_inventory_summary
 
 def transfer_stock(
@@ -22,24 +21,12 @@ def transfer_stock(
     if available < qty:
         raise ValueError("Not enough available stock to transfer")
 
-    db.execute(
-        insert(StockLedger).values(
-            branch_id=from_branch_id,
-            item_id=item_id,
-            event="transfer_out",
-            qty=-qty,
-            ref_type="transfer",
-        )
-    )
-    db.execute(
-        insert(StockLedger).values(
-            branch_id=to_branch_id,
-            item_id=item_id,
-            event="transfer_in",
-            qty=qty,
-            ref_type="transfer",
-        )
-    )
+    post_ledger(db, [
+        dict(branch_id=from_branch_id, item_id=item_id, event="transfer_out",
+             qty=-qty, ref_type="transfer", ref_id=None),
+        dict(branch_id=to_branch_id, item_id=item_id, event="transfer_in",
+             qty=qty, ref_type="transfer", ref_id=None),
+    ])
     db.commit()
 
     return {
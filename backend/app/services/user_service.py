@@ -1,7 +1,10 @@
+from typing import Any
+
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from backend.app.models.user import User
-from backend.app.core.security import verify_password
+from backend.app.core.security import verify_password, get_password_hash
+from backend.app.services import auth_cache
 
 def get_user_by_username(db: Session, username: str) -> User | None:
     """Fetches a user by their username."""
@@ -13,4 +16,24 @@ def authenticate_user(db: Session, *, username: str, password: str) -> User | No
         return None
     if not verify_password(password, db_user.hashed_password):
         return None
-    return db_user
\ No newline at end of file
+    return db_user
+
+_UPDATABLE = {"role", "branch_id", "is_active"}
+
+def update_user(db: Session, user: User, *, password: str | None = None, **changes: Any) -> User:
+    """
+    Change a user's role, branch_id, is_active and/or password. The users
+    trigger bumps token_version, revoking tokens issued before the change,
+    and the user's cached principal is dropped on commit.
+    """
+    unknown = set(changes) - _UPDATABLE
+    if unknown:
+        raise ValueError(f"Cannot update {', '.join(sorted(unknown))}")
+    for field, value in changes.items():
+        setattr(user, field, value)
+    if password is not None:
+        user.hashed_password = get_password_hash(password)
+    auth_cache.invalidate(db, user.username)
+    db.commit()
+    db.refresh(user)
+    return user
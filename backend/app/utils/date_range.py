@@ -0,0 +1,44 @@
+from __future__ import annotations
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import sqlalchemy as sa
+
+from backend.app.core.config import settings
+
+
+def _zone(tz: str | None) -> ZoneInfo:
+    return ZoneInfo(tz or settings.tz)
+
+
+def local_today(tz: str | None = None) -> date:
+    """Today's date in the business timezone (settings.tz, Africa/Cairo by default)."""
+    return datetime.now(timezone.utc).astimezone(_zone(tz)).date()
+
+
+def local_midnight(day: date, tz: str | None = None) -> datetime:
+    """Start of `day` in the business timezone, as an aware datetime."""
+    return datetime.combine(day, time.min, tzinfo=_zone(tz))
+
+
+def local_day_bounds(start: date, end: date | None = None, tz: str | None = None) -> tuple[datetime, datetime]:
+    """
+    Half-open timestamptz bounds [start 00:00, end+1 00:00) covering the local
+    dates start..end inclusive (just `start` when end is None).
+    """
+    return local_midnight(start, tz), local_midnight((end or start) + timedelta(days=1), tz)
+
+
+def in_local_dates(column, start: date | None = None, end: date | None = None, tz: str | None = None):
+    """
+    `column` (timestamptz) falls on local dates start..end inclusive; either
+    side may be open. Compares the bare column against constants, so an
+    index on it (or on (branch_id, column)) can serve the range, unlike
+    date(column) or (column AT TIME ZONE ...)::date.
+    """
+    conds = []
+    if start is not None:
+        conds.append(column >= local_midnight(start, tz))
+    if end is not None:
+        conds.append(column < local_midnight(end + timedelta(days=1), tz))
+    return sa.and_(sa.true(), *conds)
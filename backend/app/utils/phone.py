@@ -1,5 +1,7 @@
 import re
 
+from sqlalchemy import false, func
+
 _EG_LOCAL = re.compile(r"^0(10|11|12|15)\d{8}$")
 
 def normalize_eg_phone(raw: str | None) -> str | None:
@@ -15,3 +17,43 @@ def normalize_eg_phone(raw: str | None) -> str | None:
     if not _EG_LOCAL.fullmatch(s):
         raise ValueError("Phone must be 11 digits, start with 01, e.g. 01123456789")
     return "+20" + s[1:]
+
+
+_NON_DIGITS = re.compile(r"\D+")
+
+# Digits kept in a phone key: an Egyptian mobile's national number
+# ('+201012345678' and '01012345678' both become '1012345678').
+KEY_DIGITS = 10
+
+
+def phone_key(raw: str | None) -> str | None:
+    """
+    Canonical lookup key stored in students.phone_norm / parent_phone_norm:
+    the last KEY_DIGITS digits, so every way of writing a number (E.164,
+    leading 0, spaces, dashes) maps to the same key. Shorter input is kept
+    whole and serves as a suffix for phone_match.
+    """
+    if not raw:
+        return None
+    d = _NON_DIGITS.sub("", raw)
+    return d[-KEY_DIGITS:] or None
+
+
+def phone_key_expr(column):
+    """phone_key computed by Postgres over `column`, for backfills."""
+    return func.nullif(func.right(func.regexp_replace(column, r"\D", "", "g"), KEY_DIGITS), "")
+
+
+def phone_match(column, raw: str | None):
+    """
+    Condition on a phone key column: equality for a full number, otherwise
+    the typed digits as a suffix ("last 4 digits"), run as a prefix LIKE on
+    reverse(column) so the reverse(...) text_pattern_ops index serves it.
+    Input without digits matches nothing.
+    """
+    key = phone_key(raw)
+    if key is None:
+        return false()
+    if len(key) == KEY_DIGITS:
+        return column == key
+    return func.reverse(column).like(key[::-1] + "%")
@@ -0,0 +1,76 @@
+"""
+Name search: Arabic-aware normalization and pg_trgm matching.
+
+Names are compared in a normalized form: Arabic diacritics (harakat,
+dagger alef) and tatweel removed, alef/yaa/taa-marbuta variants unified,
+lowercased and whitespace collapsed. The same rules exist twice, as SQL
+for the stored `students.name_search` column and in Python for the query
+text; both are built from the constants below so they cannot drift.
+"""
+from __future__ import annotations
+
+import re
+
+import sqlalchemy as sa
+from sqlalchemy import func
+
+# U+064B..U+065F harakat and other combining marks, U+0670 dagger alef,
+# U+0640 tatweel. Both Python re and Postgres regexes read \uXXXX escapes.
+_STRIP_CLASS = r"[\u064B-\u065F\u0670\u0640]"
+# alef with hamza above/below, madda, wasla -> alef; alef maqsura -> yaa;
+# taa marbuta -> haa; waw/yaa with hamza -> waw/yaa.
+_FOLD_FROM = "\u0623\u0625\u0622\u0671\u0649\u0629\u0624\u0626"
+_FOLD_TO = "\u0627\u0627\u0627\u0627\u064A\u0647\u0648\u064A"
+
+_STRIP = re.compile(_STRIP_CLASS)
+_SPACES = re.compile(r"\s+")
+_FOLD = str.maketrans(_FOLD_FROM, _FOLD_TO)
+
+
+def normalize_name(text: str | None) -> str:
+    """Python side of name_search_sql(); apply it to query text before matching."""
+    if not text:
+        return ""
+    s = _STRIP.sub("", text).translate(_FOLD).lower()
+    return _SPACES.sub(" ", s).strip()
+
+
+def name_search_sql(column: str) -> str:
+    """
+    SQL side of normalize_name over `column`. Only immutable functions, so
+    it can back a generated column or an expression index.
+    """
+    return (
+        "btrim(regexp_replace(lower(translate("
+        f"regexp_replace({column}, '{_STRIP_CLASS}', '', 'g'), "
+        f"'{_FOLD_FROM}', '{_FOLD_TO}')), '\\s+', ' ', 'g'))"
+    )
+
+
+def _escape_like(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def name_match(column, q: str):
+    """
+    `column` (already normalized, trigram-indexed) contains the normalized
+    query, or matches it fuzzily on word similarity (pg_trgm `%>`, which
+    tolerates a typo or a missing letter). Both forms can use a GIN
+    gin_trgm_ops index. Returns None when `q` normalizes to nothing.
+    """
+    nq = normalize_name(q)
+    if not nq:
+        return None
+    return sa.or_(
+        column.like(f"%{_escape_like(nq)}%", escape="\\"),
+        column.op("%>")(nq),
+    )
+
+
+def name_rank(column, q: str):
+    """
+    Relevance of `column` to `q`, 0..1 (pg_trgm word_similarity), for
+    ORDER BY ... DESC. Typed double precision so it survives a keyset
+    cursor round trip exactly.
+    """
+    return func.word_similarity(normalize_name(q), column, type_=sa.Double)
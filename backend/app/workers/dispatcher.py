@@ -0,0 +1,18 @@
+import asyncio
+from backend.app.core import metrics
+from backend.app.core.config import settings
+from backend.app.db import events
+from backend.app.db.session import SessionLocal
+from backend.app.services.notify.dispatcher import run_forever
+
+def main(channel: str = "wa_web"):
+    if settings.dispatcher_metrics_port:
+        metrics.serve(settings.dispatcher_metrics_port)
+    listener = events.Listener()
+    try:
+        asyncio.run(run_forever(SessionLocal, channel=channel, listener=listener))
+    finally:
+        listener.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+from datetime import datetime, time
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import settings
+from backend.app.db.session import SessionLocal
+from backend.app.services.ledger_checkpoint_service import advance_checkpoint, verify_checkpoint
+
+def last_midnight(now: datetime | None = None) -> datetime:
+    """Most recent local (settings.tz) midnight, as an aware datetime."""
+    tz = ZoneInfo(settings.tz)
+    local_now = (now or datetime.now(tz)).astimezone(tz)
+    return datetime.combine(local_now.date(), time.min, tzinfo=tz)
+
+def run(db: Session, *, as_of: datetime | None = None) -> dict:
+    result = advance_checkpoint(db, as_of=as_of or last_midnight())
+    db.commit()
+    return result
+
+def verify(db: Session, *, checkpoint_id: int | None = None) -> dict:
+    result = verify_checkpoint(db, checkpoint_id=checkpoint_id)
+    db.rollback()
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Advance or verify the stock ledger checkpoint.")
+    parser.add_argument("--verify", action="store_true", help="recompute the checkpoint from full history and compare")
+    parser.add_argument("--checkpoint-id", type=int, default=None, help="checkpoint to verify (default: latest)")
+    args = parser.parse_args()
+
+    s = SessionLocal()
+    try:
+        if args.verify:
+            result = verify(s, checkpoint_id=args.checkpoint_id)
+            print({"checkpoint_id": result["checkpoint_id"], "checked": result["checked"], "mismatches": len(result["mismatches"])})
+            for m in result["mismatches"]:
+                print(m)
+        else:
+            print(run(s))
+    finally:
+        s.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy import select, update, func
+from sqlalchemy.orm import Session
+
+from backend.app.db.session import SessionLocal
+from backend.app.models.student import Student
+from backend.app.utils.phone import phone_key_expr
+
+def _backfill_batch_stmt(after: UUID | None, batch_size: int):
+    """
+    One statement per batch: take the next `batch_size` students by id
+    after `after` and rewrite phone_norm / parent_phone_norm where they
+    differ from the canonical phone_key. Yields (last_id, scanned, fixed).
+    """
+    picked = select(Student.id).order_by(Student.id).limit(batch_size)
+    if after is not None:
+        picked = picked.where(Student.id > after)
+    picked = picked.cte("picked")
+
+    phone, parent = phone_key_expr(Student.phone), phone_key_expr(Student.parent_phone)
+    fixed = (
+        update(Student)
+        .where(
+            Student.id.in_(select(picked.c.id)),
+            sa.or_(Student.phone_norm.is_distinct_from(phone), Student.parent_phone_norm.is_distinct_from(parent)),
+        )
+        .values(phone_norm=phone, parent_phone_norm=parent, updated_at=Student.updated_at)
+        .returning(Student.id)
+        .cte("fixed")
+    )
+    return select(
+        select(picked.c.id).order_by(picked.c.id.desc()).limit(1).scalar_subquery().label("last_id"),
+        select(func.count()).select_from(picked).scalar_subquery().label("scanned"),
+        select(func.count()).select_from(fixed).scalar_subquery().label("fixed"),
+    )
+
+def run(db: Session, *, batch_size: int = 1000) -> dict:
+    """
+    Walk students in id order, committing each batch, so the backfill
+    never holds more than `batch_size` row locks. Safe to re-run; rows
+    already canonical are skipped without being rewritten.
+    """
+    after = None
+    scanned = fixed = batches = 0
+    while True:
+        row = db.execute(_backfill_batch_stmt(after, batch_size)).one()
+        db.commit()
+        if not row.scanned:
+            break
+        batches += 1
+        scanned += int(row.scanned)
+        fixed += int(row.fixed)
+        after = row.last_id
+        if row.scanned < batch_size:
+            break
+    return {"scanned": scanned, "fixed": fixed, "batches": batches}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rewrite students' phone keys to the canonical phone_key form.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    s = SessionLocal()
+    try:
+        print(run(s, batch_size=args.batch_size))
+    finally:
+        s.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,117 @@
-from sqlalchemy import text
+import time
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from sqlalchemy import select, update, insert, func, literal
 from sqlalchemy.orm import Session
 
-def run(db: Session) -> int:
-    rows = db.execute(
-        text("""
-            UPDATE reservations
-               SET status = 'expired'
-             WHERE status IN ('hold','active')
-               AND upper(hold_window) < now()
-             RETURNING id, branch_id, item_id, qty
-        """)
-    ).mappings().all()
-
-    for r in rows:
-        db.execute(
-            text("""
-                INSERT INTO stock_ledger (branch_id, item_id, event, qty, at, ref_type, ref_id)
-                VALUES (:branch_id, :item_id, 'expire', :qty, now(), 'reservation', :res_id)
-            """),
-            {
-                "branch_id": str(r["branch_id"]),
-                "item_id": str(r["item_id"]),
-                "qty": int(r["qty"]),
-                "res_id": str(r["id"]),
-            },
+from backend.app.core import metrics
+from backend.app.core.config import settings
+from backend.app.models.ledger import StockLedger, StockEvent
+from backend.app.models.reservation import Reservation
+from backend.app.services.allocation_service import allocate_queued
+from backend.app.services.stock_balance_service import balance_upsert
+
+def _expire_batch_stmt(batch_size: int):
+    """
+    One statement per batch: lock up to `batch_size` overdue hold/active
+    reservations (skipping rows other transactions hold), mark them expired,
+    append their 'expire' ledger rows and fold those into stock_balance.
+    Yields (branch_id, item_id, expired, qty) per affected pair.
+    """
+    picked = (
+        select(Reservation.id)
+        .where(
+            Reservation.status.in_(("hold", "active")),
+            func.upper(Reservation.hold_window) < func.now(),
+        )
+        .order_by(func.upper(Reservation.hold_window))
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("picked")
+    )
+    expired = (
+        update(Reservation)
+        .where(Reservation.id.in_(select(picked.c.id)))
+        .values(status="expired", expired_at=func.now())
+        .returning(Reservation.id, Reservation.branch_id, Reservation.item_id, Reservation.qty)
+        .cte("expired")
+    )
+    ledger_rows = (
+        insert(StockLedger)
+        .from_select(
+            ["branch_id", "item_id", "event", "qty", "at", "ref_type", "ref_id"],
+            select(
+                expired.c.branch_id,
+                expired.c.item_id,
+                sa.cast(literal("expire"), StockEvent),
+                expired.c.qty,
+                func.now(),
+                literal("reservation"),
+                expired.c.id,
+            ),
+        )
+        .returning(StockLedger.id, StockLedger.branch_id, StockLedger.item_id, StockLedger.event, StockLedger.qty)
+        .cte("ledger_rows")
+    )
+    balance = balance_upsert(ledger_rows).returning(literal(1)).cte("balance")
+    return (
+        select(
+            expired.c.branch_id,
+            expired.c.item_id,
+            func.count().label("expired"),
+            func.sum(expired.c.qty).label("qty"),
         )
+        .group_by(expired.c.branch_id, expired.c.item_id)
+        .add_cte(ledger_rows, balance)
+    )
 
+def run(db: Session, *, batch_size: int | None = None) -> dict:
+    """
+    Expire overdue reservations in committed batches of `batch_size`
+    (settings.expire_batch_size by default) so row locks are held briefly.
+    Returns totals plus per-(branch, item) counts for follow-up allocation.
+    """
+    batch_size = int(batch_size or settings.expire_batch_size)
+    stmt = _expire_batch_stmt(batch_size)
+    t0 = time.perf_counter()
+
+    pairs: dict[tuple, dict] = {}
+    total = 0
+    batches = 0
+    while True:
+        rows = db.execute(stmt).all()
+        db.commit()
+        n = sum(int(r.expired) for r in rows)
+        if n == 0:
+            break
+        batches += 1
+        total += n
+        for r in rows:
+            p = pairs.setdefault(
+                (r.branch_id, r.item_id),
+                {"branch_id": r.branch_id, "item_id": r.item_id, "expired": 0, "qty": 0},
+            )
+            p["expired"] += int(r.expired)
+            p["qty"] += int(r.qty or 0)
+        if n < batch_size:
+            break
+
+    metrics.EXPIRY_RUN_SECONDS.observe(time.perf_counter() - t0)
+    metrics.EXPIRY_ROWS.inc(total)
+    return {"expired": total, "batches": batches, "pairs": list(pairs.values())}
+
+def allocate_freed(db: Session, pairs: list[dict]) -> int:
+    """Offer stock released by expiry to queued reservations of the same pairs."""
+    allocated = allocate_queued(db, [(p["branch_id"], p["item_id"]) for p in pairs])
     db.commit()
-    return len(rows)
+    return sum(allocated.values())
+
+def next_expiry_in(db: Session) -> float | None:
+    """Seconds until the earliest open hold window ends (<= 0 if overdue), or None if none are open."""
+    end = db.execute(
+        select(func.min(func.upper(Reservation.hold_window))).where(Reservation.status.in_(("hold", "active")))
+    ).scalar_one_or_none()
+    if end is None:
+        return None
+    return (end - datetime.now(timezone.utc)).total_seconds()
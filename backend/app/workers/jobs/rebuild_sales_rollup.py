@@ -0,0 +1,31 @@
+import argparse
+
+from sqlalchemy.orm import Session
+
+from backend.app.db.session import SessionLocal
+from backend.app.services.sales_rollup_service import rebuild_rollup
+
+def run(db: Session, *, apply: bool = True) -> dict:
+    result = rebuild_rollup(db, apply=apply)
+    if apply:
+        db.commit()
+    else:
+        db.rollback()
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild sales_daily_rollup from sales and kg_sales.")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without correcting it")
+    args = parser.parse_args()
+
+    s = SessionLocal()
+    try:
+        result = run(s, apply=not args.dry_run)
+        print({"applied": result["applied"], "drifted": result["drifted"]})
+        for k in result["keys"]:
+            print(k)
+    finally:
+        s.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import argparse
+
+from sqlalchemy.orm import Session
+
+from backend.app.db.session import SessionLocal
+from backend.app.services.stock_balance_service import rebuild_balances
+
+def run(db: Session, *, apply: bool = True) -> dict:
+    result = rebuild_balances(db, apply=apply)
+    if apply:
+        db.commit()
+    else:
+        db.rollback()
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild stock_balance from stock_ledger and reservations.")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without correcting it")
+    args = parser.parse_args()
+
+    s = SessionLocal()
+    try:
+        result = run(s, apply=not args.dry_run)
+        print({"applied": result["applied"], "drifted": result["drifted"]})
+        for p in result["pairs"]:
+            print(p)
+    finally:
+        s.close()
+
+if __name__ == "__main__":
+    main()
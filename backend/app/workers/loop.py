@@ -1,20 +1,46 @@
-from time import sleep
+from time import monotonic
+from backend.app.core import metrics
+from backend.app.core.config import settings
+from backend.app.db import events
 from backend.app.db.session import SessionLocal
-from backend.app.workers.jobs.expire_reservations import run as expire_run
-from backend.app.services.notify.outbox_service import drain_whatsapp
+from backend.app.workers.jobs.expire_reservations import run as expire_run, allocate_freed, next_expiry_in
 
-def main(interval_seconds: int = 60):
-    while True:
-        s = SessionLocal()
-        try:
-            expired = expire_run(s)
-            drained = drain_whatsapp(s, limit=50)
-            print({"expired": expired, **drained})
-        except Exception as e:
-            print({"worker_error": str(e)})
-        finally:
-            s.close()
-        sleep(interval_seconds)
+def _is_wakeup(payload: str) -> bool:
+    # The expiry job's own updates come back as 'reservation:expired'.
+    return payload.startswith("reservation:") and payload != "reservation:expired"
+
+def main(fallback_seconds: int | None = None):
+    """
+    Expire + allocate, then sleep until the earliest hold window ends, a
+    reservation changes status (LISTEN), or the fallback timer fires.
+    """
+    fallback = float(fallback_seconds or settings.worker_fallback_seconds)
+    if settings.expiry_worker_metrics_port:
+        metrics.serve(settings.expiry_worker_metrics_port)
+    listener = events.Listener()
+    try:
+        while True:
+            s = SessionLocal()
+            due = None
+            try:
+                expired = expire_run(s)
+                allocated = allocate_freed(s, expired["pairs"])
+                due = next_expiry_in(s)
+                if expired["expired"] or allocated:
+                    print({"expired": expired["expired"], "allocated": allocated})
+            except Exception as e:
+                print({"worker_error": str(e)})
+            finally:
+                s.close()
+
+            timeout = fallback if due is None else max(0.0, min(fallback, due))
+            deadline = monotonic() + timeout
+            while (remaining := deadline - monotonic()) > 0:
+                payloads = listener.wait(remaining)
+                if not payloads or any(_is_wakeup(p) for p in payloads):
+                    break
+    finally:
+        listener.close()
 
 if __name__ == "__main__":
     main()
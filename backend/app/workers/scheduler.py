@@ -1,25 +1,85 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from apscheduler.schedulers.background import BackgroundScheduler
+from backend.app.db import events
 from backend.app.db.session import SessionLocal
-from backend.app.workers.jobs.expire_reservations import run as expire_run
+from backend.app.core.config import settings
+from backend.app.workers.jobs.expire_reservations import run as expire_run, allocate_freed, next_expiry_in
+from backend.app.workers.jobs.advance_ledger_checkpoint import run as checkpoint_run
 
-def start() -> BackgroundScheduler:
+def _wake(sched: BackgroundScheduler, job_id: str, in_seconds: float = 0.0) -> None:
+    run_at = datetime.now(timezone.utc) + timedelta(seconds=max(0.0, in_seconds))
+    job = sched.get_job(job_id)
+    if job is not None and (job.next_run_time is None or run_at < job.next_run_time):
+        job.modify(next_run_time=run_at)
+
+def _listen_forever(sched: BackgroundScheduler) -> None:
+    """Run the expiry job as soon as a reservation changes status (other than to 'expired')."""
+    while True:
+        try:
+            conn = events.listen()
+            try:
+                while True:
+                    payloads = events.wait(conn, None)
+                    if any(p.startswith("reservation:") and p != "reservation:expired" for p in payloads):
+                        _wake(sched, "expire_reservations")
+            finally:
+                conn.close()
+        except Exception as e:
+            print({"listener_error": str(e)})
+            time.sleep(5)
+
+def start(listen: bool = True) -> BackgroundScheduler:
+    """
+    Expiry runs on a long fallback interval (WORKER_FALLBACK_SECONDS), pulled
+    forward to the earliest hold-window end and, with `listen`, to any
+    reservation status change.
+    """
     sched = BackgroundScheduler(timezone="UTC")
 
     def _expire_job():
         db = SessionLocal()
         try:
-            expire_run(db)
+            result = expire_run(db)
+            if result["pairs"]:
+                allocate_freed(db, result["pairs"])
+            due = next_expiry_in(db)
         finally:
             db.close()
+        if due is not None and due < settings.worker_fallback_seconds:
+            _wake(sched, "expire_reservations", due)
 
     sched.add_job(
         _expire_job,
         trigger="interval",
-        minutes=1,
+        seconds=settings.worker_fallback_seconds,
+        next_run_time=datetime.now(timezone.utc),
         id="expire_reservations",
         max_instances=1,
         coalesce=True,
         replace_existing=True,
     )
+
+    def _checkpoint_job():
+        db = SessionLocal()
+        try:
+            checkpoint_run(db)
+        finally:
+            db.close()
+
+    sched.add_job(
+        _checkpoint_job,
+        trigger="cron",
+        hour=0,
+        minute=15,
+        timezone=settings.tz,
+        id="advance_ledger_checkpoint",
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True,
+    )
     sched.start()
+    if listen:
+        threading.Thread(target=_listen_forever, args=(sched,), name="pg-listen", daemon=True).start()
     return sched
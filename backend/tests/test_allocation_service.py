@@ -0,0 +1,86 @@
+"""Unit tests for allocation_service using mocked DB."""
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.services.allocation_service import (
+    lock_pairs,
+    allocate_queued,
+    activate_holds,
+)
+from backend.app.services.notify.outbox_service import enqueue_ready_bulk
+
+
+BRANCH = uuid4()
+ITEM_A = uuid4()
+ITEM_B = uuid4()
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestLockPairs:
+    def test_keys_sorted_and_deduplicated(self, mock_db):
+        lock_pairs(mock_db, [(BRANCH, ITEM_B), (BRANCH, ITEM_A), (BRANCH, ITEM_B)])
+        keys = mock_db.execute.call_args[0][1]["keys"]
+        assert keys == sorted({f"{BRANCH}:{ITEM_A}", f"{BRANCH}:{ITEM_B}"})
+
+    def test_no_pairs_no_query(self, mock_db):
+        lock_pairs(mock_db, [])
+        mock_db.execute.assert_not_called()
+
+
+class TestAllocateQueued:
+    def test_empty_pairs(self, mock_db):
+        assert allocate_queued(mock_db, []) == {}
+        mock_db.execute.assert_not_called()
+
+    def test_one_statement_for_all_pairs(self, mock_db):
+        rid = uuid4()
+        mock_db.execute.return_value.all.return_value = [
+            SimpleNamespace(id=rid, branch_id=BRANCH, item_id=ITEM_A),
+            SimpleNamespace(id=uuid4(), branch_id=BRANCH, item_id=ITEM_A),
+        ]
+        result = allocate_queued(mock_db, [(BRANCH, ITEM_A), (BRANCH, ITEM_B)])
+        assert result == {(BRANCH, ITEM_A): 2}
+        # advisory locks + allocation
+        assert mock_db.execute.call_count == 2
+        sql = _sql(mock_db.execute.call_args[0][0])
+        assert "OVER (PARTITION BY" in sql
+        assert "FOR UPDATE OF reservations SKIP LOCKED" in sql
+        assert "INSERT INTO stock_ledger" in sql
+        assert "INSERT INTO stock_balance" in sql
+        mock_db.commit.assert_not_called()
+
+
+class TestActivateHolds:
+    @patch("backend.app.services.allocation_service.enqueue_ready_bulk", return_value=1)
+    def test_enqueues_once_for_all_activated(self, mock_enqueue, mock_db):
+        ids = [uuid4(), uuid4()]
+        mock_db.execute.return_value.all.return_value = [
+            SimpleNamespace(id=ids[0], branch_id=BRANCH, item_id=ITEM_A),
+            SimpleNamespace(id=ids[1], branch_id=BRANCH, item_id=ITEM_B),
+        ]
+        result = activate_holds(mock_db, [(BRANCH, ITEM_A), (BRANCH, ITEM_B)])
+        assert result == {(BRANCH, ITEM_A): 1, (BRANCH, ITEM_B): 1}
+        mock_enqueue.assert_called_once_with(mock_db, reservation_ids=ids)
+
+
+class TestEnqueueReadyBulk:
+    def test_skips_rows_without_phone(self, mock_db):
+        rows = [
+            {"reservation_id": uuid4(), "phone": "01000000000", "student_name": "A", "item_name": "Math", "branch_code": "CAI", "end": "x"},
+            {"reservation_id": uuid4(), "phone": " ", "student_name": "B", "item_name": "Math", "branch_code": "CAI", "end": "x"},
+        ]
+        mock_db.execute.return_value.mappings.return_value.all.return_value = rows
+        assert enqueue_ready_bulk(mock_db, reservation_ids=[r["reservation_id"] for r in rows]) == 1
+        # one SELECT + one multi-row INSERT
+        assert mock_db.execute.call_count == 2
+        mock_db.commit.assert_not_called()
+
+    def test_no_ids(self, mock_db):
+        assert enqueue_ready_bulk(mock_db, reservation_ids=[]) == 0
+        mock_db.execute.assert_not_called()
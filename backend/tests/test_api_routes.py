@@ -61,6 +61,9 @@ class TestAuthGuards:
         ("POST", "/api/v1/branches"),
         ("POST", "/api/v1/teachers"),
         ("POST", "/api/v1/reservations"),
+        ("POST", "/api/v1/adjustments/receive-manifest"),
+        ("POST", "/api/v1/notifications/wa/enqueue"),
+        ("POST", "/api/v1/notifications/wa/drain"),
     ])
     def test_unauthenticated_post_returns_401(self, client, method, path):
         resp = client.request(method, path, json={})
@@ -97,6 +100,10 @@ class TestAdminRoutes:
         # staff user → 403 or 500 (DB unavailable)
         assert resp.status_code in (403, 500, 503)
 
+    def test_dashboard_cache_stats_requires_auth(self, client):
+        resp = client.get("/api/v1/dashboard/cache-stats")
+        assert resp.status_code == 401
+
     def test_export_students_requires_auth(self, client):
         resp = client.get("/api/v1/export/students")
         assert resp.status_code == 401
@@ -105,6 +112,14 @@ class TestAdminRoutes:
         resp = client.get("/api/v1/export/students", headers=staff_headers)
         assert resp.status_code in (403, 500, 503)
 
+    def test_export_reservations_requires_auth(self, client):
+        resp = client.get("/api/v1/export/reservations?start_date=2025-01-01&end_date=2025-01-31")
+        assert resp.status_code == 401
+
+    def test_export_ledger_requires_auth(self, client):
+        resp = client.get("/api/v1/export/ledger?start_date=2025-01-01&end_date=2025-01-31")
+        assert resp.status_code == 401
+
     def test_audit_requires_auth(self, client):
         resp = client.get("/api/v1/audit")
         assert resp.status_code == 401
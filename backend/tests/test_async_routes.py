@@ -0,0 +1,81 @@
+"""Async read routes: they run the sync services on an AsyncSession via run_sync."""
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from backend.app.api.v1.auth import get_current_active_user
+from backend.app.db.session import get_async_db, get_async_read_db
+from backend.app.services import dashboard_service, report_service
+from backend.app.services.auth_cache import Principal
+from backend.app.services.reference_cache import BranchRef
+
+ADMIN = Principal(id=uuid4(), username="admin", role="admin", branch_id=None, is_active=True, token_version=0)
+
+
+class _AsyncSessionStub:
+    """Stands in for AsyncSession: run_sync hands `fn` a (mock) sync session."""
+
+    def __init__(self):
+        self.sync_session = MagicMock(spec=Session)
+        self.calls = []
+
+    async def run_sync(self, fn, *args, **kwargs):
+        self.calls.append(fn)
+        return fn(self.sync_session, *args, **kwargs)
+
+
+@pytest.fixture
+def async_db(app):
+    stub = _AsyncSessionStub()
+
+    async def _override():
+        yield stub
+
+    app.dependency_overrides[get_async_db] = _override
+    app.dependency_overrides[get_async_read_db] = _override
+    app.dependency_overrides[get_current_active_user] = lambda: ADMIN
+    yield stub
+    app.dependency_overrides.clear()
+
+
+def test_dashboard_summary_runs_service_on_async_session(client, async_db, monkeypatch):
+    summary = MagicMock(return_value={"date": "2026-10-18", "total_students": 3})
+    monkeypatch.setattr(dashboard_service, "summary", summary)
+    resp = client.get("/api/v1/dashboard/summary")
+    assert resp.status_code == 200
+    assert resp.json()["total_students"] == 3
+    summary.assert_called_once_with(async_db.sync_session, branch_id=None)
+
+
+def test_dashboard_summary_reads_the_primary(app):
+    route = next(r for r in app.routes if getattr(r, "path", None) == "/api/v1/dashboard/summary")
+    calls = {d.call for d in route.dependant.dependencies}
+    assert get_async_db in calls
+    assert get_async_read_db not in calls
+
+
+def test_branch_inventory_resolves_branch_then_snapshot(client, async_db, monkeypatch):
+    branch = BranchRef(id=uuid4(), code="QAL", name="Qaliub")
+    monkeypatch.setattr(report_service, "branch_by_code", MagicMock(return_value=branch))
+    monkeypatch.setattr(report_service, "branch_inventory_snapshot", MagicMock(return_value={"items": []}))
+    resp = client.get("/api/v1/reports/branch-inventory?branch_code=QAL")
+    assert resp.status_code == 200
+    assert resp.json()["branch_code"] == "QAL"
+    assert async_db.calls == [report_service.branch_by_code, report_service.branch_inventory_snapshot]
+
+
+def test_unknown_branch_is_404(client, async_db, monkeypatch):
+    monkeypatch.setattr(report_service, "branch_by_code", MagicMock(return_value=None))
+    resp = client.get("/api/v1/reports/daily-activity?branch_code=NOPE")
+    assert resp.status_code == 404
+
+
+def test_unreachable_database_is_503(app, client):
+    app.dependency_overrides[get_current_active_user] = lambda: ADMIN
+    try:
+        resp = client.get("/api/v1/reports/daily-sales?branch_code=QAL")
+    finally:
+        app.dependency_overrides.clear()
+    assert resp.status_code == 503
@@ -0,0 +1,102 @@
+"""Unit tests for the authenticated-principal cache and token versions."""
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from backend.app.core.cache import TTLCache
+from backend.app.core.security import create_refresh_token
+from backend.app.services import auth_cache, user_service
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache(monkeypatch):
+    monkeypatch.setattr(auth_cache, "_cache", TTLCache(ttl=60))
+
+
+def _user(**kw):
+    u = dict(id=uuid4(), username="sara", role="banha_staff", branch_id=uuid4(), is_active=True, token_version=2)
+    u.update(kw)
+    return SimpleNamespace(**u)
+
+
+def _returns_user(mock_db, user):
+    mock_db.execute.return_value.scalar_one_or_none.return_value = user
+
+
+def test_principal_is_cached_per_username(mock_db):
+    _returns_user(mock_db, _user())
+    first = auth_cache.principal(mock_db, {"sub": "sara", "ver": 2})
+    second = auth_cache.principal(mock_db, {"sub": "sara", "ver": 2})
+    assert first == second and first.role == "banha_staff"
+    assert mock_db.execute.call_count == 1
+
+
+def test_stale_token_version_is_rejected(mock_db):
+    _returns_user(mock_db, _user(token_version=3))
+    assert auth_cache.principal(mock_db, {"sub": "sara", "ver": 2}) is None
+
+
+def test_newer_token_reloads_a_stale_entry(mock_db):
+    _returns_user(mock_db, _user(token_version=2))
+    auth_cache.principal(mock_db, {"sub": "sara", "ver": 2})
+    _returns_user(mock_db, _user(token_version=3, role="admin"))
+    p = auth_cache.principal(mock_db, {"sub": "sara", "ver": 3})
+    assert p.role == "admin"
+    assert mock_db.execute.call_count == 2
+
+
+def test_tokens_without_version_count_as_zero(mock_db):
+    _returns_user(mock_db, _user(token_version=0))
+    assert auth_cache.principal(mock_db, {"sub": "sara"}) is not None
+
+
+def test_unknown_user(mock_db):
+    _returns_user(mock_db, None)
+    assert auth_cache.principal(mock_db, {"sub": "ghost", "ver": 0}) is None
+
+
+def test_commit_evicts_invalidated_usernames(mock_db):
+    _returns_user(mock_db, _user())
+    auth_cache.principal(mock_db, {"sub": "sara", "ver": 2})
+    session = SimpleNamespace(info={})
+    auth_cache.invalidate(session, "sara")
+    auth_cache._evict_on_commit(session)
+    auth_cache.principal(mock_db, {"sub": "sara", "ver": 2})
+    assert mock_db.execute.call_count == 2
+
+
+def test_trusted_claims_skip_the_lookup(mock_db, monkeypatch):
+    monkeypatch.setattr(auth_cache.settings, "auth_trust_token_claims", True)
+    branch = uuid4()
+    p = auth_cache.principal(mock_db, {"sub": "sara", "role": "banha_staff", "branch_id": str(branch), "ver": 4})
+    assert (p.username, p.branch_id, p.token_version, p.is_active) == ("sara", branch, 4, True)
+    mock_db.execute.assert_not_called()
+
+
+def test_trusted_claims_fall_back_for_old_tokens(mock_db, monkeypatch):
+    monkeypatch.setattr(auth_cache.settings, "auth_trust_token_claims", True)
+    _returns_user(mock_db, _user(token_version=0))
+    assert auth_cache.principal(mock_db, {"sub": "sara", "role": "admin"}).role == "banha_staff"
+
+
+def test_update_user_rejects_other_fields(mock_db):
+    with pytest.raises(ValueError):
+        user_service.update_user(mock_db, _user(), username="other")
+
+
+def test_update_user_invalidates_on_commit(mock_db):
+    mock_db.info = {}
+    user = _user()
+    user_service.update_user(mock_db, user, is_active=False)
+    assert user.is_active is False
+    assert mock_db.info[auth_cache._DIRTY] == {"sara"}
+    mock_db.commit.assert_called_once()
+
+
+def test_refresh_with_revoked_version_is_401(client, monkeypatch):
+    monkeypatch.setattr(user_service, "get_user_by_username", MagicMock(return_value=_user(token_version=5)))
+    token = create_refresh_token({"sub": "sara", "ver": 4})
+    resp = client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+    assert resp.status_code == 401
@@ -0,0 +1,127 @@
+"""Unit tests for the dashboard summary and its cache, using mocked DB."""
+from datetime import date
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.app.core.cache import TTLCache
+from backend.app.services import dashboard_cache, dashboard_service
+
+
+BRANCH = uuid4()
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache(monkeypatch):
+    monkeypatch.setattr(dashboard_cache, "_cache", TTLCache(ttl=60))
+
+
+def _row(**kw):
+    row = dict(
+        total_students=10, total_kg_students=4,
+        today_count=2, today_cents=500, month_count=7, month_cents=2100,
+        reservations_by_status={"active": 3}, low_stock_items=1,
+        branches_today=[{"code": "B1", "name": "One", "sales_count": 2, "revenue_cents": 500}],
+    )
+    row.update(kw)
+    return SimpleNamespace(**row)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    def test_expires_and_counts(self):
+        clock = Clock()
+        cache = TTLCache(ttl=5, clock=clock)
+        assert cache.get("k") is None
+        cache.put("k", 1)
+        clock.now = 4.9
+        assert cache.get("k") == 1
+        clock.now = 5.0
+        assert cache.get("k") is None
+        assert cache.stats() == {"hits": 1, "misses": 2, "size": 0, "ttl_seconds": 5.0}
+
+    def test_zero_ttl_disables(self):
+        cache = TTLCache(ttl=0)
+        cache.put("k", 1)
+        assert cache.get("k") is None
+
+
+class TestSummary:
+    def test_one_statement_then_cached(self, mock_db):
+        mock_db.execute.return_value.one.return_value = _row()
+        first = dashboard_service.summary(mock_db, branch_id=BRANCH)
+        second = dashboard_service.summary(mock_db, branch_id=BRANCH)
+        assert mock_db.execute.call_count == 1
+        assert second == first
+        assert first["sales_month"] == {"count": 7, "revenue_cents": 2100}
+        assert first["reservations_by_status"] == {"active": 3}
+        assert dashboard_cache.stats()["hits"] == 1
+
+    def test_empty_aggregates(self, mock_db):
+        mock_db.execute.return_value.one.return_value = _row(reservations_by_status=None, branches_today=None)
+        out = dashboard_service.summary(mock_db)
+        assert out["reservations_by_status"] == {}
+        assert out["branches_today"] == []
+
+    def test_statement_scopes_to_branch(self):
+        sql = str(dashboard_service._summary_stmt(BRANCH, date(2026, 10, 18)).compile(dialect=postgresql.dialect()))
+        assert sql.startswith("WITH")
+        assert "sales_daily_rollup" in sql
+        assert "json_object_agg" in sql
+        assert "stock_balance.branch_id" in sql
+
+
+class TestInvalidation:
+    def test_evicts_branch_and_all_on_commit_only(self):
+        other = uuid4()
+        for key in (BRANCH, other, None):
+            dashboard_cache.put(key, {"k": key})
+        session = SimpleNamespace(info={})
+
+        dashboard_cache.invalidate(session, BRANCH)
+        assert dashboard_cache.get(BRANCH) is not None
+        dashboard_cache._evict_on_commit(session)
+
+        assert dashboard_cache.get(BRANCH) is None
+        assert dashboard_cache.get(None) is None
+        assert dashboard_cache.get(other) == {"k": other}
+        assert session.info == {}
+
+    def test_rollback_discards(self):
+        dashboard_cache.put(BRANCH, {"k": 1})
+        session = SimpleNamespace(info={})
+        dashboard_cache.invalidate(session, BRANCH)
+        dashboard_cache._forget_on_rollback(session)
+        dashboard_cache._evict_on_commit(session)
+        assert dashboard_cache.get(BRANCH) == {"k": 1}
+
+    def test_savepoint_session_defers_to_outer_commit(self):
+        from sqlalchemy.orm import Session
+        from backend.app.core.cache import OUTER_SESSION
+        from backend.app.db import session as db_session
+
+        dashboard_cache.put(BRANCH, {"k": 1})
+        with Session(db_session.engine) as outer:
+            inner = Session(bind=outer.connection(), join_transaction_mode="create_savepoint", info={OUTER_SESSION: outer})
+            dashboard_cache.invalidate(inner, BRANCH)
+            inner.commit()  # releases a savepoint only
+            inner.close()
+            assert dashboard_cache.get(BRANCH) == {"k": 1}
+            outer.commit()
+        assert dashboard_cache.get(BRANCH) is None
+
+    def test_no_ids_clears_everything(self):
+        dashboard_cache.put(BRANCH, {"k": 1})
+        session = SimpleNamespace(info={})
+        dashboard_cache.invalidate(session)
+        dashboard_cache._evict_on_commit(session)
+        assert dashboard_cache.stats()["size"] == 0
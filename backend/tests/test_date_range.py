@@ -0,0 +1,34 @@
+"""Unit tests for local-date → timestamptz range helpers."""
+from datetime import date, datetime, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.models.sale import Sale
+from backend.app.utils.date_range import in_local_dates, local_day_bounds
+
+
+class TestLocalDayBounds:
+    def test_half_open_cairo_range(self):
+        start, end = local_day_bounds(date(2025, 1, 10), date(2025, 1, 11), tz="Africa/Cairo")
+        assert start.astimezone(timezone.utc) == datetime(2025, 1, 9, 22, tzinfo=timezone.utc)
+        assert end.astimezone(timezone.utc) == datetime(2025, 1, 11, 22, tzinfo=timezone.utc)
+
+    def test_single_day_defaults_end(self):
+        start, end = local_day_bounds(date(2025, 1, 10), tz="Africa/Cairo")
+        assert (end - start).total_seconds() == 86400
+
+    def test_summer_time_offset(self):
+        start, _ = local_day_bounds(date(2025, 7, 1), tz="Africa/Cairo")
+        assert start.utcoffset().total_seconds() == 3 * 3600
+
+
+class TestInLocalDates:
+    def test_compares_bare_column(self):
+        clause = in_local_dates(Sale.sold_at, date(2025, 1, 1), date(2025, 1, 31))
+        sql = str(clause.compile(dialect=postgresql.dialect()))
+        assert "sales.sold_at >= " in sql and "sales.sold_at < " in sql
+        assert "date(" not in sql.lower() and "AT TIME ZONE" not in sql
+
+    def test_open_ended(self):
+        sql = str(in_local_dates(Sale.sold_at, start=date(2025, 1, 1)).compile(dialect=postgresql.dialect()))
+        assert ">=" in sql and "<" not in sql.replace(">=", "")
@@ -0,0 +1,103 @@
+"""Unit tests for the outbox dispatcher using mocked DB and the fake sender."""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from backend.app.services.notify import dispatcher
+from backend.app.services.notify import queue
+from backend.app.services.notify.dispatcher import TokenBucket, Channel, dispatch_batch
+from backend.app.services.notify.fake_sender import FakeSender
+
+
+def _row(to, attempts=1):
+    return SimpleNamespace(id=uuid4(), to=to, message="hi", attempts=attempts)
+
+
+class TestTokenBucket:
+    def test_burst_then_waits_for_refill(self):
+        now = [0.0]
+        b = TokenBucket(rate=2.0, burst=2, clock=lambda: now[0])
+        assert b.try_acquire() == 0
+        assert b.try_acquire() == 0
+        assert b.try_acquire() == pytest.approx(0.5)
+        now[0] = 0.5
+        assert b.try_acquire() == 0
+
+    def test_full_in(self):
+        now = [0.0]
+        b = TokenBucket(rate=2.0, burst=2, clock=lambda: now[0])
+        assert b.full_in() == 0
+        b.try_acquire()
+        b.try_acquire()
+        assert b.full_in() == pytest.approx(1.0)
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError, match="rate must be > 0"):
+            TokenBucket(rate=0)
+
+
+class TestDispatchBatch:
+    def test_sends_and_records_outcomes_in_one_commit(self, mock_db):
+        sender = FakeSender(fail_for={"+2000"})
+        ch = Channel(sender=sender, bucket=TokenBucket(rate=1000, burst=10), concurrency=4)
+        rows = [_row("+2011"), _row("+2000", attempts=2), _row("+2012")]
+        with patch.dict(dispatcher._channels, {"test": ch}), \
+             patch.object(queue, "claim", return_value=rows), \
+             patch.object(queue.settings, "notify_max_attempts", 2):
+            result = asyncio.run(dispatch_batch(mock_db, channel="test", limit=3))
+
+        assert result["sent"] == 2 and result["failed"] == 1
+        assert sorted(p for p, _ in sender.sent) == ["+2011", "+2012"]
+        mock_db.commit.assert_called_once()
+        params = [p for c in mock_db.execute.call_args_list for p in c[0][1]]
+        states = {p["id"]: p["state"] for p in params}
+        assert states[rows[1].id] == "failed"
+        assert all("latency_ms" in p for p in params)
+
+    def test_empty_batch(self, mock_db):
+        ch = Channel(sender=FakeSender(), bucket=TokenBucket(rate=1), concurrency=1)
+        with patch.dict(dispatcher._channels, {"test": ch}), \
+             patch.object(queue, "claim", return_value=[]):
+            assert asyncio.run(dispatch_batch(mock_db, channel="test"))["scanned"] == 0
+
+    def test_unknown_channel_raises(self):
+        with pytest.raises(ValueError, match="No sender registered"):
+            dispatcher.get_channel("sms")
+
+
+class TestSendLock:
+    def _conn(self, mock_db):
+        return mock_db.get_bind.return_value.connect.return_value.__enter__.return_value
+
+    def test_busy_channel_is_left_alone(self, mock_db):
+        self._conn(mock_db).execute.return_value.scalar.return_value = False
+        with patch.object(queue, "claim") as claim:
+            out = asyncio.run(dispatch_batch(mock_db, channel="wa_web", wait=False))
+        assert out["busy"] is True
+        claim.assert_not_called()
+        sql = [str(c.args[0]) for c in self._conn(mock_db).execute.call_args_list]
+        assert len(sql) == 1 and "pg_try_advisory_lock" in sql[0]
+
+    def test_batch_sends_under_the_lock(self, mock_db):
+        ch = Channel(sender=FakeSender(), bucket=TokenBucket(rate=1000, burst=1), concurrency=1)
+        with patch.dict(dispatcher._channels, {"test": ch}), \
+             patch.object(queue, "claim", return_value=[_row("+2011")]), \
+             patch.object(queue, "ack", return_value={queue.SENT: 1, queue.PENDING: 0, queue.FAILED: 0}):
+            out = asyncio.run(dispatch_batch(mock_db, channel="test"))
+        assert out["sent"] == 1
+        sql = [str(c.args[0]) for c in self._conn(mock_db).execute.call_args_list]
+        assert "pg_advisory_lock" in sql[0] and "pg_advisory_unlock" in sql[-1]
+
+
+class TestRunForever:
+    def test_error_retries_after_idle_seconds(self):
+        listener = MagicMock(connected=True)
+        listener.wait.side_effect = [None, SystemExit]
+        with patch.object(dispatcher, "dispatch_batch", side_effect=[RuntimeError("db down"), {"scanned": 0}]), \
+             patch.object(queue, "next_due_in", return_value=None):
+            with pytest.raises(SystemExit):
+                asyncio.run(dispatcher.run_forever(MagicMock(), listener=listener, idle_seconds=2))
+        assert [c.args[0] for c in listener.wait.call_args_list] == [2.0, float(dispatcher.settings.worker_fallback_seconds)]
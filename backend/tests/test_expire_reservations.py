@@ -0,0 +1,62 @@
+"""Unit tests for the reservation expiry job using mocked DB."""
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.workers.jobs.expire_reservations import run, _expire_batch_stmt
+
+
+BRANCH = uuid4()
+ITEM_A = uuid4()
+ITEM_B = uuid4()
+
+
+def _batch(*rows):
+    result = MagicMock()
+    result.all.return_value = [SimpleNamespace(branch_id=b, item_id=i, expired=n, qty=q) for b, i, n, q in rows]
+    return result
+
+
+class TestExpireBatchStatement:
+    def test_single_statement_updates_ledger_and_balance(self):
+        sql = str(_expire_batch_stmt(100).compile(dialect=postgresql.dialect()))
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "UPDATE reservations" in sql
+        assert "INSERT INTO stock_ledger" in sql
+        assert "INSERT INTO stock_balance" in sql
+
+
+class TestRun:
+    def test_nothing_to_expire(self, mock_db):
+        mock_db.execute.return_value = _batch()
+        result = run(mock_db, batch_size=10)
+        assert result == {"expired": 0, "batches": 0, "pairs": []}
+        assert mock_db.execute.call_count == 1
+
+    def test_loops_until_short_batch_and_merges_pairs(self, mock_db):
+        mock_db.execute.side_effect = [
+            _batch((BRANCH, ITEM_A, 1, 2), (BRANCH, ITEM_B, 1, 1)),
+            _batch((BRANCH, ITEM_A, 1, 3)),
+        ]
+        result = run(mock_db, batch_size=2)
+        assert result["expired"] == 3
+        assert result["batches"] == 2
+        pairs = {p["item_id"]: p for p in result["pairs"]}
+        assert pairs[ITEM_A]["expired"] == 2
+        assert pairs[ITEM_A]["qty"] == 5
+        assert mock_db.commit.call_count == 2
+
+    def test_records_duration_and_rows(self, mock_db):
+        from prometheus_client import REGISTRY
+
+        def _sample(name):
+            return REGISTRY.get_sample_value(name) or 0
+
+        rows_before = _sample("eltafawook_reservation_expiry_rows_total")
+        runs_before = _sample("eltafawook_reservation_expiry_duration_seconds_count")
+        mock_db.execute.return_value = _batch((BRANCH, ITEM_A, 3, 3))
+        run(mock_db, batch_size=10)
+        assert _sample("eltafawook_reservation_expiry_rows_total") == rows_before + 3
+        assert _sample("eltafawook_reservation_expiry_duration_seconds_count") == runs_before + 1
@@ -0,0 +1,81 @@
+"""Unit tests for the streaming export pipeline."""
+import io
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from backend.app.api.v1 import export
+from backend.app.api.v1.export import Col, _csv_chunks, _columnar_chunks, _stream_rows
+
+
+COLUMNS = [Col("id", "int"), Col("name"), Col("total_egp", "cents", "total_cents")]
+
+
+def _r(id, name, cents=0):
+    return SimpleNamespace(id=id, name=name, total_cents=cents)
+
+
+class TestCsvChunks:
+    def test_one_chunk_per_batch_with_single_header(self):
+        batches = [[_r(1, "a", 1250), _r(2, None)], [_r(3, "c,d")]]
+        chunks = list(_csv_chunks(iter(batches), COLUMNS))
+        assert len(chunks) == 2
+        assert chunks[0] == "id,name,total_egp\r\n1,a,12.5\r\n2,,0.0\r\n"
+        assert chunks[1] == '3,"c,d",0.0\r\n'
+
+    def test_empty_result(self):
+        assert list(_csv_chunks(iter([]), COLUMNS)) == ["No data"]
+
+    def test_is_lazy(self):
+        def batches():
+            yield [_r(1, "a")]
+            raise AssertionError("second batch read before first chunk was consumed")
+
+        assert next(_csv_chunks(batches(), COLUMNS)).endswith("1,a,0.0\r\n")
+
+
+class TestColumnarChunks:
+    COLS = [Col("id", "uuid"), Col("total_egp", "cents", "total_cents"), Col("sold_at", "ts")]
+
+    def _rows(self):
+        return [
+            [SimpleNamespace(id=uuid4(), total_cents=1250, sold_at=datetime(2025, 1, 1, 10, tzinfo=timezone.utc))],
+            [SimpleNamespace(id=uuid4(), total_cents=99, sold_at=None)],
+        ]
+
+    def test_parquet_typed_columns(self):
+        pq = pytest.importorskip("pyarrow.parquet")
+        data = b"".join(_columnar_chunks(iter(self._rows()), self.COLS, "parquet"))
+        table = pq.read_table(io.BytesIO(data))
+        assert table.column_names == ["id", "total_cents", "sold_at"]
+        assert str(table.schema.field("total_cents").type) == "int64"
+        assert table.schema.field("sold_at").type.tz == "UTC"
+        assert table.column("total_cents").to_pylist() == [1250, 99]
+        assert table.num_rows == 2
+
+    def test_arrow_stream_one_batch_per_partition(self):
+        pa = pytest.importorskip("pyarrow")
+        data = b"".join(_columnar_chunks(iter(self._rows()), self.COLS, "arrow"))
+        reader = pa.ipc.open_stream(data)
+        assert len(list(reader)) == 2
+
+    def test_empty_result_is_schema_only(self):
+        pq = pytest.importorskip("pyarrow.parquet")
+        data = b"".join(_columnar_chunks(iter([]), self.COLS, "parquet"))
+        assert pq.read_table(io.BytesIO(data)).num_rows == 0
+
+
+class TestStreamRows:
+    def test_uses_yield_per_and_own_session(self):
+        db = MagicMock()
+        db.execute.return_value.partitions.return_value = iter([["r1"], ["r2"]])
+        factory = MagicMock()
+        factory.return_value.__enter__.return_value = db
+        stmt = MagicMock()
+        with patch.object(export, "read_session", factory):
+            assert list(_stream_rows(stmt, chunk_rows=500)) == [["r1"], ["r2"]]
+        stmt.execution_options.assert_called_once_with(yield_per=500)
+        factory.return_value.__exit__.assert_called_once()
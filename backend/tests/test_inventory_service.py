@@ -1,15 +1,21 @@
 """Unit tests for inventory_service using mocked DB."""
 import pytest
 from unittest.mock import MagicMock, patch, call
+from types import SimpleNamespace
 from uuid import uuid4
 
+from sqlalchemy.dialects import postgresql
+
 from backend.app.services.inventory_service import (
     on_hand,
     reserved_qty,
     get_inventory_summary,
     receive_stock,
+    receive_manifest,
+    get_inventory_summaries,
     adjust_stock,
     transfer_stock,
+    _resolve_manifest_items,
 )
 
 
@@ -40,15 +46,21 @@ class TestReservedQty:
 
 
 class TestGetInventorySummary:
-    @patch("backend.app.services.inventory_service.reserved_qty", return_value=5)
-    @patch("backend.app.services.inventory_service.on_hand", return_value=20)
-    def test_summary(self, mock_oh, mock_rq, mock_db):
+    def test_summary(self, mock_db):
+        mock_db.execute.return_value.one_or_none.return_value = (20, 5)
         result = get_inventory_summary(mock_db, BRANCH, ITEM)
         assert result["on_hand"] == 20
         assert result["reserved"] == 5
         assert result["available"] == 15
         assert result["branch_id"] == BRANCH
         assert result["item_id"] == ITEM
+        assert mock_db.execute.call_count == 1
+
+    def test_summary_without_balance_row(self, mock_db):
+        mock_db.execute.return_value.one_or_none.return_value = None
+        result = get_inventory_summary(mock_db, BRANCH, ITEM)
+        assert result["on_hand"] == 0
+        assert result["available"] == 0
 
 
 class TestReceiveStock:
@@ -92,6 +104,61 @@ class TestAdjustStock:
             adjust_stock(mock_db, branch_id=BRANCH, item_id=ITEM, delta=-10)
 
 
+class TestReceiveManifest:
+    @patch("backend.app.services.inventory_service.get_inventory_summaries", return_value=[])
+    @patch("backend.app.services.inventory_service.activate_holds", return_value={(BRANCH, ITEM): 2})
+    @patch("backend.app.services.inventory_service.post_ledger")
+    def test_merges_lines_and_posts_once(self, mock_post, mock_activate, mock_summaries, mock_db):
+        other = uuid4()
+        teacher = uuid4()
+        mock_db.execute.return_value.all.return_value = [
+            SimpleNamespace(id=ITEM, sku="MATH-1", teacher_id=teacher, grade=1),
+            SimpleNamespace(id=other, sku="SCI-1", teacher_id=teacher, grade=1),
+        ]
+        result = receive_manifest(mock_db, branch_id=BRANCH, lines=[
+            {"item_id": ITEM, "qty": 5},
+            {"item_id": None, "sku": "SCI-1", "teacher_id": teacher, "grade": 1, "qty": 3},
+            {"item_id": ITEM, "qty": 2},
+        ])
+        rows = mock_post.call_args[0][1]
+        assert mock_post.call_count == 1
+        assert {(r["item_id"], r["qty"]) for r in rows} == {(ITEM, 7), (other, 3)}
+        mock_activate.assert_called_once()
+        assert result["received_lines"] == 3
+        assert result["activated_holds"] == 2
+
+    def test_sku_matches_regardless_of_case(self, mock_db):
+        teacher = uuid4()
+        mock_db.execute.return_value.all.return_value = [
+            SimpleNamespace(id=ITEM, sku="Math-1", teacher_id=teacher, grade=1),
+        ]
+        lines = [{"item_id": None, "sku": "MATH-1", "teacher_id": teacher, "grade": 1, "qty": 1}]
+        assert _resolve_manifest_items(mock_db, lines) == [ITEM]
+        compiled = mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect())
+        assert "lower(items.sku)" in str(compiled)
+        assert "math-1" in str(compiled.params)
+
+    def test_unknown_item_raises(self, mock_db):
+        mock_db.execute.return_value.all.return_value = []
+        with pytest.raises(ValueError, match="Unknown item on manifest line"):
+            receive_manifest(mock_db, branch_id=BRANCH, lines=[{"item_id": ITEM, "qty": 1}])
+
+    def test_empty_manifest_raises(self, mock_db):
+        with pytest.raises(ValueError, match="At least one line"):
+            receive_manifest(mock_db, branch_id=BRANCH, lines=[])
+
+
+class TestGetInventorySummaries:
+    def test_single_query_keeps_order_and_fills_missing(self, mock_db):
+        other = uuid4()
+        mock_db.execute.return_value.all.return_value = [SimpleNamespace(branch_id=BRANCH, item_id=ITEM, on_hand=9, reserved=4)]
+        result = get_inventory_summaries(mock_db, BRANCH, [other, ITEM])
+        assert [r["item_id"] for r in result] == [other, ITEM]
+        assert result[0]["available"] == 0
+        assert result[1]["available"] == 5
+        assert mock_db.execute.call_count == 1
+
+
 class TestTransferStock:
     @patch("backend.app.services.inventory_service.get_inventory_summary")
     @patch("backend.app.services.inventory_service.reserved_qty", return_value=0)
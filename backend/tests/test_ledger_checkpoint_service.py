@@ -0,0 +1,102 @@
+"""Unit tests for ledger_checkpoint_service using mocked DB."""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.services.ledger_checkpoint_service import (
+    event_totals_query,
+    branch_event_totals,
+    advance_checkpoint,
+    verify_checkpoint,
+)
+from backend.app.services.report_service import daily_branch_activity
+from backend.app.workers.jobs.advance_ledger_checkpoint import last_midnight
+
+
+BRANCH = uuid4()
+AS_OF = datetime(2026, 1, 2, tzinfo=timezone.utc)
+CP = SimpleNamespace(id=7, as_of=datetime(2026, 1, 1, tzinfo=timezone.utc), ledger_high_watermark=100)
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestEventTotalsQuery:
+    def test_without_checkpoint_reads_ledger_only(self):
+        sql = _sql(event_totals_query(None, as_of=AS_OF))
+        assert "stock_ledger_checkpoint_totals" not in sql
+        assert "stock_ledger.at <" in sql
+
+    def test_with_checkpoint_adds_tail_and_late_rows(self):
+        sql = _sql(event_totals_query(CP, as_of=AS_OF, branch_id=BRANCH))
+        assert "stock_ledger_checkpoint_totals" in sql
+        assert "UNION ALL" in sql
+        assert "stock_ledger.at >=" in sql
+        assert "stock_ledger.id >" in sql
+
+
+class TestBranchEventTotals:
+    def test_maps_events(self, mock_db):
+        cp_result = MagicMock()
+        cp_result.one_or_none.return_value = CP
+        totals_result = MagicMock()
+        totals_result.all.return_value = [("receive", 10), ("ship", -4)]
+        mock_db.execute.side_effect = [cp_result, totals_result]
+        assert branch_event_totals(mock_db, branch_id=BRANCH, as_of=AS_OF) == {"receive": 10, "ship": -4}
+
+
+class TestDailyBranchActivity:
+    def test_sums_only_the_window(self, mock_db):
+        window = MagicMock()
+        window.all.return_value = [("receive", 10), ("ship", -2), ("transfer_out", -5)]
+        reservations = MagicMock()
+        reservations.one.return_value = (2, 3)
+        mock_db.execute.side_effect = [window, reservations]
+        result = daily_branch_activity(mock_db, branch_id=BRANCH, start=CP.as_of, end=AS_OF)
+        sql = _sql(mock_db.execute.call_args_list[0].args[0])
+        assert "stock_ledger.at >=" in sql and "stock_ledger.at <" in sql
+        assert "stock_ledger_checkpoint" not in sql
+        assert result["receive"] == 10
+        assert result["ship"] == 2
+        assert result["transfer_out"] == 5
+        assert result["reservations_count"] == 2
+
+
+class TestAdvanceCheckpoint:
+    def test_existing_checkpoint_is_not_rewritten(self, mock_db):
+        mock_db.execute.return_value.scalar_one_or_none.return_value = 7
+        result = advance_checkpoint(mock_db, as_of=AS_OF)
+        assert result["created"] is False
+        assert mock_db.execute.call_count == 1
+
+
+class TestVerifyCheckpoint:
+    def test_no_checkpoint(self, mock_db):
+        mock_db.execute.return_value.one_or_none.return_value = None
+        result = verify_checkpoint(mock_db)
+        assert result["checked"] is False
+
+    def test_reports_mismatches(self, mock_db):
+        cp_result = MagicMock()
+        cp_result.one_or_none.return_value = CP
+        rows = MagicMock()
+        rows.mappings.return_value.all.return_value = [
+            {"branch_id": BRANCH, "item_id": uuid4(), "event": "receive", "stored": 5, "expected": 6},
+        ]
+        mock_db.execute.side_effect = [cp_result, rows]
+        result = verify_checkpoint(mock_db)
+        assert result["checked"] is True
+        assert result["mismatches"][0]["expected"] == 6
+
+
+class TestLastMidnight:
+    @patch("backend.app.workers.jobs.advance_ledger_checkpoint.settings")
+    def test_uses_local_day(self, mock_settings):
+        mock_settings.tz = "Africa/Cairo"
+        # 23:30 UTC on Jan 1 is already Jan 2 in Cairo.
+        m = last_midnight(datetime(2026, 1, 1, 23, 30, tzinfo=timezone.utc))
+        assert (m.year, m.month, m.day, m.hour) == (2026, 1, 2, 0)
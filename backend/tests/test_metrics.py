@@ -0,0 +1,141 @@
+"""Metrics middleware, /metrics and its collectors."""
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY, CollectorRegistry, generate_latest
+
+from backend.app.core import metrics
+from backend.app.core.config import settings
+from backend.app.services import metrics_service
+
+
+def _lines(collector) -> list[str]:
+    registry = CollectorRegistry()
+    registry.register(collector)
+    return generate_latest(registry).decode().splitlines()
+
+
+def _requests(method, route, status):
+    return REGISTRY.get_sample_value(
+        "eltafawook_http_requests_total", {"method": method, "route": route, "status": status}
+    ) or 0
+
+
+class TestServe:
+    def test_port_in_use_is_logged_not_raised(self, caplog):
+        first = metrics.serve(0)
+        try:
+            with caplog.at_level("WARNING", logger="eltafawook.metrics"):
+                assert metrics.serve(first.server_address[1]) is None
+            assert "cannot serve metrics" in caplog.text
+        finally:
+            first.shutdown()
+            first.server_close()
+
+
+class TestMiddleware:
+    def _app(self):
+        app = FastAPI()
+        app.add_middleware(metrics.MetricsMiddleware)
+
+        @app.get("/things/{thing_id}")
+        def thing(thing_id: int):
+            return {"id": thing_id}
+
+        metrics.prepare_routes(app.routes)
+        return app
+
+    def test_records_by_route_template(self):
+        app = self._app()
+        labels = {"method": "GET", "route": "/things/{thing_id}"}
+        before = REGISTRY.get_sample_value("eltafawook_http_request_duration_seconds_count", labels) or 0
+        ok_before = _requests("GET", "/things/{thing_id}", "2xx")
+        client = TestClient(app)
+        client.get("/things/1")
+        client.get("/things/2")
+        assert REGISTRY.get_sample_value("eltafawook_http_request_duration_seconds_count", labels) == before + 2
+        assert _requests("GET", "/things/{thing_id}", "2xx") == ok_before + 2
+
+    def test_unknown_paths_share_one_series(self):
+        client = TestClient(self._app())
+        client.get("/nope/a")
+        before = _requests("GET", metrics.UNMATCHED, "4xx")
+        client.get("/nope/b")
+        assert _requests("GET", metrics.UNMATCHED, "4xx") == before + 1
+        assert ("GET", "/nope/b") not in metrics._route_series
+
+
+class TestCollectors:
+    def test_db_state_lines(self, monkeypatch):
+        db = MagicMock()
+        db.execute.return_value.all.side_effect = [
+            [("pending", 4, 90.5), ("sent", 10, 3600.0)],
+            [("hold", 2)],
+        ]
+
+        @contextmanager
+        def _read_session():
+            yield db
+
+        monkeypatch.setattr(metrics_service.session, "read_session", _read_session)
+        metrics_service._db_snapshot.clear()
+        lines = _lines(metrics_service.DbStateCollector())
+        assert "eltafawook_metrics_db_up 1.0" in lines
+        assert 'eltafawook_outbox_messages{state="pending"} 4.0' in lines
+        assert 'eltafawook_outbox_messages{state="failed"} 0.0' in lines
+        assert "eltafawook_outbox_oldest_pending_age_seconds 90.5" in lines
+        assert 'eltafawook_reservations{status="hold"} 2.0' in lines
+        assert 'eltafawook_reservations{status="queued"} 0.0' in lines
+        metrics_service._db_snapshot.clear()
+
+    def test_db_down_reports_zero(self, monkeypatch):
+        monkeypatch.setattr(metrics_service.session, "read_session", MagicMock(side_effect=RuntimeError("down")))
+        metrics_service._db_snapshot.clear()
+        assert _lines(metrics_service.DbStateCollector())[-1] == "eltafawook_metrics_db_up 0.0"
+
+    def test_cache_lines(self):
+        lines = _lines(metrics_service.CacheCollector())
+        assert any(line.startswith('eltafawook_cache_hits_total{cache="auth"}') for line in lines)
+
+    def test_pool_wait_histogram_in_seconds(self, monkeypatch):
+        monkeypatch.setattr(metrics_service.session, "pool_metrics", lambda: {"sync": {
+            "size": 5, "checkouts": 3, "checkout_timeouts": 1, "wait_ms_sum": 12.0,
+            "wait_ms_buckets": [(10, 2), (float("inf"), 3)],
+        }})
+        lines = _lines(metrics_service.PoolCollector())
+        assert 'eltafawook_db_pool_size{engine="sync"} 5.0' in lines
+        assert 'eltafawook_db_pool_checkout_timeouts_total{engine="sync"} 1.0' in lines
+        assert 'eltafawook_db_pool_checkout_wait_seconds_bucket{engine="sync",le="0.01"} 2.0' in lines
+        assert 'eltafawook_db_pool_checkout_wait_seconds_count{engine="sync"} 3.0' in lines
+
+    def test_replica_lines_only_with_a_replica(self, monkeypatch):
+        monkeypatch.setattr(metrics_service.session, "read_engine", None)
+        assert _lines(metrics_service.ReplicaCollector()) == []
+        monkeypatch.setattr(metrics_service.session, "read_engine", MagicMock())
+        monkeypatch.setattr(metrics_service.session.replica_gate, "stats", lambda: {
+            "healthy": False, "lag_seconds": 42.0, "max_lag_seconds": 10.0, "fallbacks": 3,
+        })
+        lines = _lines(metrics_service.ReplicaCollector())
+        assert "eltafawook_read_replica_healthy 0.0" in lines
+        assert "eltafawook_read_replica_lag_seconds 42.0" in lines
+        assert "eltafawook_read_replica_fallbacks_total 3.0" in lines
+
+
+class TestEndpoint:
+    def test_off_without_a_token(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "metrics_token", "")
+        assert client.get("/metrics").status_code == 404
+
+    def test_rejects_a_wrong_token(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "metrics_token", "s3cret")
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code == 401
+
+    def test_serves_with_the_token(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "metrics_token", "s3cret")
+        resp = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert "# TYPE eltafawook_http_request_duration_seconds histogram" in resp.text
@@ -0,0 +1,49 @@
+"""Unit tests for the notification outbox queue engine."""
+from datetime import timedelta
+from unittest.mock import patch
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.services.notify import queue
+
+
+class TestBackoff:
+    def test_doubles_and_caps(self):
+        with patch.object(queue.settings, "notify_backoff_seconds", 30), \
+             patch.object(queue.settings, "notify_backoff_max_seconds", 100):
+            assert queue.backoff_delay(1) == timedelta(seconds=30)
+            assert queue.backoff_delay(2) == timedelta(seconds=60)
+            assert queue.backoff_delay(3) == timedelta(seconds=100)
+
+
+class TestClaim:
+    def test_claims_due_rows_with_skip_locked(self, mock_db):
+        mock_db.execute.return_value.all.return_value = []
+        queue.claim(mock_db, channel="wa_web", limit=5)
+        sql = str(mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "next_attempt_at <= now()" in sql
+        mock_db.commit.assert_called_once()
+
+
+class TestAck:
+    def test_reschedules_failures_and_commits_once(self, mock_db):
+        ok, retry, dead = uuid4(), uuid4(), uuid4()
+        with patch.object(queue.settings, "notify_max_attempts", 3):
+            counts = queue.ack(mock_db, [
+                {"id": ok, "attempts": 1, "ok": True, "error": None},
+                {"id": retry, "attempts": 1, "ok": False, "error": "boom"},
+                {"id": dead, "attempts": 3, "ok": False, "error": "boom"},
+            ])
+        assert counts == {"sent": 1, "pending": 1, "failed": 1}
+        params = {p["id"]: p for c in mock_db.execute.call_args_list for p in c[0][1]}
+        assert params[retry]["state"] == "pending" and "next_attempt_at" in params[retry]
+        assert params[dead]["state"] == "failed" and "next_attempt_at" not in params[dead]
+        assert mock_db.execute.call_count == 3
+        mock_db.commit.assert_called_once()
+
+    def test_enqueue_many_single_insert(self, mock_db):
+        assert queue.enqueue_many(mock_db, [{"channel": "wa_web", "to": "1", "message": "m"}] * 3) == 3
+        assert mock_db.execute.call_count == 1
+        mock_db.commit.assert_not_called()
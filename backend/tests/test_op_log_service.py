@@ -0,0 +1,126 @@
+"""Unit tests for op_log claims and replay, and the LRU cache."""
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.app.core.cache import LRUCache
+from backend.app.services import op_log_service
+from backend.app.services.op_log_service import claim_op, get_replays, record_op, remember_op
+from backend.app.api.v1 import sync
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    op_log_service._replay_cache.clear()
+    yield
+    op_log_service._replay_cache.clear()
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        c = LRUCache(maxsize=2)
+        c.put("a", 1)
+        c.put("b", 2)
+        c.get("a")
+        c.put("c", 3)
+        assert "b" not in c
+        assert c.get("a") == 1
+        assert len(c) == 2
+
+
+class TestGetReplays:
+    def test_cache_hit_skips_database(self, mock_db):
+        op_id = uuid4()
+        remember_op(op_id, {"cancelled": True})
+        assert get_replays(mock_db, [op_id]) == {op_id: {"cancelled": True}}
+        mock_db.execute.assert_not_called()
+
+    def test_misses_loaded_in_one_query_and_cached(self, mock_db):
+        a, b = uuid4(), uuid4()
+        mock_db.execute.return_value.all.return_value = [(a, {"x": 1})]
+        assert get_replays(mock_db, [a, b]) == {a: {"x": 1}}
+        assert mock_db.execute.call_count == 1
+        assert get_replays(mock_db, [a]) == {a: {"x": 1}}
+        assert mock_db.execute.call_count == 1
+
+
+class TestRecordOp:
+    def test_upsert_never_overwrites_ok(self, mock_db):
+        stored = record_op(mock_db, op_id=uuid4(), op_type="reservation.cancel", request={"op": "x"}, response={"id": uuid4()})
+        assert isinstance(stored["id"], str)
+        sql = str(mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (id) DO UPDATE" in sql
+        assert "WHERE op_log.status !=" in sql
+
+
+class TestClaimOp:
+    def _claim(self, db):
+        return claim_op(db, op_id=uuid4(), op_type="reservation.cancel", request={"op": "x"})
+
+    def test_new_id_is_claimed_pending(self, mock_db):
+        mock_db.execute.return_value.scalar_one_or_none.return_value = uuid4()
+        assert self._claim(mock_db) is None
+        sql = str(mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (id) DO NOTHING RETURNING op_log.id" in sql
+        assert mock_db.execute.call_count == 1
+
+    def test_completed_id_returns_stored_response(self, mock_db):
+        mock_db.execute.return_value.scalar_one_or_none.return_value = None
+        mock_db.execute.return_value.one_or_none.return_value = MagicMock(status="ok", response={"cancelled": True})
+        assert self._claim(mock_db) == {"cancelled": True}
+        sql = str(mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "FOR UPDATE" in sql
+
+    def test_failed_id_is_taken_over(self, mock_db):
+        mock_db.execute.return_value.scalar_one_or_none.return_value = None
+        mock_db.execute.return_value.one_or_none.return_value = MagicMock(status="error", response=None)
+        assert self._claim(mock_db) is None
+
+
+@patch("backend.app.api.v1.sync.Session")
+class TestSequentialReplay:
+    def test_completed_op_is_not_re_executed(self, mock_session_cls, mock_db):
+        op_id = uuid4()
+        remember_op(op_id, {"cancelled": True})
+        handler = MagicMock()
+        with patch.dict(sync._OPS, {"reservation.cancel": handler}):
+            out = sync._run_sequential(mock_db, [{"id": str(op_id), "op": "reservation.cancel", "payload": {}}])
+        handler.assert_not_called()
+        assert out["results"][0]["replayed"] is True
+        assert out["results"][0]["result"] == {"cancelled": True}
+
+    def test_duplicate_id_in_batch_runs_once(self, mock_session_cls, mock_db):
+        op_id = str(uuid4())
+        mock_db.execute.return_value.all.return_value = []
+        handler = MagicMock(return_value={"cancelled": True})
+        entry = {"id": op_id, "op": "reservation.cancel", "payload": {}}
+        with patch.dict(sync._OPS, {"reservation.cancel": handler}):
+            out = sync._run_sequential(mock_db, [entry, dict(entry)])
+        assert handler.call_count == 1
+        assert out["results"][1]["replayed"] is True
+
+    def test_op_claimed_by_a_concurrent_retry_is_replayed(self, mock_session_cls, mock_db):
+        mock_db.execute.return_value.all.return_value = []
+        handler = MagicMock()
+        entry = {"id": str(uuid4()), "op": "reservation.cancel", "payload": {}}
+        with patch.dict(sync._OPS, {"reservation.cancel": handler}), \
+                patch.object(sync, "claim_op", return_value={"cancelled": True}):
+            out = sync._run_sequential(mock_db, [entry])
+        handler.assert_not_called()
+        assert out["results"][0] == sync._replayed(entry, {"cancelled": True})
+
+    def test_effects_and_outcome_commit_together(self, mock_session_cls, mock_db):
+        mock_db.execute.return_value.all.return_value = []
+        calls = []
+        mock_db.commit.side_effect = lambda: calls.append("commit")
+        handler = MagicMock(side_effect=lambda db, payload: calls.append("handler") or {"cancelled": True})
+        entry = {"id": str(uuid4()), "op": "reservation.cancel", "payload": {}}
+        with patch.dict(sync._OPS, {"reservation.cancel": handler}), \
+                patch.object(sync, "claim_op", side_effect=lambda *a, **k: calls.append("claim")), \
+                patch.object(sync, "record_op", side_effect=lambda *a, **k: calls.append("record")):
+            sync._run_sequential(mock_db, [entry])
+        assert calls == ["claim", "handler", "record", "commit"]
+        # The handler runs on the savepoint session, not on the request's.
+        assert handler.call_args[0][0] is mock_session_cls.return_value
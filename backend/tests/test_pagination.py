@@ -0,0 +1,98 @@
+"""Unit tests for keyset pagination (schemas/pagination)."""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+import sqlalchemy as sa
+from fastapi import HTTPException
+from sqlalchemy.engine import create_engine
+from sqlalchemy.orm import Session
+
+from backend.app.schemas.pagination import decode_cursor, encode_cursor, paginate
+
+
+def _pg(**kw):
+    base = dict(offset=0, limit=2, cursor=None, include_total=True, after=None)
+    base.update(kw)
+    if base["cursor"]:
+        base["after"] = decode_cursor(base["cursor"])
+    return SimpleNamespace(**base)
+
+
+@pytest.fixture
+def table_db():
+    """A small in-memory table: names with duplicates and NULL starts."""
+    engine = create_engine("sqlite://")  # not conftest's shared engine
+    md = sa.MetaData()
+    t = sa.Table("things", md, sa.Column("id", sa.Integer, primary_key=True),
+                 sa.Column("name", sa.Text), sa.Column("start", sa.Integer, nullable=True))
+    md.create_all(engine)
+    with engine.begin() as c:
+        c.execute(t.insert(), [
+            {"id": 1, "name": "b", "start": 5},
+            {"id": 2, "name": "a", "start": None},
+            {"id": 3, "name": "b", "start": 7},
+            {"id": 4, "name": "c", "start": None},
+            {"id": 5, "name": "a", "start": 5},
+        ])
+    with Session(engine) as s:
+        yield s, t
+
+
+def _walk(db, stmt, *order_by, **kw):
+    seen, cursor = [], None
+    while True:
+        rows, meta = paginate(db, stmt, _pg(cursor=cursor, **kw), *order_by)
+        seen.extend(r.id for r in rows)
+        if not meta["has_more"]:
+            return seen, meta
+        cursor = meta["next_cursor"]
+
+
+class TestCursorCodec:
+    def test_round_trip(self):
+        values = [True, None, "x", 3, uuid4(), datetime(2026, 10, 18, 9, 30, tzinfo=timezone.utc)]
+        assert decode_cursor(encode_cursor(values)) == values
+
+    def test_garbage_is_400(self):
+        with pytest.raises(HTTPException) as e:
+            decode_cursor("not-a-cursor")
+        assert e.value.status_code == 400
+
+
+class TestPaginate:
+    def test_cursor_pages_match_full_order(self, table_db):
+        db, t = table_db
+        stmt = sa.select(t.c.id)
+        seen, _ = _walk(db, stmt, t.c.name, t.c.id)
+        assert seen == [2, 5, 1, 3, 4]
+
+    def test_descending_with_nulls_first(self, table_db):
+        db, t = table_db
+        stmt = sa.select(t.c.id)
+        order = (t.c.start.is_(None).desc(), t.c.start.desc(), t.c.id.desc())
+        full = [r.id for r in db.execute(stmt.order_by(*order))]
+        seen, _ = _walk(db, stmt, *order)
+        assert seen == full == [4, 2, 3, 5, 1]
+
+    def test_offset_mode_and_total(self, table_db):
+        db, t = table_db
+        rows, meta = paginate(db, sa.select(t.c.id), _pg(offset=4), t.c.id)
+        assert [r.id for r in rows] == [5]
+        assert meta["total"] == 5
+        assert meta["has_more"] is False
+        assert meta["next_cursor"] is None
+
+    def test_without_total_skips_count(self, mock_db):
+        mock_db.execute.return_value.all.return_value = []
+        t = sa.table("things", sa.column("id"))
+        _, meta = paginate(mock_db, sa.select(t.c.id), _pg(include_total=False), t.c.id)
+        assert meta["total"] is None
+        assert mock_db.execute.call_count == 1
+
+    def test_cursor_for_other_listing_is_400(self, table_db):
+        db, t = table_db
+        with pytest.raises(HTTPException) as e:
+            paginate(db, sa.select(t.c.id), _pg(cursor=encode_cursor(["a", 1])), t.c.id)
+        assert e.value.status_code == 400
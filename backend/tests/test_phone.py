@@ -0,0 +1,63 @@
+"""Unit tests for canonical phone keys, phone lookups and the phone-key backfill."""
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.app.models.student import Student
+from backend.app.utils.phone import normalize_eg_phone, phone_key, phone_match
+from backend.app.workers.jobs.backfill_phone_keys import _backfill_batch_stmt, run
+
+
+def _sql(expr):
+    return str(expr.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.parametrize("raw", ["+201012345678", "01012345678", "010 1234 5678", "0020-10-1234-5678", "1012345678"])
+def test_every_spelling_has_the_same_key(raw):
+    assert phone_key(raw) == "1012345678"
+
+
+def test_key_matches_validated_e164():
+    assert phone_key(normalize_eg_phone("01012345678")) == phone_key("01012345678")
+
+
+@pytest.mark.parametrize("raw", [None, "", "n/a"])
+def test_no_digits_no_key(raw):
+    assert phone_key(raw) is None
+
+
+def test_full_number_is_exact_match():
+    assert _sql(phone_match(Student.phone_norm, "0101-234-5678")) == "students.phone_norm = '1012345678'"
+
+
+def test_partial_number_is_reversed_prefix():
+    assert _sql(phone_match(Student.parent_phone_norm, "5678")) == "reverse(students.parent_phone_norm) LIKE '8765%%'"
+
+
+def test_no_digits_matches_nothing():
+    assert _sql(phone_match(Student.phone_norm, "abc")) == "false"
+
+
+def test_backfill_statement_skips_canonical_rows():
+    sql = str(_backfill_batch_stmt(uuid4(), 100).compile(dialect=postgresql.dialect()))
+    assert "UPDATE students SET phone_norm=nullif(right(regexp_replace(students.phone" in sql
+    assert "IS DISTINCT FROM" in sql
+    assert "updated_at=students.updated_at" in sql
+    assert "students.id > " in sql
+
+
+def test_backfill_walks_batches_until_short(mock_db):
+    a, b = uuid4(), uuid4()
+    mock_db.execute.return_value.one.side_effect = [
+        SimpleNamespace(last_id=a, scanned=2, fixed=1),
+        SimpleNamespace(last_id=b, scanned=1, fixed=0),
+    ]
+    assert run(mock_db, batch_size=2) == {"scanned": 3, "fixed": 1, "batches": 2}
+    assert mock_db.commit.call_count == 2
+
+
+def test_backfill_empty_table(mock_db):
+    mock_db.execute.return_value.one.return_value = SimpleNamespace(last_id=None, scanned=0, fixed=0)
+    assert run(mock_db) == {"scanned": 0, "fixed": 0, "batches": 0}
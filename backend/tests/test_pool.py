@@ -0,0 +1,75 @@
+"""Instrumented pool: checkout-wait histogram, timeouts and engine options."""
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from backend.app.core.config import settings
+from backend.app.db import session
+from backend.app.db.pool import CheckoutMetrics, InstrumentedQueuePool, pool_stats
+
+
+def _pool(**kw):
+    return InstrumentedQueuePool(lambda: sqlite3.connect(":memory:"), **kw)
+
+
+class TestCheckoutMetrics:
+    def test_histogram_is_cumulative(self):
+        m = CheckoutMetrics(buckets_ms=(1, 10))
+        for ms in (0.2, 5, 5, 50):
+            m.observe(ms)
+        snap = m.snapshot()
+        assert snap["checkouts"] == 4
+        assert snap["wait_ms_max"] == 50
+        assert snap["wait_ms_sum"] == pytest.approx(60.2)
+        assert snap["wait_ms_buckets"] == [(1, 1), (10, 3), (float("inf"), 4)]
+
+    def test_bucket_bound_is_inclusive(self):
+        m = CheckoutMetrics(buckets_ms=(1, 10))
+        m.observe(1)
+        assert m.snapshot()["wait_ms_buckets"][0] == (1, 1)
+
+
+class TestInstrumentedQueuePool:
+    def test_counts_checkouts_and_occupancy(self):
+        pool = _pool(pool_size=2, max_overflow=1)
+        a, b, c = pool.connect(), pool.connect(), pool.connect()
+        stats = pool_stats(pool)
+        assert stats["checked_out"] == 3
+        assert stats["overflow"] == 1
+        assert stats["checkouts"] == 3
+        for conn in (a, b, c):
+            conn.close()
+        assert pool_stats(pool)["checked_out"] == 0
+
+    def test_counts_timeouts(self):
+        pool = _pool(pool_size=1, max_overflow=0, timeout=0.01)
+        held = pool.connect()
+        with pytest.raises(PoolTimeoutError):
+            pool.connect()
+        stats = pool_stats(pool)
+        assert stats["checkout_timeouts"] == 1
+        assert stats["wait_ms_max"] >= 10
+        held.close()
+
+    def test_recreate_keeps_metrics(self):
+        pool = _pool(pool_size=1, max_overflow=0)
+        pool.connect().close()
+        assert pool.recreate().metrics is pool.metrics
+
+
+class TestEngineOptions:
+    def test_defaults_keep_prepared_statements(self):
+        opts = session.engine_options(5, 5)
+        assert opts["pool_size"] == 5 and opts["max_overflow"] == 5
+        assert "prepare_threshold" not in opts["connect_args"]
+
+    def test_pgbouncer_mode_disables_prepared_statements(self, monkeypatch):
+        monkeypatch.setattr(settings, "db_pgbouncer", True)
+        assert session.engine_options(5, 5)["connect_args"]["prepare_threshold"] is None
+
+
+def test_healthz_keeps_pool_internals_private(client):
+    resp = client.get("/healthz")
+    assert resp.status_code == 200
+    assert "db_pool" not in resp.json()
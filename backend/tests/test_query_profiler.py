@@ -0,0 +1,67 @@
+"""Per-request SQL profiler: fingerprints, counting and the middleware headers."""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from backend.app.core import query_profiler
+from backend.app.core.logging_config import RequestLoggingMiddleware
+from backend.app.core.query_profiler import fingerprint
+from backend.app.db import session
+
+
+class TestFingerprint:
+    def test_folds_parameters_and_literals(self):
+        a = fingerprint("SELECT * FROM reservations WHERE id = %(id_1)s AND qty > 3")
+        b = fingerprint("SELECT *\n  FROM reservations WHERE id = %(id_2)s AND qty > 7")
+        assert a == b == "SELECT * FROM reservations WHERE id = ? AND qty > ?"
+
+    def test_folds_in_lists_of_any_length(self):
+        assert fingerprint("x IN (%(p_1)s, %(p_2)s)") == fingerprint("x IN (%(p_1)s, %(p_2)s, %(p_3)s)")
+
+    def test_folds_string_literals(self):
+        assert fingerprint("WHERE name = 'it''s'") == "WHERE name = ?"
+
+
+class TestProfile:
+    def test_counts_only_inside_a_profile(self):
+        query_profiler.install()
+        with session.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            token = query_profiler.start()
+            for n in range(3):
+                conn.execute(text("SELECT :n"), {"n": n})
+            conn.execute(text("SELECT 2, 3"))
+            profile = query_profiler.stop(token)
+            conn.execute(text("SELECT 1"))
+        assert profile.count == 4
+        assert profile.summary()["distinct_queries"] == 2
+        assert profile.slowest_sql is not None
+        assert [(r["sql"], r["count"]) for r in profile.repeated(3)] == [("SELECT ?", 3)]
+        assert profile.repeated(4) == []
+
+
+def _app(profile_queries: bool) -> FastAPI:
+    query_profiler.install()
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware, profile_queries=profile_queries, repeat_threshold=2)
+
+    @app.get("/rows")
+    def rows():
+        with session.engine.connect() as conn:
+            for n in range(3):
+                conn.execute(text("SELECT :n"), {"n": n})
+        return {"ok": True}
+
+    return app
+
+
+def test_middleware_sets_db_headers():
+    resp = TestClient(_app(profile_queries=True)).get("/rows")
+    assert resp.headers["X-DB-Queries"] == "3"
+    assert float(resp.headers["X-DB-Time"]) >= 0
+
+
+def test_middleware_without_profiling_sets_no_db_headers():
+    resp = TestClient(_app(profile_queries=False)).get("/rows")
+    assert "X-DB-Queries" not in resp.headers
+    assert "X-Request-ID" in resp.headers
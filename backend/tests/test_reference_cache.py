@@ -0,0 +1,82 @@
+"""Unit tests for the versioned reference-data cache, using mocked DB."""
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from backend.app.core.cache import TTLCache
+from backend.app.services import reference_cache as rc
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache(monkeypatch):
+    monkeypatch.setattr(rc, "_cache", TTLCache(ttl=60, maxsize=64))
+    monkeypatch.setattr(rc, "_versions", {k: 0 for k in rc.KINDS})
+
+
+def _branch_row(code="QAL"):
+    return SimpleNamespace(id=uuid4(), code=code, name="Qaliub")
+
+
+def test_second_lookup_is_served_from_cache(mock_db):
+    row = _branch_row()
+    mock_db.execute.return_value.first.return_value = row
+    first = rc.branch_by_code(mock_db, "QAL")
+    second = rc.branch_by_code(mock_db, "QAL")
+    assert first == second == rc.BranchRef(id=row.id, code="QAL", name="Qaliub")
+    assert mock_db.execute.call_count == 1
+
+
+def test_missing_rows_are_not_cached(mock_db):
+    mock_db.execute.return_value.first.return_value = None
+    assert rc.branch_by_code(mock_db, "NOPE") is None
+    assert rc.branch_by_code(mock_db, "NOPE") is None
+    assert mock_db.execute.call_count == 2
+
+
+def test_item_snapshot_carries_price(mock_db):
+    item_id = uuid4()
+    mock_db.execute.return_value.first.return_value = SimpleNamespace(
+        id=item_id, sku="PHY1", name="Physics", teacher_id=None, default_price_cents=12000,
+    )
+    assert rc.item(mock_db, item_id).default_price_cents == 12000
+
+
+def test_commit_after_invalidate_bumps_version(mock_db):
+    mock_db.execute.return_value.first.return_value = _branch_row()
+    rc.branch_by_code(mock_db, "QAL")
+
+    session = SimpleNamespace(info={})
+    rc.invalidate(session, rc.BRANCHES)
+    assert rc._versions[rc.BRANCHES] == 0  # nothing until commit
+    rc._bump_on_commit(session)
+
+    rc.branch_by_code(mock_db, "QAL")
+    assert mock_db.execute.call_count == 2
+    assert rc._versions == {rc.BRANCHES: 1, rc.ITEMS: 0, rc.SCHOOLS: 0}
+
+
+def test_rollback_forgets_invalidation():
+    session = SimpleNamespace(info={})
+    rc.invalidate(session, rc.ITEMS)
+    rc._forget_on_rollback(session)
+    rc._bump_on_commit(session)
+    assert rc._versions[rc.ITEMS] == 0
+
+
+def test_load_racing_a_bump_is_not_reused(mock_db):
+    def load_then_bump():
+        rc.bump(rc.SCHOOLS)
+        return uuid4()
+
+    rc._cached(rc.SCHOOLS, "x", load_then_bump)
+    loaded_again = []
+    rc._cached(rc.SCHOOLS, "x", lambda: loaded_again.append(1) or uuid4())
+    assert loaded_again == [1]
+
+
+def test_notifications_bump_named_kinds_only():
+    rc.handle_payloads({"refdata:items", "reservation:hold", "outbox"})
+    assert rc._versions == {rc.BRANCHES: 0, rc.ITEMS: 1, rc.SCHOOLS: 0}
+    rc.handle_payloads({"refdata:teachers"})
+    assert rc._versions[rc.ITEMS] == 1
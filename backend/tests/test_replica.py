@@ -0,0 +1,72 @@
+"""Read-replica routing: lag gate and fallback to the primary."""
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from backend.app.db import session
+from backend.app.db.replica import ReplicaGate
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _replica_db(lag):
+    db = MagicMock()
+    db.execute.return_value.scalar.return_value = lag
+    return db
+
+
+class TestReplicaGate:
+    def test_fresh_replica_is_used(self):
+        gate = ReplicaGate(max_lag_seconds=10, check_interval_seconds=5, clock=_Clock())
+        assert gate.check(_replica_db(2.5)) is True
+        assert gate.lag_seconds == 2.5
+
+    def test_lagging_replica_is_refused(self):
+        gate = ReplicaGate(max_lag_seconds=10, check_interval_seconds=5, clock=_Clock())
+        assert gate.check(_replica_db(30)) is False
+        assert gate.stats()["fallbacks"] == 1
+
+    def test_measures_once_per_interval(self):
+        clock = _Clock()
+        gate = ReplicaGate(max_lag_seconds=10, check_interval_seconds=5, clock=clock)
+        gate.check(_replica_db(1))
+        lagging = _replica_db(30)
+        assert gate.check(lagging) is True  # last verdict reused
+        lagging.execute.assert_not_called()
+        clock.now += 5
+        assert gate.check(lagging) is False
+
+    def test_unreachable_replica_is_refused(self):
+        gate = ReplicaGate(max_lag_seconds=10, check_interval_seconds=5, clock=_Clock())
+        db = MagicMock()
+        db.execute.side_effect = OperationalError("SELECT", {}, Exception("down"))
+        assert gate.check(db) is False
+        assert gate.lag_seconds is None
+        db.rollback.assert_called_once()
+
+
+class TestReadSession:
+    def test_without_replica_uses_primary(self, monkeypatch):
+        primary = MagicMock()
+        monkeypatch.setattr(session, "read_engine", None)
+        monkeypatch.setattr(session, "SessionLocal", MagicMock(return_value=primary))
+        with session.read_session() as db:
+            assert db is primary.__enter__.return_value
+
+    @pytest.mark.parametrize("fresh", [True, False])
+    def test_replica_used_only_when_gate_allows(self, monkeypatch, fresh):
+        replica, primary = MagicMock(), MagicMock()
+        monkeypatch.setattr(session, "read_engine", MagicMock())
+        monkeypatch.setattr(session, "ReadSessionLocal", MagicMock(return_value=replica))
+        monkeypatch.setattr(session, "SessionLocal", MagicMock(return_value=primary))
+        monkeypatch.setattr(session.replica_gate, "check", MagicMock(return_value=fresh))
+        with session.read_session() as db:
+            assert db is (replica if fresh else primary.__enter__.return_value)
+        replica.close.assert_called_once()
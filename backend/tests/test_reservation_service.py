@@ -6,6 +6,8 @@ from collections import namedtuple
 
 from backend.app.services.reservation_service import (
     cancel_reservation,
+    cancel_reservations_bulk,
+    fulfill_reservations_bulk,
     prepay_reservation,
     _now_utc,
 )
@@ -88,3 +90,79 @@ class TestNowUtc:
     def test_returns_utc(self):
         now = _now_utc()
         assert now.tzinfo is not None
+
+
+class TestCancelReservationsBulk:
+    Row = namedtuple("Row", ["id", "branch_id", "item_id", "qty", "status"])
+
+    def test_missing_raises_before_writing(self, mock_db):
+        mock_db.execute.return_value.all.return_value = []
+        with pytest.raises(ValueError, match="Reservation not found"):
+            cancel_reservations_bulk(mock_db, reservation_ids=[RES_ID])
+        assert mock_db.execute.call_count == 1
+
+    @patch("backend.app.services.reservation_service.post_ledger")
+    def test_releases_only_held_rows(self, mock_post, mock_db):
+        queued, held, done = uuid4(), uuid4(), uuid4()
+        mock_db.execute.return_value.all.return_value = [
+            self.Row(queued, BRANCH, ITEM, 1, "queued"),
+            self.Row(held, BRANCH, ITEM, 2, "hold"),
+            self.Row(done, BRANCH, ITEM, 3, "fulfilled"),
+        ]
+        cancel_reservations_bulk(mock_db, reservation_ids=[queued, held, done])
+        rows = mock_post.call_args[0][1]
+        assert [(r["ref_id"], r["qty"]) for r in rows] == [(held, 2)]
+        mock_db.commit.assert_not_called()
+
+
+class TestFulfillReservationsBulk:
+    Row = namedtuple("Row", ["id", "branch_id", "item_id", "qty", "status", "unit_price_cents", "payment_method"])
+    Bal = namedtuple("Bal", ["branch_id", "item_id", "on_hand"])
+
+    def _results(self, mock_db, rows, balances, sale_ids=()):
+        locked = MagicMock()
+        locked.all.return_value = rows
+        bal = MagicMock()
+        bal.all.return_value = balances
+        sales = MagicMock()
+        sales.all.return_value = list(sale_ids)
+        mock_db.execute.side_effect = [locked, MagicMock(), bal, MagicMock(), MagicMock(), sales]
+
+    def test_not_active_raises(self, mock_db):
+        self._results(mock_db, [self.Row(RES_ID, BRANCH, ITEM, 1, "hold", 100, "cash")], [])
+        with pytest.raises(ValueError, match="Cannot fulfill"):
+            fulfill_reservations_bulk(mock_db, reservation_ids=[RES_ID])
+
+    def test_combined_qty_checked_against_on_hand(self, mock_db):
+        a, b = uuid4(), uuid4()
+        self._results(
+            mock_db,
+            [self.Row(a, BRANCH, ITEM, 2, "active", 100, "cash"), self.Row(b, BRANCH, ITEM, 2, "active", 100, "cash")],
+            [self.Bal(BRANCH, ITEM, 3)],
+        )
+        with pytest.raises(ValueError, match="Not enough on-hand"):
+            fulfill_reservations_bulk(mock_db, reservation_ids=[a, b])
+
+    @patch("backend.app.services.reservation_service.post_ledger")
+    def test_success_posts_once_and_inserts_sales(self, mock_post, mock_db):
+        a, b = uuid4(), uuid4()
+        sale_a, sale_b = uuid4(), uuid4()
+        rows = [self.Row(a, BRANCH, ITEM, 1, "active", 150, None), self.Row(b, BRANCH, ITEM, 2, "active", 100, "instapay")]
+        locked = MagicMock()
+        locked.all.return_value = rows
+        bal = MagicMock()
+        bal.all.return_value = [self.Bal(BRANCH, ITEM, 5)]
+        sales = MagicMock()
+        sales.all.return_value = [(a, sale_a), (b, sale_b)]
+        mock_db.execute.side_effect = [locked, MagicMock(), bal, MagicMock(), sales]
+
+        out = fulfill_reservations_bulk(mock_db, reservation_ids=[a, b])
+        assert mock_post.call_count == 1
+        assert len(mock_post.call_args[0][1]) == 4
+        assert [o["sale_id"] for o in out] == [str(sale_a), str(sale_b)]
+        assert out[1]["total_cents"] == 200
+        mock_db.commit.assert_not_called()
+
+    def test_duplicate_ids_rejected(self, mock_db):
+        with pytest.raises(ValueError, match="Duplicate"):
+            fulfill_reservations_bulk(mock_db, reservation_ids=[RES_ID, RES_ID])
@@ -0,0 +1,101 @@
+"""Unit tests for sales_rollup_service using mocked DB."""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.models.sale import Sale
+from backend.app.services.sales_rollup_service import (
+    delete_sales,
+    post_kg_sales,
+    post_sales,
+    rebuild_rollup,
+)
+
+
+BRANCH = uuid4()
+ITEM = uuid4()
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _params(stmt) -> dict:
+    return stmt.compile(dialect=postgresql.dialect()).params
+
+
+def _sale(**kw):
+    row = dict(branch_id=BRANCH, item_id=ITEM, reservation_id=uuid4(), qty=2, unit_price_cents=150,
+               total_cents=300, sold_at=datetime.now(timezone.utc), payment_method="cash")
+    row.update(kw)
+    return row
+
+
+class TestPostSales:
+    def test_empty_rows_is_noop(self, mock_db):
+        assert post_sales(mock_db, []) == []
+        mock_db.execute.assert_not_called()
+
+    def test_single_statement_for_sales_and_rollup(self, mock_db):
+        post_sales(mock_db, [_sale(), _sale(payment_method="instapay")])
+        assert mock_db.execute.call_count == 1
+        sql = _sql(mock_db.execute.call_args[0][0])
+        assert sql.startswith("WITH sale_rows AS")
+        assert "INSERT INTO sales " in sql
+        assert "INSERT INTO sales_daily_rollup" in sql
+        assert "ON CONFLICT (branch_id, day, context, item_id, payment_method) DO UPDATE" in sql
+        assert "GROUP BY" in sql
+
+    def test_returns_reservation_and_sale_ids(self, mock_db):
+        rid, sid = uuid4(), uuid4()
+        mock_db.execute.return_value.all.return_value = [(rid, sid)]
+        assert dict(post_sales(mock_db, [_sale(reservation_id=rid)])) == {rid: sid}
+
+
+class TestDeleteSales:
+    def test_subtracts_from_rollup_in_same_statement(self, mock_db):
+        gone = uuid4()
+        mock_db.execute.return_value.all.return_value = [SimpleNamespace(id=gone, branch_id=BRANCH)]
+        assert delete_sales(mock_db, Sale.reservation_id == uuid4()) == [gone]
+        stmt = mock_db.execute.call_args[0][0]
+        sql = _sql(stmt)
+        assert "DELETE FROM sales" in sql
+        assert "INSERT INTO sales_daily_rollup" in sql
+        assert -1 in _params(stmt).values()
+
+
+class TestPostKgSales:
+    def test_kindergarten_context_without_payment_method(self, mock_db):
+        post_kg_sales(mock_db, [dict(branch_id=BRANCH, kg_student_id=uuid4(), kg_item_id=ITEM,
+                                     qty=1, unit_price_cents=500, total_cents=500)])
+        stmt = mock_db.execute.call_args[0][0]
+        sql = _sql(stmt)
+        assert "INSERT INTO kg_sales" in sql
+        assert "INSERT INTO sales_daily_rollup" in sql
+        params = _params(stmt).values()
+        assert "kindergarten" in params
+        assert "unspecified" in params
+
+
+class TestRebuildRollup:
+    def test_dry_run_reports_drift_without_writing(self, mock_db):
+        drift_row = {
+            "branch_id": BRANCH, "day": datetime(2026, 10, 1).date(), "context": "bookstore",
+            "item_id": ITEM, "payment_method": "cash",
+            "stored_count": 1, "expected_count": 2,
+            "stored_total_cents": 100, "expected_total_cents": 250,
+        }
+        mock_db.execute.return_value.mappings.return_value.all.return_value = [drift_row]
+        result = rebuild_rollup(mock_db, apply=False)
+        assert result["applied"] is False
+        assert result["drifted"] == 1
+        assert result["keys"][0]["expected_total_cents"] == 250
+        assert mock_db.execute.call_count == 2
+
+    def test_apply_replaces_rows(self, mock_db):
+        mock_db.execute.return_value.mappings.return_value.all.return_value = []
+        result = rebuild_rollup(mock_db, apply=True)
+        assert result == {"applied": True, "drifted": 0, "keys": []}
+        assert mock_db.execute.call_count == 4
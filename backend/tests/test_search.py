@@ -0,0 +1,80 @@
+"""Unit tests for Arabic-aware name normalization and trigram matching (utils/search)."""
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from backend.app.db.migrations.versions import c7d2e9f41a68_student_name_search as migration
+from backend.app.models.student import Student
+from backend.app.schemas.pagination import decode_cursor, encode_cursor
+from backend.app.utils.search import name_match, name_rank, name_search_sql, normalize_name
+
+
+def _sql(expr):
+    return str(expr.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("أحمد", "احمد"),
+    ("إسلام", "اسلام"),
+    ("آمال", "امال"),
+    ("مُحَمَّد", "محمد"),        # harakat and shadda
+    ("محـــمد", "محمد"),         # tatweel
+    ("مصطفى", "مصطفي"),          # alef maqsura
+    ("فاطمة", "فاطمه"),          # taa marbuta
+    ("مؤمن", "مومن"),
+    ("  Mohamed   ALY ", "mohamed aly"),
+    ("", ""),
+    (None, ""),
+])
+def test_normalize_name(raw, expected):
+    assert normalize_name(raw) == expected
+
+
+def test_spelling_variants_normalize_alike():
+    assert normalize_name("أَسْمَاءُ فاطِمة") == normalize_name("اسماء فاطمه")
+
+
+def test_sql_normalizer_mirrors_python():
+    sql = name_search_sql("full_name")
+    assert "regexp_replace(full_name, '[\\u064B-\\u065F\\u0670\\u0640]', '', 'g')" in sql
+    assert "'أإآٱىةؤئ', 'اااايهوي'" in sql
+    for variant, base in zip("أإآٱىةؤئ", "اااايهوي"):
+        assert normalize_name(variant) == base
+
+
+def test_migration_snapshot_matches_model():
+    assert migration.NAME_SEARCH_SQL == name_search_sql("full_name")
+    assert Student.__table__.c.name_search.computed.sqltext.text == migration.NAME_SEARCH_SQL
+
+
+def test_name_match_uses_like_and_word_similarity_on_normalized_query():
+    sql = _sql(name_match(Student.name_search, "أحمد"))
+    assert "students.name_search LIKE '%%احمد%%'" in sql
+    assert "students.name_search %%> 'احمد'" in sql
+
+
+def test_name_match_escapes_like_wildcards():
+    compiled = name_match(Student.name_search, "50%_a").compile(dialect=postgresql.dialect())
+    assert "%50\\%\\_a%" in compiled.params.values()
+    assert "ESCAPE" in str(compiled)
+
+
+def test_name_match_blank_query_is_none():
+    assert name_match(Student.name_search, "  ـ  ") is None
+
+
+def test_name_rank_is_word_similarity_as_double():
+    rank = name_rank(Student.name_search, "فاطمة")
+    assert isinstance(rank.type, sa.Double)
+    assert _sql(rank) == "word_similarity('فاطمه', students.name_search)"
+
+
+def test_float_rank_survives_cursor_round_trip():
+    values = [0.800000011920929, "Ahmed", 3]
+    assert decode_cursor(encode_cursor(values)) == values
+
+
+def test_trigram_index_declared():
+    ix = {i.name: i for i in Student.__table__.indexes}["ix_students_name_search_trgm"]
+    assert ix.dialect_options["postgresql"]["using"] == "gin"
+    assert ix.dialect_options["postgresql"]["ops"] == {"name_search": "gin_trgm_ops"}
@@ -0,0 +1,62 @@
+"""Unit tests for stock_balance_service using mocked DB."""
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.services.stock_balance_service import (
+    post_ledger,
+    post_ledger_event,
+    rebuild_balances,
+)
+
+
+BRANCH = uuid4()
+ITEM = uuid4()
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestPostLedger:
+    def test_empty_rows_is_noop(self, mock_db):
+        post_ledger(mock_db, [])
+        mock_db.execute.assert_not_called()
+
+    def test_single_statement_for_ledger_and_balance(self, mock_db):
+        post_ledger(mock_db, [
+            dict(branch_id=BRANCH, item_id=ITEM, event="transfer_out", qty=-2, ref_type="transfer", ref_id=None),
+            dict(branch_id=uuid4(), item_id=ITEM, event="transfer_in", qty=2, ref_type="transfer", ref_id=None),
+        ])
+        assert mock_db.execute.call_count == 1
+        sql = _sql(mock_db.execute.call_args[0][0])
+        assert sql.startswith("WITH ledger_rows AS")
+        assert "INSERT INTO stock_ledger" in sql
+        assert "INSERT INTO stock_balance" in sql
+        assert "ON CONFLICT (branch_id, item_id) DO UPDATE" in sql
+
+    def test_does_not_consume_result(self, mock_db):
+        post_ledger_event(mock_db, branch_id=BRANCH, item_id=ITEM, event="receive", qty=5)
+        mock_db.execute.return_value.scalar_one.assert_not_called()
+
+
+class TestRebuildBalances:
+    def test_dry_run_reports_drift_without_writing(self, mock_db):
+        drift_row = {
+            "branch_id": BRANCH, "item_id": ITEM,
+            "stored_on_hand": 3, "expected_on_hand": 5,
+            "stored_reserved": 0, "expected_reserved": 0,
+        }
+        mock_db.execute.return_value.mappings.return_value.all.return_value = [drift_row]
+        result = rebuild_balances(mock_db, apply=False)
+        assert result["applied"] is False
+        assert result["drifted"] == 1
+        assert result["pairs"][0]["expected_on_hand"] == 5
+        assert mock_db.execute.call_count == 2
+
+    def test_apply_writes_corrections(self, mock_db):
+        mock_db.execute.return_value.mappings.return_value.all.return_value = []
+        result = rebuild_balances(mock_db, apply=True)
+        assert result["applied"] is True
+        assert result["drifted"] == 0
+        assert mock_db.execute.call_count == 4
@@ -0,0 +1,67 @@
+"""Unit tests for /sync/batch atomic mode using mocked DB."""
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from backend.app.api.v1 import sync
+
+
+BRANCH = uuid4()
+ITEM = uuid4()
+
+
+def _op(op, **payload):
+    return {"id": str(uuid4()), "op": op, "payload": {k: str(v) for k, v in payload.items()}}
+
+
+class TestRunAtomic:
+    @patch("backend.app.api.v1.sync.get_pair_summaries", return_value=[{"on_hand": 1}])
+    @patch("backend.app.api.v1.sync.lock_pairs")
+    @patch("backend.app.api.v1.sync.Session")
+    def test_consecutive_fulfills_use_bulk_path(self, mock_session_cls, mock_lock, mock_summaries, mock_db):
+        ops_db = mock_session_cls.return_value
+        ops_db.execute.return_value.all.return_value = []
+        ops = [_op("reservation.fulfill", reservation_id=uuid4()) for _ in range(3)]
+        bulk = MagicMock(return_value=[{"sale_id": str(n)} for n in range(3)])
+        with patch.dict(sync._BULK_OPS, {"reservation.fulfill": bulk}):
+            out = sync._run_atomic(mock_db, ops)
+
+        bulk.assert_called_once()
+        assert [r["ok"] for r in out["results"]] == [True, True, True]
+        assert out["inventory"] == [{"on_hand": 1}]
+        mock_lock.assert_called_once()
+        mock_db.commit.assert_called_once()
+
+    @patch("backend.app.api.v1.sync.get_pair_summaries", return_value=[])
+    @patch("backend.app.api.v1.sync.lock_pairs")
+    @patch("backend.app.api.v1.sync.Session")
+    def test_failed_bulk_falls_back_per_op(self, mock_session_cls, mock_lock, mock_summaries, mock_db):
+        ops_db = mock_session_cls.return_value
+        ops = [_op("reservation.cancel", reservation_id=uuid4()) for _ in range(2)]
+        bulk = MagicMock(side_effect=ValueError("Reservation not found"))
+        single = MagicMock(side_effect=[{"cancelled": True}, ValueError("Reservation not found")])
+        with patch.dict(sync._BULK_OPS, {"reservation.cancel": bulk}), patch.dict(sync._OPS, {"reservation.cancel": single}):
+            out = sync._run_atomic(mock_db, ops)
+
+        assert [r["ok"] for r in out["results"]] == [True, False]
+        assert out["results"][1]["error"] == "Reservation not found"
+        assert single.call_count == 2
+        # bulk attempt + failing op each roll back to their savepoint
+        assert ops_db.rollback.call_count == 2
+
+    @patch("backend.app.api.v1.sync.get_pair_summaries", return_value=[])
+    @patch("backend.app.api.v1.sync.lock_pairs")
+    @patch("backend.app.api.v1.sync.Session")
+    def test_unknown_op_reported(self, mock_session_cls, mock_lock, mock_summaries, mock_db):
+        out = sync._run_atomic(mock_db, [{"id": "x", "op": "nope", "payload": {}}])
+        assert out["results"][0]["error"] == "unknown op: nope"
+
+
+class TestTouchedPairs:
+    def test_payload_pairs_sorted_and_deduplicated(self, mock_db):
+        ops = [
+            _op("reservation.create", branch_id=BRANCH, item_id=ITEM),
+            _op("reservation.create", branch_id=BRANCH, item_id=ITEM),
+            {"id": "bad", "op": "reservation.create", "payload": {"branch_id": "nope", "item_id": "x"}},
+        ]
+        assert sync._touched_pairs(mock_db, ops) == [(BRANCH, ITEM)]
+        mock_db.execute.assert_not_called()
@@ -0,0 +1,96 @@
+"""Unit tests for LISTEN/NOTIFY worker wakeups."""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import psycopg
+
+from backend.app.db import events
+from backend.app.workers.jobs.expire_reservations import next_expiry_in
+from backend.app.workers.loop import _is_wakeup
+from backend.app.workers.scheduler import _wake
+
+
+class _FakeConn:
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.calls = []
+
+    def notifies(self, *, timeout=None, stop_after=None):
+        self.calls.append((timeout, stop_after))
+        batch = self.batches.pop(0) if self.batches else []
+        return iter(SimpleNamespace(payload=p) for p in batch)
+
+
+class TestWait:
+    def test_collects_burst_payloads(self):
+        conn = _FakeConn(["outbox"], ["reservation:active", "outbox"])
+        assert events.wait(conn, 30) == {"outbox", "reservation:active"}
+        assert conn.calls[0] == (30, 1)
+
+    def test_timeout_returns_empty_without_coalescing(self):
+        conn = _FakeConn([])
+        assert events.wait(conn, 5) == set()
+        assert len(conn.calls) == 1
+
+    def test_non_positive_timeout_does_not_block(self):
+        conn = _FakeConn(["outbox"])
+        assert events.wait(conn, 0) == set()
+        assert conn.calls == []
+
+
+class _DroppedConn(_FakeConn):
+    def notifies(self, *, timeout=None, stop_after=None):
+        raise psycopg.OperationalError("server closed the connection unexpectedly")
+
+    def close(self):
+        self.closed = True
+
+
+class TestListener:
+    def test_reconnects_after_the_connection_drops(self, monkeypatch):
+        dropped, fresh = _DroppedConn(), _FakeConn(["outbox"])
+        conns = [dropped, fresh]
+        monkeypatch.setattr(events, "listen", lambda channel: conns.pop(0))
+        listener = events.Listener(retry_seconds=0)
+        # Notifications during the outage are lost: the caller rescans.
+        assert listener.wait(30) == set()
+        assert dropped.closed and listener.conn is fresh
+        assert listener.wait(30) == {"outbox"}
+
+    def test_falls_back_to_the_timer_while_unreachable(self, monkeypatch):
+        monkeypatch.setattr(events, "listen", MagicMock(side_effect=psycopg.OperationalError("refused")))
+        listener = events.Listener(retry_seconds=0.01)
+        assert not listener.connected
+        assert listener.wait(0.03) == set()
+        assert events.listen.call_count >= 2
+
+
+class TestWakeups:
+    def test_own_expiry_echo_is_ignored(self):
+        assert _is_wakeup("reservation:cancelled")
+        assert not _is_wakeup("reservation:expired")
+        assert not _is_wakeup("outbox")
+
+    def test_wake_only_pulls_job_forward(self):
+        later = datetime.now(timezone.utc) + timedelta(minutes=10)
+        job = MagicMock(next_run_time=later)
+        sched = MagicMock()
+        sched.get_job.return_value = job
+        _wake(sched, "expire_reservations", 5)
+        assert job.modify.call_args.kwargs["next_run_time"] < later
+
+        job.reset_mock()
+        job.next_run_time = datetime.now(timezone.utc)
+        _wake(sched, "expire_reservations", 60)
+        job.modify.assert_not_called()
+
+
+class TestNextExpiryIn:
+    def test_none_without_open_reservations(self, mock_db):
+        mock_db.execute.return_value.scalar_one_or_none.return_value = None
+        assert next_expiry_in(mock_db) is None
+
+    def test_seconds_until_earliest_end(self, mock_db):
+        mock_db.execute.return_value.scalar_one_or_none.return_value = datetime.now(timezone.utc) + timedelta(seconds=90)
+        assert 85 < next_expiry_in(mock_db) <= 90
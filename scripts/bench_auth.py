@@ -0,0 +1,95 @@
+# scripts/bench_auth.py
+"""
+Measure per-request authentication overhead: what get_current_user costs
+before the principal cache (decode + users query), with a warm cache, and
+with AUTH_TRUST_TOKEN_CLAIMS (decode only).
+
+    python scripts/bench_auth.py [--username NAME] [-n 2000]
+
+Prints mean and p95 microseconds per resolution and the number of SQL
+statements each path issued. Read-only; needs an existing user.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from jose import jwt
+from sqlalchemy import event, select
+
+from backend.app.core.config import settings
+from backend.app.core.security import ALGORITHM, create_access_token
+from backend.app.db.session import SessionLocal, engine
+from backend.app.models.user import User
+from backend.app.services import auth_cache, user_service
+
+
+def _uncached(db, token):
+    payload = jwt.decode(token, settings.jwt_secret, algorithms=[ALGORITHM])
+    return user_service.get_user_by_username(db, username=payload["sub"])
+
+
+def _cached(db, token):
+    return auth_cache.principal(db, jwt.decode(token, settings.jwt_secret, algorithms=[ALGORITHM]))
+
+
+def _claims(db, token):
+    settings.auth_trust_token_claims = True
+    try:
+        return _cached(db, token)
+    finally:
+        settings.auth_trust_token_claims = False
+
+
+def run(label, fn, db, token, n, statements):
+    fn(db, token)  # warm up (fills the cache for the cached path)
+    statements[0] = 0
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn(db, token)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"  {label:<22} mean {statistics.fmean(samples):8.1f} us   p95 {p95:8.1f} us   queries/req {statements[0] / n:.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--username", default=None, help="user to authenticate as (default: first active user)")
+    ap.add_argument("-n", type=int, default=2000, help="resolutions per path (default 2000)")
+    args = ap.parse_args()
+
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_):
+        statements[0] += 1
+
+    db = SessionLocal()
+    try:
+        q = select(User).where(User.is_active.is_(True))
+        if args.username:
+            q = q.where(User.username == args.username)
+        user = db.execute(q.order_by(User.username).limit(1)).scalar_one()
+        token = create_access_token({
+            "sub": user.username,
+            "uid": str(user.id),
+            "role": user.role,
+            "branch_id": str(user.branch_id) if user.branch_id else None,
+            "ver": int(user.token_version or 0),
+        })
+        print(f"auth overhead for '{user.username}', {args.n} resolutions each")
+        run("decode + users query", _uncached, db, token, args.n, statements)
+        run("principal cache", _cached, db, token, args.n, statements)
+        run("token claims only", _claims, db, token, args.n, statements)
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# scripts/bench_date_filters.py
+"""
+Compare query plans for the old date-cast filters against the half-open
+timestamptz ranges from backend.app.utils.date_range.
+
+    python scripts/bench_date_filters.py [--branch-code CODE] [--days N] [--analyze]
+
+For each query prints the scan nodes of both plans (e.g. "Seq Scan on sales"
+vs "Index Scan using ix_sales_branch_sold_at") with estimated cost, and
+execution time when --analyze is given. Read-only.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+
+from backend.app.db.session import SessionLocal
+from backend.app.utils.date_range import local_day_bounds, local_today
+
+QUERIES = [
+    (
+        "sales by branch",
+        """SELECT count(*), sum(total_cents) FROM sales
+           WHERE branch_id = :branch_id
+             AND (sold_at AT TIME ZONE 'Africa/Cairo')::date >= :start_date
+             AND (sold_at AT TIME ZONE 'Africa/Cairo')::date <= :end_date""",
+        """SELECT count(*), sum(total_cents) FROM sales
+           WHERE branch_id = :branch_id AND sold_at >= :start_ts AND sold_at < :end_ts""",
+    ),
+    (
+        "sales, all branches",
+        "SELECT count(*), sum(total_cents) FROM sales WHERE date(sold_at) >= :start_date AND date(sold_at) <= :end_date",
+        "SELECT count(*), sum(total_cents) FROM sales WHERE sold_at >= :start_ts AND sold_at < :end_ts",
+    ),
+    (
+        "kg_sales by branch",
+        """SELECT count(*), sum(total_cents) FROM kg_sales
+           WHERE branch_id = :branch_id
+             AND CAST(sold_at AT TIME ZONE 'Africa/Cairo' AS date) >= :start_date
+             AND CAST(sold_at AT TIME ZONE 'Africa/Cairo' AS date) <= :end_date""",
+        """SELECT count(*), sum(total_cents) FROM kg_sales
+           WHERE branch_id = :branch_id AND sold_at >= :start_ts AND sold_at < :end_ts""",
+    ),
+    (
+        "op_log (audit)",
+        "SELECT count(*) FROM op_log WHERE date(created_at) >= :start_date AND date(created_at) <= :end_date",
+        "SELECT count(*) FROM op_log WHERE created_at >= :start_ts AND created_at < :end_ts",
+    ),
+    (
+        "stock_ledger (export)",
+        "SELECT count(*) FROM stock_ledger WHERE date(at) >= :start_date AND date(at) <= :end_date",
+        "SELECT count(*) FROM stock_ledger WHERE at >= :start_ts AND at < :end_ts",
+    ),
+]
+
+
+def _scans(node, out):
+    if "Scan" in node["Node Type"]:
+        label = node["Node Type"]
+        if node.get("Index Name"):
+            label += f" using {node['Index Name']}"
+        if node.get("Relation Name"):
+            label += f" on {node['Relation Name']}"
+        out.append(label)
+    for child in node.get("Plans", []):
+        _scans(child, out)
+    return out
+
+
+def explain(db, sql, params, analyze):
+    opts = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    raw = db.execute(text(f"EXPLAIN ({opts}) {sql}"), params).scalar_one()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    return {
+        "scans": _scans(plan["Plan"], []),
+        "cost": plan["Plan"]["Total Cost"],
+        "ms": plan.get("Execution Time"),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--branch-code", default=None, help="branch for the per-branch queries (default: first branch)")
+    ap.add_argument("--days", type=int, default=30, help="range length ending today (default 30)")
+    ap.add_argument("--analyze", action="store_true", help="run EXPLAIN ANALYZE (executes the queries)")
+    args = ap.parse_args()
+
+    end_date = local_today()
+    start_date = end_date - timedelta(days=args.days - 1)
+    start_ts, end_ts = local_day_bounds(start_date, end_date)
+
+    db = SessionLocal()
+    try:
+        if args.branch_code:
+            branch_id = db.execute(text("SELECT id FROM branches WHERE code = :c"), {"c": args.branch_code}).scalar_one()
+        else:
+            branch_id = db.execute(text("SELECT id FROM branches ORDER BY code LIMIT 1")).scalar_one()
+        params = {
+            "branch_id": branch_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "start_ts": start_ts,
+            "end_ts": end_ts,
+        }
+        print(f"range {start_date}..{end_date} -> [{start_ts.isoformat()}, {end_ts.isoformat()})")
+        for name, old_sql, new_sql in QUERIES:
+            print(f"\n== {name}")
+            for label, sql in (("before", old_sql), ("after ", new_sql)):
+                r = explain(db, sql, params, args.analyze)
+                timing = f", {r['ms']:.2f} ms" if r["ms"] is not None else ""
+                print(f"  {label}: cost {r['cost']:.1f}{timing}; " + "; ".join(r["scans"]))
+            db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# scripts/load_test.py
+"""
+Concurrent load test of the read-heavy endpoints, for comparing the async
+routes with the sync ones they replaced.
+
+Run one API on the revision before the async port and one on this
+revision (same database, same gunicorn settings), then:
+
+    python scripts/load_test.py \\
+        --target sync=http://localhost:8001 --target async=http://localhost:8000 \\
+        --username admin --password ... --branch-code QAL -c 100 -n 2000
+
+For every endpoint and target prints requests/second, latency p50/p95/p99
+and the count of non-2xx responses. Read-only; needs httpx.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def _paths(branch_code: str, q: str) -> list[str]:
+    return [
+        f"/api/v1/students/search?q={q}&limit=20",
+        f"/api/v1/reservations/search?q={q}&limit=20",
+        f"/api/v1/reports/daily-sales?branch_code={branch_code}",
+        f"/api/v1/reports/branch-inventory?branch_code={branch_code}",
+        "/api/v1/dashboard/summary",
+    ]
+
+
+async def _login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    resp = await client.post("/api/v1/auth/token", data={"username": username, "password": password})
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+async def _hammer(client: httpx.AsyncClient, path: str, headers: dict, total: int, concurrency: int):
+    latencies: list[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            t0 = time.perf_counter()
+            try:
+                resp = await client.get(path, headers=headers)
+                ok = resp.is_success
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - t0) * 1000)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100)
+    return {"rps": len(latencies) / elapsed, "p50": q[49], "p95": q[94], "p99": q[98], "errors": errors}
+
+
+async def main_async(args) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    print(f"{args.requests} requests per endpoint, concurrency {args.concurrency}")
+    print(f"{'endpoint':<52} {'target':<8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    results = {}
+    for label, base_url in args.target:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            token = args.token or await _login(client, args.username, args.password)
+            headers = {"Authorization": f"Bearer {token}"}
+            for path in _paths(args.branch_code, args.q):
+                await client.get(path, headers=headers)  # warm caches and pools
+                results[(path, label)] = await _hammer(client, path, headers, args.requests, args.concurrency)
+    for path in _paths(args.branch_code, args.q):
+        for label, _ in args.target:
+            r = results[(path, label)]
+            print(f"{path[:52]:<52} {label:<8} {r['rps']:8.1f} {r['p50']:8.1f} {r['p95']:8.1f} {r['p99']:8.1f} {r['errors']:7d}")
+
+
+def _target(value: str) -> tuple[str, str]:
+    label, sep, url = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError("expected LABEL=URL")
+    return label, url
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--target", type=_target, action="append", required=True, help="LABEL=BASE_URL, repeatable")
+    ap.add_argument("--token", default=None, help="bearer token (otherwise log in with --username/--password)")
+    ap.add_argument("--username", default=None)
+    ap.add_argument("--password", default=None)
+    ap.add_argument("--branch-code", default="QAL")
+    ap.add_argument("--q", default="محمد", help="name query for the search endpoints")
+    ap.add_argument("-c", "--concurrency", type=int, default=50)
+    ap.add_argument("-n", "--requests", type=int, default=1000, help="requests per endpoint per target")
+    args = ap.parse_args()
+    if not args.token and not (args.username and args.password):
+        ap.error("give --token or --username and --password")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()